@@ -1,9 +1,12 @@
 """Compatibility wrapper for the shared BEV-to-QField converter implementation."""
 
+import sys
+
 from bev_to_qfield_plugin.bev_to_qfield_core import (
     BEVToQField,
     BEVToQFieldConfig,
     _resolve_default_base_path,
+    main,
     run_standalone,
 )
 
@@ -11,9 +14,12 @@ __all__ = [
     "BEVToQFieldConfig",
     "BEVToQField",
     "_resolve_default_base_path",
+    "main",
     "run_standalone",
 ]
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     run_standalone()
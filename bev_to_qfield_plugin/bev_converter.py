@@ -5,45 +5,81 @@ from PyQt5.QtWidgets import (
     QFileDialog, QProgressBar, QTextEdit, QCheckBox, QGroupBox,
     QMessageBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QTextCursor
 from pathlib import Path
 import sys
 import os
+import time
+import datetime
 
 from qgis.gui import QgisInterface
 from qgis.core import QgsMessageLog
 
 from .bev_to_qfield import BEVToQFieldConfig, BEVToQField
+from .log_sink import (
+    BackgroundLogWriter,
+    BufferedLogChannel,
+    DEFAULT_FLUSH_INTERVAL_MS,
+    DEFAULT_SCROLLBACK_LINES,
+)
 
 
 class ConverterWorkerThread(QThread):
     """Worker thread for running converter without blocking UI."""
     
-    progress = pyqtSignal(str)
+    PROGRESS_MIN_INTERVAL = 0.1  # seconds between progress signals
+    
+    percent = pyqtSignal(int)
     error = pyqtSignal(str)
     finished = pyqtSignal()
     
-    def __init__(self, converter, config):
+    def __init__(self, converter, config, dir_raw, log_channel, log_writer=None):
         super().__init__()
         self.converter = converter
         self.config = config
+        self.dir_raw = dir_raw
+        self.log_channel = log_channel
+        self.log_writer = log_writer
+        self.result = None
         self._original_log = None
+        self._last_percent = -1
+        self._last_emit = 0.0
+    
+    def cancel(self):
+        """Request cooperative cancellation at the next batch boundary."""
+        self.converter.feedback.cancel()
+    
+    def _on_progress(self, value: float):
+        """Forward feedback progress, throttled to whole percent and a minimum interval."""
+        pct = int(value)
+        now = time.monotonic()
+        if pct == self._last_percent:
+            return
+        if pct < 100 and now - self._last_emit < self.PROGRESS_MIN_INTERVAL:
+            return
+        self._last_percent = pct
+        self._last_emit = now
+        self.percent.emit(pct)
     
     def run(self):
         """Run converter in background thread."""
         try:
+            self.converter.feedback.progressChanged.connect(self._on_progress, Qt.DirectConnection)
+            
             # Capture converter output
             self._original_log = self.converter.log
             
-            def log_with_signal(msg):
-                self.progress.emit(msg)
-                self._original_log(msg)
+            def log_buffered(msg):
+                # Collected here, flushed to the dialog on its timer
+                self.log_channel.put(msg)
+                if self.log_writer is not None:
+                    self.log_writer.write(msg)
             
-            self.converter.log = log_with_signal
+            self.converter.log = log_buffered
             
             # Run conversion
-            self.converter.run()
+            self.result = self.converter.run(dir_raw=self.dir_raw)
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
@@ -69,8 +105,16 @@ class BEVToQFieldDialog(QDialog):
         self.converter = None
         self.config = None
         self.base_path = None  # Will be selected by user
+        self.log_channel = BufferedLogChannel()
+        self.log_writer = None
         
         self.init_ui()
+        
+        # Flush buffered log messages at a fixed frame rate
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(DEFAULT_FLUSH_INTERVAL_MS)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start()
     
     def init_ui(self):
         """Initialize UI components."""
@@ -134,6 +178,11 @@ class BEVToQFieldDialog(QDialog):
         self.check_fix_geom.setToolTip("Attempt to repair invalid geometry before processing")
         options_layout.addWidget(self.check_fix_geom)
         
+        self.check_ortho_tiles = QCheckBox("Offline orthophoto tile pack")
+        self.check_ortho_tiles.setChecked(False)
+        self.check_ortho_tiles.setToolTip("Download orthophoto tiles (zoom 14-18) for the converted extent into an MBTiles file for offline use in QField")
+        options_layout.addWidget(self.check_ortho_tiles)
+        
         options_group.setLayout(options_layout)
         layout.addWidget(options_group)
         
@@ -151,7 +200,7 @@ class BEVToQFieldDialog(QDialog):
         
         # Progress bar
         self.progress_bar = QProgressBar()
-        self.progress_bar.setMaximum(0)  # Indeterminate
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
         
@@ -160,6 +209,7 @@ class BEVToQFieldDialog(QDialog):
         self.output_text.setReadOnly(True)
         self.output_text.setFont(QFont("Courier", 9))
         self.output_text.setMaximumHeight(200)
+        self.output_text.document().setMaximumBlockCount(DEFAULT_SCROLLBACK_LINES)
         layout.addWidget(QLabel("Processing Log:"))
         layout.addWidget(self.output_text)
         
@@ -216,11 +266,36 @@ class BEVToQFieldDialog(QDialog):
             self.folder_path_display.setToolTip(folder)  # Show full path on hover
     
     def log_output(self, msg: str):
-        """Append message to output text."""
+        """Queue message for the output text (flushed by the log timer)."""
+        self.log_channel.put(msg)
+    
+    def flush_log(self):
+        """Append all queued messages to the output text in one update."""
+        text = self.log_channel.drain_text()
+        if not text:
+            return
         self.output_text.moveCursor(QTextCursor.End)
-        self.output_text.insertPlainText(msg + "\n")
+        self.output_text.insertPlainText(text + "\n")
         self.output_text.ensureCursorVisible()
     
+    def _open_log_file(self):
+        """Start a background writer for the full run log."""
+        self._close_log_file()
+        log_dir = self.config.dir_proc / "logs"
+        try:
+            log_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            QgsMessageLog.logMessage(f"Log folder not available: {e}", "BEVToQField", 1)
+            return
+        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_writer = BackgroundLogWriter(str(log_dir / f"bev2qfield_{ts}.log"))
+        self.log_output(f"Full log: {self.log_writer.path}")
+    
+    def _close_log_file(self):
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.log_writer = None
+    
     def start_conversion(self):
         """Start the conversion process."""
         try:
@@ -249,6 +324,18 @@ class BEVToQFieldDialog(QDialog):
                 )
                 return
             
+            # Ask for the input folder here: dialogs must stay on the GUI thread
+            start_dir = Path(base_path) / "01_BEV_Rawdata"
+            if not start_dir.exists():
+                start_dir = Path(base_path) / "01_BEV_Rohdaten"
+            dir_raw = QFileDialog.getExistingDirectory(
+                self,
+                "Ordner mit BEV-Rawdata auswählen",
+                str(start_dir if start_dir.exists() else base_path)
+            )
+            if not dir_raw:
+                return
+            
             # Create config
             self.config = BEVToQFieldConfig(base_path)
             
@@ -257,6 +344,7 @@ class BEVToQFieldDialog(QDialog):
             self.config.CLEAN_SYNC_DIR = self.check_clean_sync.isChecked()
             self.config.OPEN_QGIS_ON_FINISH = self.check_open_qgis.isChecked()
             self.config.FIX_GEOM = self.check_fix_geom.isChecked()
+            self.config.ORTHO_TILE_PACK = self.check_ortho_tiles.isChecked()
             
             # Create converter
             self.converter = BEVToQField(self.config)
@@ -265,21 +353,24 @@ class BEVToQFieldDialog(QDialog):
             self.btn_start.setEnabled(False)
             self.btn_browse_folder.setEnabled(False)
             self.btn_cancel.setEnabled(True)
+            self.progress_bar.setValue(0)
             self.progress_bar.setVisible(True)
             self.output_text.clear()
+            self.log_channel.drain()
+            self._open_log_file()
             
             self.log_output("🔄 Conversion started...")
             self.log_output(f"Base path: {self.config.base}")
             self.log_output(f"Source CRS: {self.config.SRC_CRS}")
             self.log_output(f"Target CRS: {self.config.TGT_CRS}")
-            self.log_output("")
-            self.log_output("➡️ A folder selection dialog will appear...")
-            self.log_output("   Please select a subfolder from: 01_BEV_Rohdaten/")
+            self.log_output(f"Input folder: {dir_raw}")
             self.log_output("")
             
             # Run in worker thread
-            self.worker_thread = ConverterWorkerThread(self.converter, self.config)
-            self.worker_thread.progress.connect(self.log_output)
+            self.worker_thread = ConverterWorkerThread(
+                self.converter, self.config, dir_raw, self.log_channel, self.log_writer
+            )
+            self.worker_thread.percent.connect(self.progress_bar.setValue)
             self.worker_thread.finished.connect(self.conversion_finished)
             self.worker_thread.error.connect(self.conversion_error)
             self.worker_thread.start()
@@ -289,12 +380,11 @@ class BEVToQFieldDialog(QDialog):
             self.conversion_error(str(e))
     
     def cancel_conversion(self):
-        """Cancel the conversion."""
+        """Request cancellation; the worker stops at the next batch boundary."""
         if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.terminate()
-            self.worker_thread.wait()
-            self.log_output("⏹️  Conversion cancelled")
-            self.conversion_finished()
+            self.worker_thread.cancel()
+            self.btn_cancel.setEnabled(False)
+            self.log_output("⏹️  Cancelling after current step...")
     
     def conversion_finished(self):
         """Handle conversion completion."""
@@ -302,7 +392,12 @@ class BEVToQFieldDialog(QDialog):
         self.btn_browse_folder.setEnabled(True)
         self.btn_cancel.setEnabled(False)
         self.progress_bar.setVisible(False)
-        self.log_output("✔️  Conversion complete!")
+        result = self.worker_thread.result if self.worker_thread else None
+        if result and result.get("cancelled"):
+            self.log_output("⏹️  Conversion cancelled – previous output left unchanged")
+        else:
+            self.log_output("✔️  Conversion complete!")
+        self._close_log_file()
     
     def conversion_error(self, error: str):
         """Handle conversion error."""
@@ -311,4 +406,14 @@ class BEVToQFieldDialog(QDialog):
         self.btn_browse_folder.setEnabled(True)
         self.btn_cancel.setEnabled(False)
         self.progress_bar.setVisible(False)
+        if self.log_writer is not None:
+            self.log_writer.write(f"ERROR: {error}")
+        self._close_log_file()
         QgsMessageLog.logMessage(f"Conversion error: {error}", "BEVToQField", 2)
+    
+    def closeEvent(self, event):
+        """Flush remaining log output before the dialog closes."""
+        self.flush_log()
+        if not (self.worker_thread and self.worker_thread.isRunning()):
+            self._close_log_file()
+        super().closeEvent(event)
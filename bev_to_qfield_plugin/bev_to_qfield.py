@@ -1,10 +1,13 @@
 """Compatibility wrapper for plugin imports of the shared converter core."""
 
+import sys
+
 try:
     from .bev_to_qfield_core import (
         BEVToQField,
         BEVToQFieldConfig,
         _resolve_default_base_path,
+        main,
         run_standalone,
     )
 except ImportError:  # pragma: no cover - direct script execution fallback
@@ -12,6 +15,7 @@ except ImportError:  # pragma: no cover - direct script execution fallback
         BEVToQField,
         BEVToQFieldConfig,
         _resolve_default_base_path,
+        main,
         run_standalone,
     )
 
@@ -19,9 +23,12 @@ __all__ = [
     "BEVToQFieldConfig",
     "BEVToQField",
     "_resolve_default_base_path",
+    "main",
     "run_standalone",
 ]
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     run_standalone()
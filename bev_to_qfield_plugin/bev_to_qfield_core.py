@@ -1,51 +1,132 @@
 # bev_to_qfield_core.py — QGIS 3.44.x
 # BEV (MGI/GK) → ETRS89 / UTM33N (EPSG:25833) + optionale Geoid-Höhen
-import os, sys, glob, datetime, shutil, tempfile
+import os, sys, glob, fnmatch, datetime, json, shutil, sqlite3, tempfile, argparse, threading, zipfile, atexit
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import Any, Callable, List, Optional, Dict, Set, Tuple
 
 # ---------- Bootstrap für QGIS + Processing ----------
 QGIS_PREFIX = os.environ.get("QGIS_PREFIX_PATH", r"C:\OSGeo4W\apps\qgis")
 QGIS_PY     = os.path.join(QGIS_PREFIX, "python")
 QGIS_PLUG   = os.path.join(QGIS_PY, "plugins")
-for p in (QGIS_PY, QGIS_PLUG):
-    if p not in sys.path:
-        sys.path.append(p)
+
+
+def _bootstrap_qgis_paths():
+    """Add the QGIS python folders to sys.path (standalone interpreters only)."""
+    for p in (QGIS_PY, QGIS_PLUG):
+        if p not in sys.path:
+            sys.path.append(p)
+
+
+try:
+    import qgis.core  # noqa: F401 - already importable inside QGIS
+except ImportError:
+    _bootstrap_qgis_paths()
 
 from qgis.core import (
     QgsApplication, QgsProject, QgsVectorLayer, QgsRasterLayer,
     QgsCoordinateReferenceSystem, QgsVectorFileWriter,
     QgsCoordinateTransformContext, QgsProviderRegistry,
-    QgsWkbTypes, QgsProcessingFeedback,
-    QgsFillSymbol, QgsSingleSymbolRenderer
+    QgsWkbTypes, QgsProcessingFeedback, QgsProcessingMultiStepFeedback,
+    QgsProcessingException,
+    QgsFillSymbol, QgsSingleSymbolRenderer,
+    QgsCoordinateTransform, QgsCsException, QgsJsonUtils
 )
 
 from PyQt5.QtWidgets import QFileDialog
-import processing
-from processing.core.Processing import Processing
 
-# Initialize QGIS application
-# If running as plugin, QgsApplication already exists and is initialized
-# If running standalone, we need to create and initialize it
-_qgs_app = QgsApplication.instance()
+try:
+    from . import geojson_stream
+    from .conversion_engine import LAYER_STAGES, RUN_STAGES, ConversionCancelled, ConversionRun, LayerJob
+    from .conversion_stages import apply_geoid_heights, build_engine
+    from .fast_open import apply_fast_open_profile, feature_count, mark_reference_layer, refresh_gpkg_statistics, vector_layer_options
+    from .layer_cache import FileBackedCache, LayerCache, file_stamp, remove_cached_file, source_footprint, source_key
+    from .orthofoto import build_orthofoto_layer, build_tile_pack_layer, publish_remote_sources
+    from .render_profile import apply_render_profile
+    from .project_template import outline_polygon_style, write_template_project
+    from .tile_pack import parse_zoom_range
+    from .workspace_catalog import rawdata_dir, record_conversion
+    from .zip_source import list_zip_folder, split_zip_source, vsizip_path, zip_member_key
+except ImportError:  # pragma: no cover - direct script execution fallback
+    import geojson_stream  # type: ignore
+    from conversion_engine import LAYER_STAGES, RUN_STAGES, ConversionCancelled, ConversionRun, LayerJob  # type: ignore
+    from conversion_stages import apply_geoid_heights, build_engine  # type: ignore
+    from fast_open import apply_fast_open_profile, feature_count, mark_reference_layer, refresh_gpkg_statistics, vector_layer_options  # type: ignore
+    from layer_cache import FileBackedCache, LayerCache, file_stamp, remove_cached_file, source_footprint, source_key  # type: ignore
+    from orthofoto import build_orthofoto_layer, build_tile_pack_layer, publish_remote_sources  # type: ignore
+    from render_profile import apply_render_profile  # type: ignore
+    from project_template import outline_polygon_style, write_template_project  # type: ignore
+    from tile_pack import parse_zoom_range  # type: ignore
+    from workspace_catalog import rawdata_dir, record_conversion  # type: ignore
+    from zip_source import list_zip_folder, split_zip_source, vsizip_path, zip_member_key  # type: ignore
+
+# QGIS application and Processing are initialized on first use (ensure_qgis),
+# so importing this module stays cheap when the plugin is loaded but unused.
+processing = None
+_qgs_app = None
 _qgs_app_is_standalone = False  # Track if we created the app ourselves
+_qgis_init_lock = threading.Lock()
+
+
+def ensure_qgis():
+    """Initialize QGIS and Processing once; safe to call repeatedly.
+    
+    If running as plugin, QgsApplication already exists and is initialized.
+    If running standalone, it is created and initialized here. Must be called
+    from the main thread before the first conversion.
+    """
+    global processing, _qgs_app, _qgs_app_is_standalone
+    with _qgis_init_lock:
+        if processing is not None:
+            return _qgs_app
+        
+        _qgs_app = QgsApplication.instance()
+        if _qgs_app is None:
+            # Standalone mode - create and initialize QgsApplication
+            QgsApplication.setPrefixPath(QGIS_PREFIX, True)
+            _qgs_app = QgsApplication([], True)
+            _qgs_app.initQgis()
+            _qgs_app_is_standalone = True
+        
+        try:
+            import processing as processing_module
+        except ImportError:
+            _bootstrap_qgis_paths()
+            import processing as processing_module
+        from processing.core.Processing import Processing
+        
+        if _qgs_app_is_standalone:
+            Processing.initialize()
+        # else: Plugin mode - QGIS handles all initialization
+        processing = processing_module
+        return _qgs_app
 
-if _qgs_app is None:
-    # Standalone mode - create and initialize QgsApplication
-    QgsApplication.setPrefixPath(QGIS_PREFIX, True)
-    _qgs_app = QgsApplication([], True)
-    _qgs_app.initQgis()
-    Processing.initialize()
-    _qgs_app_is_standalone = True
-# else: Plugin mode - QGIS handles all initialization
 
 # ---------- Constants ----------
 INPUT_PATTERNS = ("*.shp", "*.gpkg", "*.geojson")
 SRC_CRS_CODE = "EPSG:31255"
 TGT_CRS_CODE = "EPSG:25833"
 TEMP_GPKG_NAME = "kataster_qfield_tmp.gpkg"
-WMTS_LAYER_NAME = "BEV Orthofoto (basemap.at)"
 GEOID_PATTERN_NAME = "GV_Hoehengrid*.tif"
+LAYER_CACHE_MAX_MB = int(os.environ.get("QFC_LAYER_CACHE_MB", "512"))
+GEOJSON_STREAM_THRESHOLD_MB = int(os.environ.get("QFC_GEOJSON_STREAM_MB", "64"))
+GEOJSON_BATCH_SIZE = 5000
+
+# Shared across converter runs in one QGIS session. Runs execute in different
+# threads, so the cache only holds paths: grid lookups and reprojected layers
+# written to files below _session_cache_dir(), never layer objects.
+_SESSION_LAYER_CACHE = LayerCache(LAYER_CACHE_MAX_MB * 1024 * 1024, on_evict=remove_cached_file)
+_SESSION_CACHE_DIR: Optional[str] = None
+_SESSION_CACHE_LOCK = threading.Lock()
+
+
+def _session_cache_dir() -> str:
+    """Folder for the cached layer files of this process, removed at exit."""
+    global _SESSION_CACHE_DIR
+    with _SESSION_CACHE_LOCK:
+        if _SESSION_CACHE_DIR is None:
+            _SESSION_CACHE_DIR = tempfile.mkdtemp(prefix="bev2qfield_cache_")
+            atexit.register(shutil.rmtree, _SESSION_CACHE_DIR, True)
+        return _SESSION_CACHE_DIR
 
 
 def _resolve_default_base_path() -> str:
@@ -80,6 +161,9 @@ class BEVToQFieldConfig:
     CLEAN_SYNC_DIR = False
     OPEN_QGIS_ON_FINISH = False
     FIX_GEOM = True
+    ORTHO_TILE_PACK = False
+    ORTHO_TILE_ZOOM = (14, 18)
+    TEMPLATE_PROJECT = False
     
     # CRS settings
     SRC_CRS = SRC_CRS_CODE
@@ -106,31 +190,56 @@ class BEVToQField:
     """Main converter from BEV cadastral data to QField format."""
     
     def __init__(self, config: BEVToQFieldConfig):
+        ensure_qgis()
         self.config = config
         self.feedback = QgsProcessingFeedback()
+        # Per-run multi-step view on self.feedback; algorithms report into it.
+        self.step_feedback = self.feedback
         self.target_crs = QgsCoordinateReferenceSystem(config.TGT_CRS)
         self.transform_ctx = QgsProject.instance().transformContext()
-        self.layer_cache: Dict[str, QgsVectorLayer] = {}
+        self.layer_cache = _SESSION_LAYER_CACHE
         self.written_layers: List[str] = []
+        self._source_keys: Dict[str, Optional[tuple]] = {}
+        self.stream_sources: List[str] = []
+        self.engine = None
     
     def log(self, msg: str):
         """Log message with timestamp."""
         ts = datetime.datetime.now().strftime("%H:%M:%S")
         print(f"[bev2qfield {ts}] {msg}", flush=True)
     
+    def _check_cancelled(self):
+        """Stop at the current batch boundary if cancellation was requested."""
+        if self.feedback.isCanceled():
+            raise ConversionCancelled("Konvertierung abgebrochen")
+    
     def _safe_name(self, name: str) -> str:
         """Convert name to safe layer name."""
         return "".join(ch if ch.isalnum() or ch in "_-" else "_" for ch in name)[:60]
     
+    def _find_grid(self, pattern: str) -> Optional[str]:
+        """Find first grid file matching pattern; the match is cached with its file stamp."""
+        grid_dir = str(self.config.dir_grids)
+        key = ("grid", pattern, os.path.normcase(os.path.abspath(grid_dir)))
+        cached = self.layer_cache.get(key)
+        if cached and file_stamp(cached[0]) == cached[1]:
+            return cached[0]
+
+        cands = sorted(glob.glob(os.path.join(grid_dir, "**", pattern), recursive=True))
+        found = cands[0] if cands else None
+        stamp = file_stamp(found) if found else None
+        if stamp:
+            self.layer_cache.put(key, (found, stamp))
+        return found
+
     def _find_ntv2_grid(self) -> Optional[str]:
         """Find NTv2 grid file."""
-        cands = sorted(glob.glob(os.path.join(self.config.dir_grids, "**", "*.gsb"), recursive=True))
-        return cands[0].replace("\\", "/") if cands else None
+        found = self._find_grid("*.gsb")
+        return found.replace("\\", "/") if found else None
     
     def _find_geoid(self) -> Optional[str]:
         """Find geoid height grid file."""
-        cands = sorted(glob.glob(os.path.join(self.config.dir_grids, "**", GEOID_PATTERN_NAME), recursive=True))
-        return cands[0] if cands else None
+        return self._find_grid(GEOID_PATTERN_NAME)
     
     def _is_valid_layer(self, lyr: QgsVectorLayer) -> bool:
         """Check if layer is valid and has geometry."""
@@ -145,44 +254,213 @@ class BEVToQField:
             lyr.setCrs(QgsCoordinateReferenceSystem(self.config.SRC_CRS))
         return lyr
     
+    def _zip_inputs(self, archive: str, folder: str) -> List[Tuple[str, Optional[tuple]]]:
+        """Input files below folder in archive as (/vsizip/ path, cache key)."""
+        listing = list_zip_folder(archive, folder, recursive=True)
+        sizes = {member.lower(): size for member, _rel, size in listing}
+        inputs = []
+        for member, rel_path, _size in listing:
+            filename = rel_path.rsplit("/", 1)[-1].lower()
+            if any(fnmatch.fnmatch(filename, pat) for pat in INPUT_PATTERNS):
+                inputs.append((vsizip_path(archive, member), zip_member_key(archive, member, sizes)))
+        return inputs
+    
     def collect_layers(self, dir_raw: str) -> List[QgsVectorLayer]:
-        """Collect and validate input layers from directory."""
-        files = []
-        for pat in INPUT_PATTERNS:
-            files.extend(glob.glob(os.path.join(dir_raw, "**", pat), recursive=True))
+        """Collect and validate input layers from directory (or ``archive.zip!/folder``)."""
+        zip_source = split_zip_source(dir_raw)
+        if zip_source:
+            inputs = self._zip_inputs(*zip_source)
+        else:
+            inputs = []
+            for pat in INPUT_PATTERNS:
+                inputs.extend((p, source_key(p)) for p in glob.glob(os.path.join(dir_raw, "**", pat), recursive=True))
         
         layers = []
-        for p in files:
+        self.stream_sources = []
+        stream_threshold = GEOJSON_STREAM_THRESHOLD_MB * 1024 * 1024
+        for p, key in inputs:
+            if geojson_stream.should_stream(p, stream_threshold):
+                # Opening via OGR would parse the whole document up front.
+                self.stream_sources.append(p)
+                continue
             lyr = QgsVectorLayer(p, os.path.splitext(os.path.basename(p))[0], "ogr")
-            if self._is_valid_layer(lyr):
-                layers.append(lyr)
+            if not self._is_valid_layer(lyr):
+                continue
+            self._source_keys[lyr.id()] = key
+            layers.append(lyr)
         return layers
     
-    def _fix_geometries(self, lyr: QgsVectorLayer) -> QgsVectorLayer:
-        """Fix invalid geometries if enabled."""
-        if not self.config.FIX_GEOM or QgsWkbTypes.geometryType(lyr.wkbType()) == QgsWkbTypes.UnknownGeometry:
-            return lyr
-        
-        result = processing.run(
-            "native:fixgeometries",
-            {"INPUT": lyr, "METHOD": 0, "OUTPUT": "TEMPORARY_OUTPUT"},
-            feedback=self.feedback
-        )
-        return result["OUTPUT"]
-    
-    def _reproject_layer(self, lyr: QgsVectorLayer, operation: str = "") -> QgsVectorLayer:
-        """Reproject layer to target CRS."""
-        return processing.run(
-            "native:reprojectlayer",
-            {
-                "INPUT": lyr,
-                "TARGET_CRS": self.target_crs,
-                "OPERATION": operation,
-                "OUTPUT": "TEMPORARY_OUTPUT"
-            },
-            feedback=self.feedback
-        )["OUTPUT"]
-    
+    def _discover_stage(self, run: ConversionRun) -> List[LayerJob]:
+        """Engine discover stage: source layers as jobs (streamed GeoJSON is handled separately)."""
+        jobs = []
+        for lyr in self.collect_layers(run.source_folder):
+            job = LayerJob(lyr.source(), lyr.name(), self._safe_name(lyr.name()))
+            job.layer = self._ensure_crs(lyr)
+            job.source_key = self._source_keys.get(lyr.id())
+            job.cache_size = source_footprint(job.source_key)
+            jobs.append(job)
+        return jobs
+
+    def _on_job_start(self, index: int, total: int, job: LayerJob):
+        self.step_feedback.setCurrentStep(index)
+        self.log(f"[{index + 1}/{total}] {job.name}")
+
+    def _project_stage(self, run: ConversionRun) -> Optional[str]:
+        out_qgz = run.settings["out_qgz"]
+        if self.config.TEMPLATE_PROJECT:
+            try:
+                write_template_project(
+                    run.target_gpkg, self.written_layers, out_qgz, outline_polygon_style, run.outputs.get("tiles")
+                )
+                self.log(f"Projektdatei aus Vorlage geschrieben: {out_qgz}")
+                return out_qgz
+            except (OSError, ValueError, sqlite3.Error) as err:
+                run.failed_layers.append(f"Projektdatei: {err}")
+                return None
+        if self._build_project(run.target_gpkg, self.written_layers, out_qgz, run.outputs.get("tiles")):
+            return out_qgz
+        run.failed_layers.append("Projektdatei: QGIS-Projektdatei konnte nicht geschrieben werden")
+        return None
+
+    def _report_stage(self, run: ConversionRun) -> Optional[str]:
+        out_rpt = run.settings["out_rpt"]
+        try:
+            self._write_report(run.settings.get("ntv2_grid"), run.settings.get("geoid_grid"), out_rpt)
+        except OSError as err:
+            run.failed_layers.append(f"Reportdatei: {err}")
+            return None
+        return out_rpt
+
+    def _stream_geojson_layer(self, path: str, gpkg_path: str, layer_name: str, operation: str, is_first: bool) -> bool:
+        """Fix, reproject and write a large GeoJSON file batch by batch.
+        
+        A first pass collects the union of all properties, the geometry types
+        and the CRS member, so fields that only appear in later features are
+        not dropped and single/multi geometries share one multi layer type.
+        """
+        members: Dict[str, Any] = {}
+        geometry_types: Set[Tuple[str, bool]] = set()
+        total_size = max(1, os.path.getsize(path))
+        
+        def _progress(start: float) -> Callable[[int], None]:
+            return lambda chars_read: self.step_feedback.setProgress(min(100.0, start + 50.0 * chars_read / total_size))
+        
+        try:
+            schema = geojson_stream.property_schema(
+                geojson_stream.iter_features(path, members, on_progress=_progress(0.0)), geometry_types
+            )
+            self._check_cancelled()
+            features = geojson_stream.iter_features(path, on_progress=_progress(50.0))
+            batches = geojson_stream.iter_batches(features, GEOJSON_BATCH_SIZE)
+            first_batch = next(batches, None)
+        except ValueError as err:
+            self.log(f"❌ GeoJSON nicht lesbar '{layer_name}': {err}")
+            return False
+        if not first_batch:
+            self.log(f"⚠️  GeoJSON ohne Features: {path}")
+            return False
+        
+        fields = QgsJsonUtils.stringToFields(json.dumps({"type": "Feature", "properties": schema, "geometry": None}))
+        multi_type = geojson_stream.multi_geometry_type(geometry_types)
+        if multi_type:
+            wkb_type = QgsWkbTypes.parseType(multi_type)
+        else:
+            if len(geometry_types) > 1:
+                self.log(f"⚠️  {layer_name}: gemischte Geometrietypen, Layer wird als GEOMETRY geschrieben")
+            wkb_type = QgsWkbTypes.Unknown
+        src_crs = QgsCoordinateReferenceSystem(geojson_stream.crs_name(members) or "EPSG:4326")
+        if not src_crs.isValid():
+            src_crs = QgsCoordinateReferenceSystem(self.config.SRC_CRS)
+        
+        ctx = QgsCoordinateTransformContext()
+        if operation and src_crs.authid() == self.config.SRC_CRS:
+            ctx.addCoordinateOperation(src_crs, self.target_crs, operation)
+        xform = QgsCoordinateTransform(src_crs, self.target_crs, ctx)
+        
+        writer = None
+        written = 0
+        no_geometry = 0
+        not_transformed = 0
+        try:
+            batch = first_batch
+            while batch is not None:
+                self._check_cancelled()
+                feats = QgsJsonUtils.stringToFeatureList(
+                    json.dumps({"type": "FeatureCollection", "features": batch}), fields
+                )
+                kept = []
+                for feat in feats:
+                    # Like the OGR path: features without geometry are not exported
+                    if not feat.hasGeometry():
+                        no_geometry += 1
+                        continue
+                    geom = feat.geometry()
+                    if self.config.FIX_GEOM:
+                        geom = geom.makeValid()
+                    try:
+                        geom.transform(xform)
+                    except QgsCsException:
+                        not_transformed += 1
+                        continue
+                    geom.convertToMultiType()
+                    feat.setGeometry(geom)
+                    kept.append(feat)
+                
+                if kept and writer is None:
+                    opts = QgsVectorFileWriter.SaveVectorOptions()
+                    opts.driverName = "GPKG"
+                    opts.layerName = layer_name
+                    opts.fileEncoding = "UTF-8"
+                    opts.actionOnExistingFile = (
+                        QgsVectorFileWriter.CreateOrOverwriteFile if is_first
+                        else QgsVectorFileWriter.CreateOrOverwriteLayer
+                    )
+                    writer = QgsVectorFileWriter.create(
+                        gpkg_path, fields, wkb_type, self.target_crs, self.transform_ctx, opts
+                    )
+                    if writer.hasError() != QgsVectorFileWriter.NoError:
+                        self.log(f"❌ Schreibfehler '{layer_name}': {writer.errorMessage()}")
+                        return False
+                if kept:
+                    if not writer.addFeatures(kept) or writer.hasError() != QgsVectorFileWriter.NoError:
+                        self.log(f"❌ Schreibfehler '{layer_name}' nach {written} Features: {writer.errorMessage()}")
+                        return False
+                    written += len(kept)
+                batch = next(batches, None)
+        except ValueError as err:
+            self.log(f"❌ GeoJSON nicht lesbar '{layer_name}' nach {written} Features: {err}")
+            return False
+        finally:
+            del writer  # flushes and closes the GPKG layer
+        
+        if no_geometry:
+            self.log(f"⚠️  {layer_name}: {no_geometry} Features ohne Geometrie übersprungen")
+        if not_transformed:
+            self.log(f"⚠️  {layer_name}: {not_transformed} Features nicht transformierbar, übersprungen")
+        if not written:
+            self.log(f"⚠️  GeoJSON ohne exportierbare Geometrien: {path}")
+            return False
+        
+        status = 'neu' if is_first else 'update'
+        self.log(f"✔️  geschrieben: {layer_name} ({status}, {written} Features gestreamt)")
+        return True
+
+    def _save_cached_layer(self, vl: QgsVectorLayer, path: str) -> bool:
+        """Write a reprojected layer to its session cache file."""
+        opts = QgsVectorFileWriter.SaveVectorOptions()
+        opts.driverName = "GPKG"
+        opts.fileEncoding = "UTF-8"
+        opts.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+        ret = QgsVectorFileWriter.writeAsVectorFormatV2(vl, path, self.transform_ctx, opts)
+        code = ret[0] if isinstance(ret, tuple) else ret
+        return code == QgsVectorFileWriter.NoError
+
+    @staticmethod
+    def _load_cached_layer(path: str) -> Optional[QgsVectorLayer]:
+        """Open a session cache file in the calling thread."""
+        lyr = QgsVectorLayer(path, os.path.splitext(os.path.basename(path))[0], "ogr")
+        return lyr if lyr.isValid() else None
+
     def _write_layer(self, vl: QgsVectorLayer, gpkg_path: str, layer_name: str, is_first: bool) -> bool:
         """Write layer to GeoPackage."""
         opts = QgsVectorFileWriter.SaveVectorOptions()
@@ -208,33 +486,24 @@ class BEVToQField:
         return True
     
     def _build_wmts_layer(self) -> Optional[QgsRasterLayer]:
-        """Build BEV WMTS base layer."""
-        wmts_params = {
-            "contextualWMSLegend": "0",
-            "crs": "EPSG:3857",
-            "dpiMode": "7",
-            "format": "image/jpeg",
-            "layers": "bmaporthofoto30cm",
-            "styles": "normal",
-            "tileMatrixSet": "google3857",
-            "url": "https://www.basemap.at/wmts/1.0.0/WMTSCapabilities.xml",
-        }
-        wmts_uri = "&".join(f"{k}={v}" for k, v in wmts_params.items())
-        
-        ortho = QgsRasterLayer(wmts_uri, WMTS_LAYER_NAME, "wms")
-        if not ortho.isValid():
+        """Build BEV WMTS base layer from the cached capabilities document."""
+        ortho = build_orthofoto_layer(self.log)
+        if ortho is None:
             self.log("⚠️  BEV Orthofoto (WMTS) konnte nicht geladen werden.")
-            return None
-        
-        ortho.setOpacity(1.0)
         return ortho
     
-    def _build_project(self, gpkg_path: str, layer_names: List[str], out_qgz: str):
+    def _build_project(self, gpkg_path: str, layer_names: List[str], out_qgz: str, tile_pack: Optional[str] = None) -> bool:
         """Build and save QGIS project from processed layers."""
         proj = QgsProject.instance()
         proj.clear()
         proj.setFileName(out_qgz)
         proj.setCrs(self.target_crs)  # Set CRS FIRST before adding layers
+        apply_fast_open_profile(proj)
+        try:
+            stats = refresh_gpkg_statistics(gpkg_path, layer_names)
+        except sqlite3.Error as e:
+            self.log(f"⚠️  GPKG-Statistiken nicht aktualisiert: {e}")
+            stats = {}
         root = proj.layerTreeRoot()
         
         # Add WMTS base layer FIRST (will be at bottom of layer stack)
@@ -245,12 +514,22 @@ class BEVToQField:
         else:
             self.log("⚠️  BEV Orthofoto konnte nicht hinzugefügt werden")
         
+        # Offline tile pack above the online orthophoto
+        if tile_pack:
+            offline = build_tile_pack_layer(tile_pack)
+            if offline:
+                proj.addMapLayer(offline)
+                self.log("✓ Orthofoto-Kachelpaket hinzugefügt")
+            else:
+                self.log(f"⚠️  Orthofoto-Kachelpaket konnte nicht geladen werden: {tile_pack}")
+        
         # Load vector layers (on top of base layer)
         for ln in layer_names:
-            vl = QgsVectorLayer(f"{gpkg_path}|layername={ln}", ln, "ogr")
+            vl = QgsVectorLayer(f"{gpkg_path}|layername={ln}", ln, "ogr", vector_layer_options())
             if not vl.isValid():
                 self.log(f"⚠️  Layer {ln} konnte nicht geladen werden.")
                 continue
+            mark_reference_layer(vl)
             
             # Style polygon layers with transparent fill
             if vl.geometryType() == QgsWkbTypes.PolygonGeometry:
@@ -261,43 +540,33 @@ class BEVToQField:
                     "outline_width_unit": "MM"
                 })
                 vl.setRenderer(QgsSingleSymbolRenderer(sym))
+            apply_render_profile(vl, feature_count(stats, ln))
             
             proj.addMapLayer(vl)
+        publish_remote_sources(proj)
         if proj.write():
             self.log(f"Projektdatei erfolgreich geschrieben: {out_qgz}")
-        else:
-            self.log("❌ Fehler beim Schreiben der Projektdatei!")
+            return True
+        self.log("❌ Fehler beim Schreiben der Projektdatei!")
+        return False
     
-    def _apply_geoid_heights(self, gpkg_path: str, geoid_tif: str):
-        """Apply geoid height correction to point layers."""
-        for ln in self.written_layers:
+    def _apply_geoid_heights(self, gpkg_path: str, geoid_tif: str, layer_names: List[str]) -> List[str]:
+        """Apply geoid height correction to already written point layers; returns corrected names.
+
+        Only needed for streamed GeoJSON layers; engine-converted layers get
+        their heights in the geoid stage before they are written.
+        """
+        applied = []
+        for ln in layer_names:
+            self._check_cancelled()
             vl = QgsVectorLayer(f"{gpkg_path}|layername={ln}", ln, "ogr")
             if not vl.isValid() or vl.geometryType() != QgsWkbTypes.PointGeometry:
                 continue
             
-            v1 = processing.run(
-                "qgis:rastersampling",
-                {"INPUT": vl, "RASTERCOPY": geoid_tif, "COLUMN_PREFIX": "N_", "OUTPUT": "TEMPORARY_OUTPUT"},
-                feedback=self.feedback
-            )["OUTPUT"]
-            
-            v2 = processing.run(
-                "native:fieldcalculator",
-                {
-                    "INPUT": v1,
-                    "FIELD_NAME": "H_orth",
-                    "FIELD_TYPE": 0,
-                    "FIELD_LENGTH": 20,
-                    "FIELD_PRECISION": 3,
-                    "FORMULA": 'z($geometry) - "N_Band1"',
-                    "OUTPUT": "TEMPORARY_OUTPUT"
-                },
-                feedback=self.feedback
-            )["OUTPUT"]
-            
-            self._write_layer(v2, gpkg_path, ln, False)
-        
-        self.log(f"Orthometrische Höhen berechnet mit {geoid_tif}")
+            corrected = apply_geoid_heights(vl, geoid_tif, feedback=self.step_feedback)
+            if self._write_layer(corrected, gpkg_path, ln, False):
+                applied.append(ln)
+        return applied
     
     def _write_report(self, ntv2_path: Optional[str], geoid_tif: Optional[str], report_path: str):
         """Write processing report."""
@@ -332,37 +601,99 @@ class BEVToQField:
         except Exception as e:
             self.log(f"⚠️ Konnte QField Sync Ordner nicht anlegen: {e}")
     
-    def run(self):
-        """Execute main conversion workflow."""
-        self.config.ensure_dirs()
+    def _select_input_dir(self) -> Optional[str]:
+        """Ask the user for the input directory below the rawdata root."""
+        start_dir_path = rawdata_dir(str(self.config.base)) or str(self.config.base / "01_BEV_Rawdata")
+        return QFileDialog.getExistingDirectory(None, "Ordner mit BEV-Rawdata auswählen", start_dir_path) or None
+    
+    def _check_zip_source(self, archive: str, folder: str):
+        """Fail early if archive is missing, unreadable or lacks folder."""
+        if not os.path.isfile(archive):
+            raise RuntimeError(f"ZIP-Archiv nicht gefunden: {archive}")
+        try:
+            listing = list_zip_folder(archive, folder, recursive=True)
+        except (OSError, zipfile.BadZipFile) as err:
+            raise RuntimeError(f"ZIP-Archiv nicht lesbar: {archive} ({err})") from err
+        if not listing:
+            raise RuntimeError(f"Ordner {folder} nicht im ZIP-Archiv gefunden: {archive}")
+    
+    def run(self, dir_raw: Optional[str] = None, out_basename: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Execute main conversion workflow.
         
-        # Get input directory
-        start_dir_path = self.config.base / "01_BEV_Rawdata"
-        if not start_dir_path.exists():
-            start_dir_path = self.config.base / "01_BEV_Rohdaten"
-        start_dir = str(start_dir_path)
-        dir_raw = QFileDialog.getExistingDirectory(None, "Ordner mit BEV-Rawdata auswählen", start_dir)
-        if not dir_raw:
-            print("❌ Kein Ordner ausgewählt – Abbruch.")
-            return
+        Args:
+            dir_raw: Input folder, or ``archive.zip!/<KG-Nr>`` to read the
+                inputs from a ZIP via /vsizip/ without extracting it.
+                If omitted, a folder dialog is shown.
+            out_basename: Output name part (``kataster_<out_basename>_qfield``).
+                Defaults to the input folder name.
+        
+        Returns:
+            Result summary dict, or None if the folder dialog was cancelled.
+        """
+        self.config.ensure_dirs()
+        self.written_layers = []
+
+        zip_source = split_zip_source(dir_raw)
+        if dir_raw is None:
+            dir_raw = self._select_input_dir()
+            if not dir_raw:
+                print("❌ Kein Ordner ausgewählt – Abbruch.")
+                return None
+        elif zip_source:
+            self._check_zip_source(*zip_source)
+        elif not os.path.isdir(dir_raw):
+            raise RuntimeError(f"Quellordner nicht gefunden: {dir_raw}")
         
         self.log(f"📂 Eingabeordner: {dir_raw}")
+        if zip_source:
+            self.log(f"📦 Direkt aus ZIP gelesen (/vsizip/), kein Entpacken: {zip_source[0]}")
+        
+        basename = out_basename or os.path.basename(dir_raw.rstrip("/\\"))
+        
+        result: Dict[str, Any] = {
+            "source_folder": dir_raw,
+            "target_gpkg": None,
+            "output_qgz": None,
+            "report_path": None,
+            "ntv2_grid": None,
+            "geoid_grid": None,
+            "geoid_applied_layers": [],
+            "imported_layers": self.written_layers,
+            "skipped_layers": [],
+            "failed_layers": [],
+            "source_archive": zip_source[0] if zip_source else None,
+            "extracted": zip_source is None,
+        }
+        
+        try:
+            self._convert(dir_raw, basename, result)
+        except ConversionCancelled:
+            result["cancelled"] = True
+        except QgsProcessingException:
+            if not self.feedback.isCanceled():
+                raise
+            result["cancelled"] = True
+        finally:
+            self.step_feedback = self.feedback
+            # Drops the temporary GPKG, so a cancelled run leaves no partial output
+            shutil.rmtree(self.config.run_temp_dir, ignore_errors=True)
         
-        basename = os.path.basename(dir_raw.rstrip("/\\"))
+        if result.get("cancelled"):
+            self.log("⏹️  Konvertierung abgebrochen – bestehende Ausgaben bleiben unverändert.")
+        else:
+            record_conversion(dir_raw, os.path.basename(dir_raw.rstrip("/\\")))
+        return result
+    
+    def _convert(self, dir_raw: str, basename: str, result: Dict[str, Any]):
+        """Run the conversion steps, filling result in place."""
         out_gpkg = self.config.dir_out / f"kataster_{basename}_qfield.gpkg"
         out_qgz = self.config.dir_out / f"kataster_{basename}_qfield.qgz"
         out_rpt = self.config.dir_out / f"kataster_{basename}_qfield_report.txt"
         tmp_gpkg = self.config.run_temp_dir / TEMP_GPKG_NAME
         
-        # Collect input layers
-        layers = self.collect_layers(dir_raw)
-        if not layers:
-            self.log("Keine Eingabedaten gefunden.")
-            return
-        self.log(f"{len(layers)} Eingabe-Layer gefunden.")
-        
         # Setup coordinate transformation
         ntv2_path = self._find_ntv2_grid()
+        result["ntv2_grid"] = ntv2_path
         operation = ""
         if ntv2_path:
             # Quote the path in case it contains spaces
@@ -376,24 +707,97 @@ class BEVToQField:
         else:
             self.log("WARN: Kein *.gsb gefunden – NTv2 wird NICHT erzwungen!")
         
-        # Process layers
-        first_write = True
-        for idx, src in enumerate(layers, 1):
-            self.log(f"[{idx}/{len(layers)}] {src.name()}")
-            
-            inlyr = self._ensure_crs(src)
-            inlyr = self._fix_geometries(inlyr)
-            reproj = self._reproject_layer(inlyr, operation)
-            
-            lname = self._safe_name(src.name())
-            if self._write_layer(reproj, str(tmp_gpkg), lname, first_write):
-                first_write = False
+        geoid_tif = self._find_geoid()
+        if not (geoid_tif and os.path.exists(geoid_tif)):
+            self.log("Kein Geoid-Raster gefunden – Höhen bleiben ellipsoidisch.")
+            geoid_tif = None
+        
+        # Results are collected straight into the result dict
+        run = ConversionRun(
+            dir_raw,
+            str(tmp_gpkg),
+            {
+                "crs_source": QgsCoordinateReferenceSystem(self.config.SRC_CRS),
+                "crs_target": self.target_crs,
+                "operation": operation,
+                "geoid_grid": geoid_tif,
+                "fix_geometries": bool(self.config.FIX_GEOM),
+                "transform_context": self.transform_ctx,
+                "ntv2_grid": ntv2_path,
+                "out_qgz": str(out_qgz),
+                "out_rpt": str(out_rpt),
+                "tile_pack": bool(self.config.ORTHO_TILE_PACK),
+                "tile_zoom": self.config.ORTHO_TILE_ZOOM,
+            },
+        )
+        run.written_layers = self.written_layers
+        run.failed_layers = result["failed_layers"]
+        run.skipped_layers = result["skipped_layers"]
+        run.geoid_applied_layers = result["geoid_applied_layers"]
+        run.is_canceled = self.feedback.isCanceled
+        run.on_job_start = self._on_job_start
+        run.log = self.log
+        self.engine = build_engine(
+            cache=FileBackedCache(
+                self.layer_cache, _session_cache_dir(), self._save_cached_layer, self._load_cached_layer
+            ),
+            discover=self._discover_stage,
+            load=None,
+            project=self._project_stage,
+            report=self._report_stage,
+        )
+        result["stage_timings"] = self.engine.timings
+        
+        # Collect input layers
+        self.engine.run(run, ("discover",))
+        if not run.jobs and not self.stream_sources:
+            self.log("Keine Eingabedaten gefunden.")
+            result["failed_layers"].append("Keine Eingabedaten gefunden")
+            return
+        self.log(f"{len(run.jobs) + len(self.stream_sources)} Eingabe-Layer gefunden.")
+        
+        # One progress step per input layer plus geoid and project steps
+        total_steps = len(run.jobs) + len(self.stream_sources) + 2
+        self.step_feedback = QgsProcessingMultiStepFeedback(total_steps, self.feedback)
+        run.settings["feedback"] = self.step_feedback
+        step = len(run.jobs)
+        
+        # Fix → reproject → geoid → write → index per layer
+        failed_before = len(run.failed_layers)
+        self.engine.run(run, LAYER_STAGES)
+        for msg in run.failed_layers[failed_before:]:
+            self.log(f"❌ {msg}")
+        
+        # Large GeoJSON inputs are streamed in batches with constant memory
+        streamed = []
+        for path in self.stream_sources:
+            self._check_cancelled()
+            self.step_feedback.setCurrentStep(step)
+            step += 1
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.log(f"[Stream] {name}")
+            lname = self._safe_name(name)
+            if self._stream_geojson_layer(path, str(tmp_gpkg), lname, operation, not tmp_gpkg.exists()):
                 self.written_layers.append(lname)
+                streamed.append(lname)
+            else:
+                result["failed_layers"].append(f"{name}: Streaming-Export fehlgeschlagen")
         
         if not tmp_gpkg.exists():
             self.log("❌ Abbruchhinweis: kataster_qfield.gpkg existiert nicht – bitte Logs oben prüfen.")
             return
         
+        # Streamed layers get geoid heights on the temporary GPKG so the output only appears complete
+        self.step_feedback.setCurrentStep(step)
+        step += 1
+        if geoid_tif:
+            result["geoid_grid"] = geoid_tif
+            result["geoid_applied_layers"].extend(self._apply_geoid_heights(str(tmp_gpkg), geoid_tif, streamed))
+            self.log(f"Orthometrische Höhen berechnet mit {geoid_tif}")
+        
+        # Last cancellation point: afterwards the previous output is replaced
+        self._check_cancelled()
+        
         # Move output GPKG
         try:
             if out_gpkg.exists():
@@ -404,20 +808,19 @@ class BEVToQField:
             shutil.copy2(str(tmp_gpkg), str(out_gpkg))
         
         self.log(f"📦 Output-GPKG bereit: {out_gpkg}")
+        result["target_gpkg"] = str(out_gpkg)
+        run.target_gpkg = str(out_gpkg)
         
-        # Apply geoid heights if available
-        geoid_tif = self._find_geoid()
-        if geoid_tif and os.path.exists(geoid_tif):
-            self._apply_geoid_heights(str(out_gpkg), geoid_tif)
-        else:
-            self.log("Kein Geoid-Raster gefunden – Höhen bleiben ellipsoidisch.")
-        
-        # Build QGIS project
-        self._build_project(str(out_gpkg), self.written_layers, str(out_qgz))
-        
-        # Write report
-        self._write_report(ntv2_path, geoid_tif, str(out_rpt))
+        # Optional offline orthophoto, then QGIS project and report
+        self.step_feedback.setCurrentStep(step)
+        self.engine.run(run, RUN_STAGES)
+        result["output_qgz"] = run.outputs.get("project")
+        result["report_path"] = run.outputs.get("report")
+        result["tile_pack"] = run.outputs.get("tiles")
         
+        self.log(self.engine.timing_summary())
+        self.log(self.layer_cache.summary())
+        result["layer_cache"] = self.layer_cache.stats()
         self.log(f"Fertig: {out_gpkg}")
         self.log(f"Projekt: {out_qgz}")
         self.log(f"Report:  {out_rpt}")
@@ -431,6 +834,9 @@ class BEVToQField:
                 os.startfile(str(out_qgz))
             except Exception as e:
                 self.log(f"ℹ️ Konnte QGIS-Projekt nicht automatisch öffnen: {e}")
+        
+        self.feedback.setProgress(100)
+
 
 
 def run_standalone():
@@ -442,9 +848,87 @@ def run_standalone():
         converter.run()
     finally:
         # Only exit QGIS if we created the app ourselves (standalone mode)
-        if _qgs_app_is_standalone:
+        if _qgs_app_is_standalone and _qgs_app is not None:
+            _qgs_app.exitQgis()
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="BEV to QField converter (headless).")
+    parser.add_argument(
+        "--source",
+        required=True,
+        help="Input folder with BEV data (SHP/GPKG/GeoJSON), or archive.zip!/<KG-Nr> to read it from a ZIP without extracting",
+    )
+    parser.add_argument("--base-path", help="Workspace root (default: QFC_BASE_PATH or detected workbench folder)")
+    parser.add_argument("--out-basename", help="Output name part, default: input folder name")
+    parser.add_argument("--no-fix-geom", action="store_true", help="Skip geometry repair")
+    parser.add_argument("--ortho-tiles", action="store_true", help="Build an offline orthophoto MBTiles pack")
+    parser.add_argument("--ortho-zoom", default="14-18", help="Zoom range of the orthophoto tile pack (default 14-18)")
+    parser.add_argument("--template-project", action="store_true", help="Write the .qgz from the project template (faster)")
+    parser.add_argument("--no-sync-dir", action="store_true", help="Do not create the QField sync folder")
+    parser.add_argument("--summary-json", help="Optional output file for machine-readable summary json")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    """Run a non-interactive conversion; returns a process exit code.
+
+    0 on success, 1 for failed layers or a cancelled run, 2 if the conversion
+    could not run at all. The summary JSON is written in every case; its
+    ``status`` is ``ok``, ``partial``, ``cancelled`` or ``failed``.
+    """
+    args = parse_args(argv)
+    source = os.path.normpath(args.source)
+    error = None
+    try:
+        config = BEVToQFieldConfig(args.base_path or _resolve_default_base_path())
+        config.FIX_GEOM = not args.no_fix_geom
+        config.MAKE_SYNC_DIR = not args.no_sync_dir
+        config.ORTHO_TILE_PACK = args.ortho_tiles
+        config.TEMPLATE_PROJECT = args.template_project
+        config.ORTHO_TILE_ZOOM = parse_zoom_range(args.ortho_zoom)
+        result = BEVToQField(config).run(dir_raw=source, out_basename=args.out_basename)
+    except Exception as err:
+        # Still leave a summary behind so batch callers can see why the run failed.
+        error = str(err)
+        print(f"❌ Konvertierung fehlgeschlagen: {error}", file=sys.stderr)
+        result = {
+            "source_folder": source,
+            "target_gpkg": None,
+            "imported_layers": [],
+            "skipped_layers": [],
+            "failed_layers": [f"Konvertierung fehlgeschlagen: {error}"],
+            "error": error,
+        }
+    finally:
+        if _qgs_app_is_standalone and _qgs_app is not None:
             _qgs_app.exitQgis()
 
+    if error is not None:
+        result["status"] = "failed"
+    elif result.get("cancelled"):
+        result["status"] = "cancelled"
+    elif result["failed_layers"]:
+        result["status"] = "partial"
+        print(
+            f"⚠️  Konvertierung nur teilweise erfolgreich: {len(result['failed_layers'])} Fehler",
+            file=sys.stderr,
+        )
+        for item in result["failed_layers"]:
+            print(f"   - {item}", file=sys.stderr)
+    else:
+        result["status"] = "ok"
+
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, ensure_ascii=False, indent=2)
+
+    if error is not None:
+        return 2
+    return 0 if result["status"] == "ok" else 1
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     run_standalone()
@@ -9,8 +9,6 @@ from pathlib import Path
 from qgis.core import QgsMessageLog, QgsApplication
 from qgis.gui import QgisInterface
 
-from .bev_converter import BEVToQFieldDialog
-
 
 class BEVToQFieldPlugin:
     """Main plugin class for BEV to QField Converter."""
@@ -90,6 +88,10 @@ class BEVToQFieldPlugin:
     def run(self):
         """Execute the main converter dialog."""
         try:
+            # Imported on first use so loading the plugin does not pull in
+            # the converter core and QGIS Processing.
+            from .bev_converter import BEVToQFieldDialog
+            
             dialog = BEVToQFieldDialog(self.iface)
             dialog.exec_()
         except Exception as e:
@@ -0,0 +1,197 @@
+"""Staged conversion engine shared by the Kataster CLI/plugin and the BEV converter.
+
+A run walks fixed stages::
+
+    discover → load → fix → reproject → geoid → write → index → tiles → project → report
+
+``discover`` returns one ``LayerJob`` per input, the layer stages run once per
+job and ``tiles``/``project``/``report`` run once per run. Every stage is a plain
+callable that a front-end can replace or disable, every call is timed, and
+layer stages with a cache key reuse results from a ``get``/``put`` cache such
+as ``LayerCache``. The module is QGIS-independent so it can be covered by
+standard unit tests; the default QGIS stages live in ``conversion_stages``.
+"""
+
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+STAGES = ("discover", "load", "fix", "reproject", "geoid", "write", "index", "tiles", "project", "report")
+LAYER_STAGES = ("load", "fix", "reproject", "geoid", "write", "index")
+RUN_STAGES = ("tiles", "project", "report")
+CONVERT_STAGES = STAGES[:STAGES.index("project")]
+FINISH_STAGES = ("project", "report")
+
+
+class ConversionCancelled(RuntimeError):
+    """Raised at a stage boundary when the run was cancelled."""
+
+
+class SkipLayer(Exception):
+    """Raised by a layer stage to drop the current input without counting it as failed."""
+
+
+class LayerJob:
+    """One input dataset moving through the layer stages."""
+
+    def __init__(self, source: str, name: str, layer_name: Optional[str] = None):
+        self.source = source
+        self.name = name
+        self.layer_name = layer_name or name
+        self.layer: Any = None
+        self.source_key: Optional[Hashable] = None
+        self.cache_size = 0
+
+
+class ConversionRun:
+    """Settings, progress hooks and results of one engine run.
+
+    ``settings`` carries front-end specific values for the stages (CRS,
+    transformation operation, grids, Processing context/feedback, ...).
+    """
+
+    def __init__(self, source_folder: str, target_gpkg: str, settings: Optional[Dict[str, Any]] = None):
+        self.source_folder = source_folder
+        self.target_gpkg = target_gpkg
+        self.settings: Dict[str, Any] = dict(settings or {})
+        self.jobs: List[LayerJob] = []
+        self.written_layers: List[str] = []
+        self.skipped_layers: List[str] = []
+        self.failed_layers: List[str] = []
+        self.geoid_applied_layers: List[str] = []
+        self.outputs: Dict[str, Any] = {}
+        self.is_canceled: Callable[[], bool] = lambda: False
+        self.on_job_start: Optional[Callable[[int, int, LayerJob], None]] = None
+        self.log: Callable[[str], None] = lambda msg: None
+
+
+class Stage:
+    """A named stage callable with an optional cache key function."""
+
+    def __init__(self, name: str, func: Callable, cache_key: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.cache_key = cache_key
+
+
+class ConversionEngine:
+    """Run the conversion stages in order with timing, caching and cancellation."""
+
+    def __init__(self, stages: Optional[Dict[str, Callable]] = None, cache: Any = None, clock: Callable[[], float] = time.perf_counter):
+        self._stages: Dict[str, Optional[Stage]] = {name: None for name in STAGES}
+        for name, func in (stages or {}).items():
+            self.set_stage(name, func)
+        self.cache = cache
+        self.clock = clock
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def set_stage(self, name: str, func: Optional[Callable], cache_key: Optional[Callable] = None) -> None:
+        """Replace a stage; ``func=None`` disables it."""
+        if name not in self._stages:
+            raise ValueError(f"Unbekannte Stufe: {name}")
+        self._stages[name] = Stage(name, func, cache_key) if func is not None else None
+
+    def stage(self, name: str) -> Optional[Stage]:
+        return self._stages[name]
+
+    def _record(self, name: str, seconds: float = 0.0, cached: bool = False) -> None:
+        entry = self.timings.setdefault(name, {"seconds": 0.0, "calls": 0, "cached": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        if cached:
+            entry["cached"] += 1
+
+    def _timed(self, name: str, func: Callable, *args) -> Any:
+        start = self.clock()
+        try:
+            return func(*args)
+        finally:
+            self._record(name, self.clock() - start)
+
+    @staticmethod
+    def check_cancelled(run: ConversionRun) -> None:
+        if run.is_canceled():
+            raise ConversionCancelled("Konvertierung abgebrochen")
+
+    def _cache_key(self, stage: Stage, run: ConversionRun, job: LayerJob) -> Optional[Hashable]:
+        if self.cache is None or stage.cache_key is None:
+            return None
+        return stage.cache_key(run, job)
+
+    def _resume_from_cache(self, run: ConversionRun, job: LayerJob, names: List[str]) -> List[str]:
+        """Return the stages still to run after the latest cached stage result, if any."""
+        for pos in range(len(names) - 1, -1, -1):
+            stage = self._stages[names[pos]]
+            key = self._cache_key(stage, run, job)
+            if key is None or key not in self.cache:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                continue
+            job.layer = cached
+            self._record(names[pos], cached=True)
+            return names[pos + 1:]
+        return names
+
+    def run_layer(self, run: ConversionRun, job: LayerJob, stages: Iterable[str] = LAYER_STAGES) -> bool:
+        """Run the layer stages for one job. Returns False if it was skipped or failed."""
+        selected = set(stages)
+        names = [name for name in LAYER_STAGES if name in selected and self._stages[name] is not None]
+        for name in self._resume_from_cache(run, job, names):
+            stage = self._stages[name]
+            self.check_cancelled(run)
+            try:
+                result = self._timed(name, stage.func, run, job)
+            except SkipLayer as reason:
+                run.skipped_layers.append(f"{job.name}: {reason}")
+                return False
+            except ConversionCancelled:
+                raise
+            except Exception as err:
+                if run.is_canceled():
+                    raise ConversionCancelled("Konvertierung abgebrochen") from err
+                run.failed_layers.append(f"{job.name}: {err}")
+                return False
+            if result is not None:
+                job.layer = result
+            key = self._cache_key(stage, run, job)
+            if key is not None:
+                self.cache.put(key, job.layer, job.cache_size)
+        if "write" in names:
+            run.written_layers.append(job.layer_name)
+        return True
+
+    def run(self, run: ConversionRun, stages: Iterable[str] = STAGES) -> ConversionRun:
+        """Run the selected stages; raises ConversionCancelled at a stage boundary."""
+        selected = set(stages)
+        discover = self._stages["discover"]
+        if "discover" in selected and discover is not None:
+            self.check_cancelled(run)
+            run.jobs = list(self._timed("discover", discover.func, run) or [])
+
+        if selected.intersection(LAYER_STAGES):
+            total = len(run.jobs)
+            for index, job in enumerate(run.jobs):
+                self.check_cancelled(run)
+                if run.on_job_start is not None:
+                    run.on_job_start(index, total, job)
+                self.run_layer(run, job, selected)
+
+        for name in RUN_STAGES:
+            stage = self._stages[name]
+            if name in selected and stage is not None:
+                self.check_cancelled(run)
+                run.outputs[name] = self._timed(name, stage.func, run)
+        return run
+
+    def timing_summary(self) -> str:
+        parts = []
+        for name in STAGES:
+            entry = self.timings.get(name)
+            if not entry:
+                continue
+            text = f"{name} {entry['seconds']:.2f}s"
+            if entry["calls"] > 1:
+                text += f" ({entry['calls']}x"
+                text += f", {entry['cached']} aus Cache)" if entry["cached"] else ")"
+            parts.append(text)
+        return "Stufen-Zeiten: " + (", ".join(parts) if parts else "keine")
@@ -0,0 +1,279 @@
+"""Default QGIS implementations of the conversion engine stages.
+
+Stages read their inputs from ``run.settings``:
+
+- ``crs_source`` / ``crs_target``: ``QgsCoordinateReferenceSystem``
+- ``operation``: PROJ pipeline string for the reprojection ("" = QGIS default)
+- ``geoid_grid``: geoid raster for orthometric heights (optional)
+- ``accept``: filename predicate for ``discover_files``; a source folder of the
+  form ``archive.zip!/<KG-Nr>`` is listed from the archive and read via /vsizip/
+- ``geometry_types``: allowed ``QgsWkbTypes`` geometry types (optional)
+- ``fix_geometries``: run ``native:fixgeometries`` before reprojecting
+- ``context`` / ``feedback``: Processing context and feedback (optional)
+- ``transform_context``: ``QgsCoordinateTransformContext`` for writing
+- ``tile_pack``: build an offline orthophoto MBTiles file for the KG extent
+- ``tile_zoom`` / ``tile_pack_path``: zoom range (min, max) and output path of the tile pack
+"""
+
+import math
+import os
+
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCoordinateTransformContext,
+    QgsFeatureSource,
+    QgsRectangle,
+    QgsVectorFileWriter,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+
+try:
+    from . import tile_pack
+    from .conversion_engine import ConversionEngine, LayerJob, SkipLayer
+    from .zip_source import list_zip_folder, split_zip_source, vsizip_path
+except ImportError:  # pragma: no cover - direct script execution fallback
+    import tile_pack  # type: ignore
+    from conversion_engine import ConversionEngine, LayerJob, SkipLayer  # type: ignore
+    from zip_source import list_zip_folder, split_zip_source, vsizip_path  # type: ignore
+
+
+def _processing():
+    import processing
+    return processing
+
+
+def _run_algorithm(run, algorithm, params):
+    return _processing().run(
+        algorithm,
+        params,
+        context=run.settings.get("context"),
+        feedback=run.settings.get("feedback"),
+    )["OUTPUT"]
+
+
+def discover_files(run):
+    """List files of the source folder accepted by ``settings['accept']``, sorted by name."""
+    accept = run.settings.get("accept") or (lambda filename: True)
+    jobs = []
+    zip_source = split_zip_source(run.source_folder)
+    if zip_source:
+        archive, folder = zip_source
+        for member, filename, _size in list_zip_folder(archive, folder):
+            if accept(filename):
+                jobs.append(LayerJob(vsizip_path(archive, member), filename, os.path.splitext(filename)[0]))
+        return jobs
+    for filename in sorted(os.listdir(run.source_folder)):
+        if not accept(filename):
+            continue
+        jobs.append(LayerJob(os.path.join(run.source_folder, filename), filename, os.path.splitext(filename)[0]))
+    return jobs
+
+
+def load_ogr_layer(run, job):
+    layer = QgsVectorLayer(job.source, job.name, "ogr")
+    if not layer.isValid():
+        raise RuntimeError("Layer konnte nicht geladen werden")
+
+    crs_source = run.settings.get("crs_source")
+    if crs_source is not None and (not layer.crs().isValid() or layer.crs().authid() == ""):
+        layer.setCrs(crs_source)
+
+    geometry_types = run.settings.get("geometry_types")
+    if geometry_types and QgsWkbTypes.geometryType(layer.wkbType()) not in geometry_types:
+        raise SkipLayer("nicht unterstützter Geometrietyp")
+    return layer
+
+
+def fix_geometries(run, job):
+    if not run.settings.get("fix_geometries"):
+        return None
+    if QgsWkbTypes.geometryType(job.layer.wkbType()) == QgsWkbTypes.UnknownGeometry:
+        return None
+    return _run_algorithm(run, "native:fixgeometries", {"INPUT": job.layer, "METHOD": 0, "OUTPUT": "TEMPORARY_OUTPUT"})
+
+
+def reproject(run, job):
+    try:
+        reprojected = _run_algorithm(
+            run,
+            "native:reprojectlayer",
+            {
+                "INPUT": job.layer,
+                "TARGET_CRS": run.settings["crs_target"],
+                "OPERATION": run.settings.get("operation") or "",
+                "OUTPUT": "TEMPORARY_OUTPUT",
+            },
+        )
+    except Exception as err:
+        raise RuntimeError(f"Reprojektion fehlgeschlagen ({err})") from err
+
+    extent = reprojected.extent()
+    extent_values = [extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()]
+    if not all(math.isfinite(value) for value in extent_values):
+        raise RuntimeError(f"Reprojektion lieferte ungültige Ausdehnung {extent_values}")
+    return reprojected
+
+
+def reprojected_cache_key(run, job):
+    """Cache key for the reprojected layer: source files, operation and fix flag."""
+    if not job.source_key:
+        return None
+    return ("reprojected", job.source_key, run.settings.get("operation") or "", bool(run.settings.get("fix_geometries")))
+
+
+def geoid_band_field_name(layer, prefix="N_"):
+    for field in layer.fields():
+        name = field.name()
+        if name.startswith(prefix):
+            return name
+    return None
+
+
+def apply_geoid_heights(layer, geoid_tif, context=None, feedback=None):
+    """Sample the geoid raster and add ``H_orth`` = z - N to a point layer."""
+    processing = _processing()
+    sampled = processing.run(
+        "qgis:rastersampling",
+        {"INPUT": layer, "RASTERCOPY": geoid_tif, "COLUMN_PREFIX": "N_", "OUTPUT": "TEMPORARY_OUTPUT"},
+        context=context,
+        feedback=feedback,
+    )["OUTPUT"]
+
+    sampled_field = geoid_band_field_name(sampled)
+    if not sampled_field:
+        raise RuntimeError("Geoid-Rastersampling lieferte kein Höhenfeld mit Prefix N_.")
+
+    return processing.run(
+        "native:fieldcalculator",
+        {
+            "INPUT": sampled,
+            "FIELD_NAME": "H_orth",
+            "FIELD_TYPE": 0,
+            "FIELD_LENGTH": 20,
+            "FIELD_PRECISION": 3,
+            "FORMULA": f'z($geometry) - "{sampled_field}"',
+            "OUTPUT": "TEMPORARY_OUTPUT",
+        },
+        context=context,
+        feedback=feedback,
+    )["OUTPUT"]
+
+
+def geoid(run, job):
+    geoid_grid = run.settings.get("geoid_grid")
+    if not geoid_grid or QgsWkbTypes.geometryType(job.layer.wkbType()) != QgsWkbTypes.PointGeometry:
+        return None
+    if not QgsWkbTypes.hasZ(job.layer.wkbType()):
+        run.skipped_layers.append(f"{job.name}: Höhengrid verfügbar, aber Geometrie hat keine Z-Werte")
+        return None
+    try:
+        corrected = apply_geoid_heights(
+            job.layer, geoid_grid, context=run.settings.get("context"), feedback=run.settings.get("feedback")
+        )
+    except Exception as err:
+        raise RuntimeError(f"Höhengrid-Korrektur fehlgeschlagen ({err})") from err
+    run.geoid_applied_layers.append(job.layer_name)
+    return corrected
+
+
+def write_gpkg(run, job):
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = "GPKG"
+    options.layerName = job.layer_name
+    options.fileEncoding = "UTF-8"
+    if os.path.exists(run.target_gpkg):
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+    else:
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+
+    transform_context = run.settings.get("transform_context") or QgsCoordinateTransformContext()
+    err, msg = QgsVectorFileWriter.writeAsVectorFormatV2(job.layer, run.target_gpkg, transform_context, options)[:2]
+    if err != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Exportfehler ({msg})")
+    run.log(f"✔️  geschrieben: {job.layer_name}")
+    return None
+
+
+def ensure_spatial_index(run, job):
+    """Verify the written table loads and has a spatial index (created if missing)."""
+    written = QgsVectorLayer(f"{run.target_gpkg}|layername={job.layer_name}", job.layer_name, "ogr")
+    if not written.isValid():
+        raise RuntimeError("Konnte nach Export nicht aus GPKG geladen werden")
+    provider = written.dataProvider()
+    if provider.hasSpatialIndex() == QgsFeatureSource.SpatialIndexNotPresent:
+        provider.createSpatialIndex()
+    return None
+
+
+def tile_pack_path(target_gpkg):
+    return os.path.splitext(target_gpkg)[0] + "_orthofoto.mbtiles"
+
+
+def build_tile_pack(run):
+    """Prefetch orthophoto tiles for the extent of the written layers into an MBTiles file.
+
+    Returns the MBTiles path or None. A failed download is reported as skipped
+    so it does not fail the conversion; the online orthophoto stays available.
+    """
+    if not run.settings.get("tile_pack") or not os.path.exists(run.target_gpkg):
+        return None
+
+    try:
+        extent = tile_pack.gpkg_extent(run.target_gpkg, run.written_layers or None)
+        if extent is None:
+            raise RuntimeError("keine Ausdehnung in gpkg_contents")
+        (min_x, min_y, max_x, max_y), srs_id = extent
+        transform = QgsCoordinateTransform(
+            QgsCoordinateReferenceSystem(f"EPSG:{srs_id}"),
+            QgsCoordinateReferenceSystem("EPSG:4326"),
+            run.settings.get("transform_context") or QgsCoordinateTransformContext(),
+        )
+        bbox = transform.transformBoundingBox(QgsRectangle(min_x, min_y, max_x, max_y))
+        min_zoom, max_zoom = run.settings.get("tile_zoom") or (tile_pack.DEFAULT_MIN_ZOOM, tile_pack.DEFAULT_MAX_ZOOM)
+        path = run.settings.get("tile_pack_path") or tile_pack_path(run.target_gpkg)
+        feedback = run.settings.get("feedback")
+        stats = tile_pack.build_mbtiles(
+            path,
+            (bbox.xMinimum(), bbox.yMinimum(), bbox.xMaximum(), bbox.yMaximum()),
+            min_zoom,
+            max_zoom,
+            is_canceled=run.is_canceled,
+            on_progress=(lambda done, total: feedback.setProgress(100.0 * done / max(1, total))) if feedback else None,
+        )
+    except (OSError, RuntimeError, ValueError) as err:
+        run.skipped_layers.append(f"Orthofoto-Kachelpaket: {err}")
+        return None
+    ConversionEngine.check_cancelled(run)
+
+    run.outputs["tile_stats"] = stats
+    run.log(
+        f"🗺️  Orthofoto-Kachelpaket: {stats['downloaded']} geladen, {stats['existing']} vorhanden, "
+        f"{stats['failed']} fehlgeschlagen ({stats['bytes'] / 1048576:.1f} MB, {stats['seconds']:.1f}s) → {path}"
+    )
+    if not stats["downloaded"] and not stats["existing"]:
+        run.skipped_layers.append("Orthofoto-Kachelpaket: keine Kacheln geladen")
+        return None
+    return path
+
+
+def build_engine(cache=None, **stages):
+    """Return an engine with the default QGIS stages; keyword args replace stages (None disables)."""
+    engine = ConversionEngine(
+        {
+            "discover": discover_files,
+            "load": load_ogr_layer,
+            "fix": fix_geometries,
+            "reproject": reproject,
+            "geoid": geoid,
+            "write": write_gpkg,
+            "index": ensure_spatial_index,
+            "tiles": build_tile_pack,
+        },
+        cache=cache,
+    )
+    engine.set_stage("reproject", reproject, cache_key=reprojected_cache_key)
+    for name, func in stages.items():
+        engine.set_stage(name, func, reprojected_cache_key if name == "reproject" else None)
+    return engine
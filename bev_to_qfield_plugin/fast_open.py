@@ -0,0 +1,127 @@
+"""Fast-open profile for generated QGIS/QField projects.
+
+Projects open faster on tablets when QGIS/QField can trust the stored layer
+metadata instead of probing every GPKG layer:
+
+- the project trusts stored layer statistics, which also skips the provider
+  checks of primary keys, geometry types and SRIDs, and provider-side default
+  values are not evaluated;
+- extents in ``gpkg_contents`` and feature counts in ``gpkg_ogr_contents``
+  are filled in before the project is written, so they never need a scan;
+- converted BEV layers are reference data and are marked read-only
+  (``QFC_EDITABLE_LAYERS`` lists layers that stay editable).
+
+``QFC_FAST_OPEN=0`` turns the profile off. The statistics helpers are
+QGIS-independent; the QGIS helpers import ``qgis.core`` on first use.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Optional, Sequence
+
+FAST_OPEN = os.environ.get("QFC_FAST_OPEN", "1") != "0"
+
+
+def editable_layer_names() -> set:
+    return {name.strip().lower() for name in os.environ.get("QFC_EDITABLE_LAYERS", "").split(",") if name.strip()}
+
+
+def is_reference_layer(layer_name: str) -> bool:
+    """Converted BEV layers are read-only reference data unless listed in QFC_EDITABLE_LAYERS."""
+    return layer_name.lower() not in editable_layer_names()
+
+
+def _table_exists(conn, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def refresh_gpkg_statistics(gpkg_path: str, tables: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+    """Fill missing extents and feature counts of GPKG feature tables and return them.
+
+    Extents come from the R-tree index, counts from ``COUNT(*)``; values that
+    are already stored are kept. ``gpkg_ogr_contents`` is only updated when
+    it exists, since OGR keeps it current through its own triggers.
+    """
+    wanted = {name.lower() for name in tables} if tables is not None else None
+    stats: Dict[str, Dict] = {}
+    with sqlite3.connect(gpkg_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT c.table_name, c.min_x, c.min_y, c.max_x, c.max_y, g.column_name
+            FROM gpkg_contents c
+            LEFT JOIN gpkg_geometry_columns g ON g.table_name = c.table_name
+            WHERE c.data_type = 'features'
+            """
+        ).fetchall()
+        has_ogr_contents = _table_exists(conn, "gpkg_ogr_contents")
+
+        for table, min_x, min_y, max_x, max_y, geom_column in rows:
+            if wanted is not None and table.lower() not in wanted:
+                continue
+            extent = (min_x, min_y, max_x, max_y)
+            rtree = f"rtree_{table}_{geom_column}"
+            if None in extent and geom_column and _table_exists(conn, rtree):
+                extent = conn.execute(f"SELECT MIN(minx), MIN(miny), MAX(maxx), MAX(maxy) FROM {_quote(rtree)}").fetchone()
+                if None not in extent:
+                    conn.execute(
+                        "UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ? WHERE table_name = ?",
+                        (*extent, table),
+                    )
+
+            count = None
+            if has_ogr_contents:
+                row = conn.execute(
+                    "SELECT feature_count FROM gpkg_ogr_contents WHERE lower(table_name) = lower(?)", (table,)
+                ).fetchone()
+                count = row[0] if row else None
+            if count is None:
+                count = conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0]
+                if has_ogr_contents:
+                    conn.execute("DELETE FROM gpkg_ogr_contents WHERE lower(table_name) = lower(?)", (table,))
+                    conn.execute("INSERT INTO gpkg_ogr_contents (table_name, feature_count) VALUES (?, ?)", (table, count))
+
+            stats[table] = {"extent": tuple(extent) if None not in extent else None, "feature_count": count}
+    return stats
+
+
+def feature_count(stats: Dict[str, Dict], layer_name: str) -> Optional[int]:
+    """Feature count of a layer from ``refresh_gpkg_statistics`` output (case-insensitive)."""
+    for table, values in stats.items():
+        if table.lower() == layer_name.lower():
+            return values.get("feature_count")
+    return None
+
+
+def vector_layer_options():
+    """``QgsVectorLayer.LayerOptions`` for project writers: no default style lookup or CRS prompt."""
+    from qgis.core import QgsProject, QgsVectorLayer
+
+    options = QgsVectorLayer.LayerOptions(QgsProject.instance().transformContext())
+    options.loadDefaultStyle = False
+    options.readExtentFromXml = FAST_OPEN
+    options.skipCrsValidation = True
+    return options
+
+
+def apply_fast_open_profile(project) -> None:
+    """Trust stored layer statistics and skip provider-side default values when the project is opened."""
+    if not FAST_OPEN:
+        return
+    from qgis.core import Qgis
+
+    flags = getattr(Qgis, "ProjectFlag", None)
+    if flags is not None and hasattr(project, "setFlag"):
+        project.setFlag(flags.TrustStoredLayerStatistics, True)
+        project.setFlag(flags.EvaluateDefaultValuesOnProviderSide, False)
+    else:  # QGIS < 3.26
+        project.setTrustLayerMetadata(True)
+        project.setEvaluateDefaultValues(False)
+
+
+def mark_reference_layer(layer) -> None:
+    if FAST_OPEN and is_reference_layer(layer.name()):
+        layer.setReadOnly(True)
@@ -0,0 +1,233 @@
+"""Incremental GeoJSON FeatureCollection reader with bounded memory.
+
+OGR's GeoJSON driver parses the whole document before the first feature is
+available. This reader decodes one feature at a time from a chunked text
+stream so large files can be fed to the writer in fixed-size batches.
+The module is QGIS-independent so it can be covered by standard unit tests.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+_WHITESPACE = " \t\n\r"
+_MULTI_TYPES = {
+    "Point": "MultiPoint",
+    "MultiPoint": "MultiPoint",
+    "LineString": "MultiLineString",
+    "MultiLineString": "MultiLineString",
+    "Polygon": "MultiPolygon",
+    "MultiPolygon": "MultiPolygon",
+}
+
+
+class _ChunkReader:
+    """Sliding text buffer over a file handle."""
+
+    def __init__(self, handle, chunk_size: int, on_progress: Optional[Callable[[int], None]] = None):
+        self.handle = handle
+        self.chunk_size = max(1, int(chunk_size))
+        self.on_progress = on_progress
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.chars_read = 0
+
+    def fill(self) -> bool:
+        """Read another chunk, dropping consumed text. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        if self.on_progress is not None:
+            self.on_progress(self.chars_read)
+        return True
+
+    def peek(self) -> str:
+        """Return next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid GeoJSON: expected '{char}', found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decode the next complete JSON value, reading more text as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise ValueError("Invalid GeoJSON: truncated value")
+            # Numbers/literals may continue in the next chunk.
+            if end >= len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_features(
+    path: str,
+    members: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield features of a GeoJSON file one at a time.
+
+    Top-level members other than ``features`` (e.g. ``crs``, ``name``) are
+    collected into ``members`` as they are encountered. A bare ``Feature``
+    document yields itself. ``on_progress`` receives the number of characters
+    read so far after each chunk.
+    """
+    if members is None:
+        members = {}
+    decoder = json.JSONDecoder()
+
+    with open(path, "r", encoding="utf-8-sig") as handle:
+        reader = _ChunkReader(handle, chunk_size, on_progress)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+
+        while True:
+            key = reader.value(decoder)
+            if not isinstance(key, str):
+                raise ValueError("Invalid GeoJSON: object key must be a string")
+            reader.expect(":")
+
+            if key == "features":
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        feature = reader.value(decoder)
+                        if isinstance(feature, dict):
+                            yield feature
+                        sep = reader.peek()
+                        reader.pos += 1
+                        if sep == "]":
+                            break
+                        if sep != ",":
+                            raise ValueError(f"Invalid GeoJSON: unexpected '{sep or 'EOF'}' in features array")
+            else:
+                members[key] = reader.value(decoder)
+
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == "}":
+                break
+            if sep != ",":
+                raise ValueError(f"Invalid GeoJSON: unexpected '{sep or 'EOF'}' after member '{key}'")
+
+    if members.get("type") == "Feature":
+        yield dict(members)
+
+
+def iter_batches(features: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group an iterable of features into lists of at most batch_size items."""
+    batch_size = max(1, int(batch_size))
+    batch: List[Dict[str, Any]] = []
+    for feature in features:
+        batch.append(feature)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def property_schema(
+    features: Iterable[Dict[str, Any]], geometry_types: Optional[Set[Tuple[str, bool]]] = None
+) -> Dict[str, Any]:
+    """Union of all feature properties as {name: sample value}, in first-seen order.
+
+    The sample is the first non-null value of a property. An int sample is
+    widened to a float one and other mixed types fall back to a string, so a
+    field typed from the sample can hold every value of the column. With
+    ``geometry_types``, the (GeoJSON type, has Z) pairs seen are added to it
+    in the same pass.
+    """
+    samples: Dict[str, Any] = {}
+    for feature in features:
+        geom = feature.get("geometry")
+        if geometry_types is not None and isinstance(geom, dict) and geom.get("type"):
+            geometry_types.add((str(geom["type"]), _has_z(geom.get("coordinates"))))
+        props = feature.get("properties")
+        if not isinstance(props, dict):
+            continue
+        for name, value in props.items():
+            current = samples.get(name)
+            if current is None:
+                samples[name] = value
+            elif value is None or type(value) is type(current):
+                continue
+            elif _is_number(current) and _is_number(value):
+                samples[name] = float(current)
+            else:
+                samples[name] = str(current)
+    return samples
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _has_z(coordinates: Any) -> bool:
+    while isinstance(coordinates, list) and coordinates and isinstance(coordinates[0], list):
+        coordinates = coordinates[0]
+    return isinstance(coordinates, list) and len(coordinates) > 2
+
+
+def multi_geometry_type(geometry_types: Iterable[Tuple[str, bool]]) -> Optional[str]:
+    """Common multi type (WKT name, e.g. ``MultiPolygonZ``) for the collected geometry types.
+
+    Single and multi variants of one family share the multi type. Returns
+    None for no geometries, mixed families or GeometryCollections.
+    """
+    families = set()
+    has_z = False
+    for name, z in geometry_types:
+        families.add(_MULTI_TYPES.get(name))
+        has_z = has_z or z
+    if len(families) != 1 or None in families:
+        return None
+    return families.pop() + ("Z" if has_z else "")
+
+
+def crs_name(members: Dict[str, Any]) -> Optional[str]:
+    """Return the legacy named CRS of a GeoJSON document, if present."""
+    crs = members.get("crs")
+    if not isinstance(crs, dict):
+        return None
+    props = crs.get("properties")
+    if not isinstance(props, dict):
+        return None
+    name = props.get("name")
+    return str(name) if name else None
+
+
+def should_stream(path: str, threshold_bytes: int) -> bool:
+    """Return True for GeoJSON files at or above the streaming size threshold."""
+    if not path.lower().endswith((".geojson", ".json")):
+        return False
+    try:
+        return os.path.getsize(path) >= threshold_bytes
+    except OSError:
+        return False
@@ -0,0 +1,221 @@
+"""Bounded LRU cache for layers reused across converter runs.
+
+The cache itself is QGIS-independent so it can be covered by standard unit
+tests. Keys are built from file path, mtime and size so edits to an input file
+invalidate its cached entries automatically.
+
+Runs execute in different threads, so a cache shared between them must only
+hold plain values. ``FileBackedCache`` keeps layers as files and stores just
+their paths; each lookup re-opens the file in the calling thread.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SHAPEFILE_SIDECARS = (".dbf", ".shx", ".prj", ".cpg")
+
+
+def file_stamp(path: str) -> Optional[Tuple[str, int, int]]:
+    """Return (normalized path, mtime_ns, size) or None if the file is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    norm = os.path.normcase(os.path.abspath(path))
+    return norm, stat.st_mtime_ns, stat.st_size
+
+
+def source_key(path: str) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+    """Return a cache key for an input dataset including shapefile sidecars."""
+    main = file_stamp(path)
+    if main is None:
+        return None
+    stamps = [main]
+    stem, ext = os.path.splitext(path)
+    if ext.lower() == ".shp":
+        for sidecar in SHAPEFILE_SIDECARS:
+            for candidate in (stem + sidecar, stem + sidecar.upper()):
+                stamp = file_stamp(candidate)
+                if stamp is not None:
+                    stamps.append(stamp)
+                    break
+    return tuple(stamps)
+
+
+def source_footprint(key: Optional[Tuple[Tuple[str, int, int], ...]]) -> int:
+    """Estimate the memory footprint of a cached dataset from its file sizes."""
+    if not key:
+        return 0
+    return sum(stamp[2] for stamp in key)
+
+
+class LayerCache:
+    """Thread-safe LRU cache evicting by estimated memory footprint."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key (or None) and update counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> bool:
+        """Store value under key. Returns False if it exceeds the cache budget."""
+        size = max(0, int(size))
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            if size > self.max_bytes:
+                return False
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                evicted_key, (evicted_value, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                evicted.append((evicted_key, evicted_value))
+        if self.on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_key, evicted_value)
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+    def get_or_load(self, key: Optional[Hashable], loader: Callable[[], Any], size: int = 0) -> Any:
+        """Return cached value or call loader and cache a non-None result."""
+        if key is None:
+            return loader()
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = loader()
+        if value is not None:
+            self.put(key, value, size)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        used_mb = stats["bytes"] / (1024 * 1024)
+        max_mb = stats["max_bytes"] / (1024 * 1024)
+        return (
+            f"Layer-Cache: {stats['hits']} Treffer, {stats['misses']} Fehlgriffe, "
+            f"{stats['evictions']} verdrängt, {stats['entries']} Einträge "
+            f"({used_mb:.1f}/{max_mb:.0f} MB)"
+        )
+
+
+class CachedFile(str):
+    """Path of a file written by a ``FileBackedCache``."""
+
+
+class FileBackedCache:
+    """Engine cache view that stores values as files in a shared ``LayerCache``.
+
+    ``save(value, path)`` writes a value and returns True on success,
+    ``load(path)`` re-opens it (or returns None). Only file paths enter
+    ``cache``, sized by their bytes on disk. Files of evicted entries are
+    removed when ``cache`` was built with ``remove_cached_file`` as
+    ``on_evict``.
+    """
+
+    def __init__(
+        self,
+        cache: LayerCache,
+        directory: str,
+        save: Callable[[Any, str], bool],
+        load: Callable[[str], Any],
+        suffix: str = ".gpkg",
+    ):
+        self.cache = cache
+        self.directory = directory
+        self.save = save
+        self.load = load
+        self.suffix = suffix
+
+    def path_for(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.cache
+
+    def get(self, key: Hashable) -> Any:
+        path = self.cache.get(key)
+        if path is None:
+            return None
+        if not os.path.isfile(path):
+            self.cache.discard(key)
+            return None
+        return self.load(path)
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> bool:
+        """Write value to its cache file; ``size`` is ignored in favour of the file size."""
+        path = self.path_for(key)
+        os.makedirs(self.directory, exist_ok=True)
+        if not self.save(value, path):
+            remove_cached_file(key, CachedFile(path))
+            return False
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        if not self.cache.put(key, CachedFile(path), size):
+            remove_cached_file(key, CachedFile(path))
+            return False
+        return True
+
+
+def remove_cached_file(key: Hashable, value: Any) -> None:
+    """``on_evict`` hook for caches shared with ``FileBackedCache``: delete its files."""
+    if isinstance(value, CachedFile) and os.path.isfile(value):
+        try:
+            os.remove(value)
+        except OSError:
+            pass  # still open elsewhere; the session cache folder is removed at exit
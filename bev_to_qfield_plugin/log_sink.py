@@ -0,0 +1,101 @@
+"""Buffered log channel and background log-file writer for the converter UI.
+
+Worker threads append messages to a ``BufferedLogChannel``; the dialog drains
+it on a timer so the Qt event loop sees one text update per frame instead of
+one per message. The full log goes to a file through ``BackgroundLogWriter``.
+Both classes are QGIS-independent so they can be covered by standard unit tests.
+"""
+
+import datetime
+import queue
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+DEFAULT_FLUSH_INTERVAL_MS = 100
+DEFAULT_MAX_PENDING = 5000
+DEFAULT_SCROLLBACK_LINES = 2000
+
+
+class BufferedLogChannel:
+    """Thread-safe bounded message buffer.
+
+    When more than ``max_pending`` messages pile up between drains the oldest
+    ones are dropped from the UI buffer (they are still in the log file) and
+    reported as a single summary line on the next drain.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        self.max_pending = max(1, int(max_pending))
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def put(self, msg: str) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._dropped += 1
+            self._pending.append(msg)
+
+    def drain(self) -> Tuple[List[str], int]:
+        """Return (pending messages, number dropped since last drain)."""
+        with self._lock:
+            messages = list(self._pending)
+            self._pending.clear()
+            dropped = self._dropped
+            self._dropped = 0
+        return messages, dropped
+
+    def drain_text(self) -> str:
+        """Return pending messages joined into one block ('' if nothing pending)."""
+        messages, dropped = self.drain()
+        if dropped:
+            messages.insert(0, f"... {dropped} Meldungen ausgelassen (siehe Logdatei)")
+        return "\n".join(messages)
+
+
+class BackgroundLogWriter:
+    """Append log lines to a file from a dedicated daemon thread."""
+
+    _STOP = object()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="bev2qfield-log-writer", daemon=True)
+        self._error: Optional[BaseException] = None
+        self._thread.start()
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._error
+
+    def write(self, msg: str) -> None:
+        ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._queue.put(f"[{ts}] {msg}\n")
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending lines and stop the writer thread."""
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                while True:
+                    item = self._queue.get()
+                    lines = []
+                    while item is not self._STOP:
+                        lines.append(item)
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                    if lines:
+                        handle.writelines(lines)
+                        handle.flush()
+                    if item is self._STOP:
+                        return
+        except OSError as err:
+            self._error = err
@@ -0,0 +1,102 @@
+"""BEV orthophoto (basemap.at WMTS) layer shared by the converter front-ends.
+
+The layer is built from the locally cached capabilities document
+(``wmts_cache``). When a project is written, the cached file URL is swapped
+back to the public capabilities URL so the saved project works anywhere.
+An optional offline tile pack (``tile_pack``) is added above it so QField
+shows the orthophoto of the KG without a connection.
+"""
+
+from typing import Callable, Optional
+
+from qgis.core import QgsRasterLayer
+
+try:
+    from . import wmts_cache
+    from .tile_pack import TILE_PACK_LAYER_NAME
+    from .wmts_cache import ORTHOFOTO_LAYER_NAME
+except ImportError:  # pragma: no cover - direct script execution fallback
+    import wmts_cache  # type: ignore
+    from tile_pack import TILE_PACK_LAYER_NAME  # type: ignore
+    from wmts_cache import ORTHOFOTO_LAYER_NAME  # type: ignore
+
+_publishing_projects = set()
+
+
+def build_orthofoto_layer(log: Optional[Callable[[str], None]] = None) -> Optional[QgsRasterLayer]:
+    """Return the orthophoto layer or None if no capabilities copy is available or it is invalid."""
+    capabilities = wmts_cache.cached_capabilities()
+    if capabilities is None:
+        if log:
+            log("⚠️  WMTS-Capabilities nicht erreichbar und nicht im Cache – Orthofoto wird übersprungen.")
+        return None
+
+    ortho = QgsRasterLayer(wmts_cache.orthofoto_uri(wmts_cache.file_url(capabilities)), ORTHOFOTO_LAYER_NAME, "wms")
+    if not ortho.isValid():
+        return None
+
+    ortho.setOpacity(1.0)
+    return ortho
+
+
+def build_tile_pack_layer(path: str) -> Optional[QgsRasterLayer]:
+    """Return the offline orthophoto layer for an MBTiles file or None if it cannot be opened."""
+    layer = QgsRasterLayer(path, TILE_PACK_LAYER_NAME, "gdal")
+    return layer if layer.isValid() else None
+
+
+def _move_layer_to_bottom(project, layer_id) -> None:
+    root = project.layerTreeRoot()
+    node = root.findLayer(layer_id)
+    if not node:
+        return
+    parent = node.parent() or root
+    clone = node.clone()
+    parent.removeChildNode(node)
+    parent.addChildNode(clone)
+
+
+def ensure_tile_pack_layer(project, path: str) -> Optional[QgsRasterLayer]:
+    """Add the offline orthophoto layer at the bottom of the layer tree, replacing an older one.
+
+    Callers move the online orthophoto below it afterwards.
+    """
+    for layer in list(project.mapLayers().values()):
+        if isinstance(layer, QgsRasterLayer) and layer.name() == TILE_PACK_LAYER_NAME:
+            project.removeMapLayer(layer.id())
+
+    layer = build_tile_pack_layer(path)
+    if layer is None:
+        return None
+    project.addMapLayer(layer)
+    _move_layer_to_bottom(project, layer.id())
+    return layer
+
+
+def _publish_remote_sources(doc):
+    for tag, attribute in (("datasource", None), ("layer-tree-layer", "source")):
+        nodes = doc.elementsByTagName(tag)
+        for index in range(nodes.count()):
+            element = nodes.at(index).toElement()
+            if attribute:
+                source = element.attribute(attribute)
+                remote = wmts_cache.remote_source(source)
+                if remote != source:
+                    element.setAttribute(attribute, remote)
+                continue
+            text_node = element.firstChild().toText()
+            if text_node.isNull():
+                continue
+            remote = wmts_cache.remote_source(text_node.data())
+            if remote != text_node.data():
+                text_node.setData(remote)
+
+
+def publish_remote_sources(project) -> None:
+    """Write the public capabilities URL instead of the local cache file into project files."""
+    key = id(project)
+    if key in _publishing_projects:
+        return
+    _publishing_projects.add(key)
+    project.writeProject.connect(_publish_remote_sources)
+    project.destroyed.connect(lambda *_args: _publishing_projects.discard(key))
@@ -0,0 +1,282 @@
+"""Template-based QGIS project writer.
+
+Fills the pre-styled ``templates/*.qgs``/``*.xml`` snippets with the layer
+datasources, extents and CRS read from ``gpkg_contents``,
+``gpkg_geometry_columns`` and ``gpkg_spatial_ref_sys`` and zips the result
+into a ``.qgz``. No data provider is opened, so it is much faster than
+building the project through ``QgsProject`` for batch runs. The module is
+QGIS-independent so it can be covered by standard unit tests; the layer
+order and styles mirror the ``QgsProject`` based writers, including the
+``fast_open`` and ``render_profile`` settings.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import zipfile
+from pathlib import Path
+from string import Template
+from typing import Callable, Dict, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+try:
+    from . import fast_open as fast_open_profile
+    from . import wmts_cache
+    from .render_profile import render_settings
+    from .tile_pack import TILE_PACK_LAYER_NAME
+    from .wmts_cache import ORTHOFOTO_LAYER_NAME
+except ImportError:  # pragma: no cover - direct script execution fallback
+    import fast_open as fast_open_profile  # type: ignore
+    import wmts_cache  # type: ignore
+    from render_profile import render_settings  # type: ignore
+    from tile_pack import TILE_PACK_LAYER_NAME  # type: ignore
+    from wmts_cache import ORTHOFOTO_LAYER_NAME  # type: ignore
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+# Polygon styles: fill colour, fill style, outline colour and width (mm)
+OUTLINE_STYLE = {"fill_color": "0,0,0,0", "fill_style": "solid", "outline_color": "0,0,0,255", "outline_width": "0.3"}
+NO_BRUSH_STYLE = {"fill_color": "190,178,151,255", "fill_style": "no", "outline_color": "35,35,35,255", "outline_width": "0.26"}
+DEFAULT_FILL_STYLE = {"fill_color": "190,178,151,255", "fill_style": "solid", "outline_color": "35,35,35,255", "outline_width": "0.26"}
+LINE_COLOR = "114,155,111,255"
+MARKER_COLOR = "219,30,42,255"
+
+WEB_MERCATOR = {"authid": "EPSG:3857", "srid": "3857", "wkt": "", "description": "WGS 84 / Pseudo-Mercator", "geographic": "false"}
+WEB_MERCATOR_BOUNDS = (-20037508.342789, -20037508.342789, 20037508.342789, 20037508.342789)
+
+_WKB_NAMES = {
+    "POINT": "Point",
+    "LINESTRING": "LineString",
+    "POLYGON": "Polygon",
+    "MULTIPOINT": "MultiPoint",
+    "MULTILINESTRING": "MultiLineString",
+    "MULTIPOLYGON": "MultiPolygon",
+    "CURVEPOLYGON": "CurvePolygon",
+    "MULTISURFACE": "MultiSurface",
+    "MULTICURVE": "MultiCurve",
+    "GEOMETRY": "Unknown",
+}
+_GEOMETRY_KINDS = {
+    "Point": "Point",
+    "MultiPoint": "Point",
+    "LineString": "Line",
+    "MultiLineString": "Line",
+    "MultiCurve": "Line",
+    "Polygon": "Polygon",
+    "MultiPolygon": "Polygon",
+    "CurvePolygon": "Polygon",
+    "MultiSurface": "Polygon",
+}
+
+_templates: Dict[str, Template] = {}
+
+
+def _template(name: str) -> Template:
+    if name not in _templates:
+        _templates[name] = Template((TEMPLATE_DIR / name).read_text(encoding="utf-8"))
+    return _templates[name]
+
+
+def _attr(value) -> str:
+    return escape(str(value), {'"': "&quot;"})
+
+
+def kataster_polygon_style(layer_name: str) -> Dict[str, str]:
+    """Style of the Kataster CLI/plugin projects: GST polygons without fill."""
+    return NO_BRUSH_STYLE if "gst" in layer_name.lower() else DEFAULT_FILL_STYLE
+
+
+def outline_polygon_style(layer_name: str) -> Dict[str, str]:
+    """Style of the BEV converter projects: every polygon layer transparent with black outline."""
+    return OUTLINE_STYLE
+
+
+def read_gpkg_layers(gpkg_path: str, layer_names: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Return name, geometry type, bounds and CRS of the GPKG feature tables.
+
+    With layer_names, the result follows that order and unknown names are left out.
+    """
+    with sqlite3.connect(gpkg_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT c.table_name, c.min_x, c.min_y, c.max_x, c.max_y, c.srs_id,
+                   g.geometry_type_name, g.z, g.m,
+                   s.srs_name, s.organization, s.organization_coordsys_id, s.definition
+            FROM gpkg_contents c
+            LEFT JOIN gpkg_geometry_columns g ON g.table_name = c.table_name
+            LEFT JOIN gpkg_spatial_ref_sys s ON s.srs_id = c.srs_id
+            WHERE c.data_type = 'features'
+            ORDER BY c.table_name
+            """
+        ).fetchall()
+
+    layers = {}
+    for (table, min_x, min_y, max_x, max_y, srs_id, geom_type, has_z, has_m,
+         srs_name, organization, code, definition) in rows:
+        wkb = _WKB_NAMES.get((geom_type or "GEOMETRY").upper(), "Unknown")
+        if wkb != "Unknown":
+            wkb += ("Z" if has_z else "") + ("M" if has_m else "")
+        bounds = (min_x, min_y, max_x, max_y)
+        layers[table.lower()] = {
+            "name": table,
+            "wkb_type": wkb,
+            "geometry": _GEOMETRY_KINDS.get(wkb.rstrip("ZM"), "Unknown geometry"),
+            "bounds": bounds if None not in bounds else None,
+            "crs": {
+                "authid": f"{organization.upper()}:{code}" if organization and code else "",
+                "srid": str(code or srs_id or 0),
+                "wkt": definition if definition and definition != "undefined" else "",
+                "description": srs_name or "",
+                "geographic": "false",
+            },
+        }
+    if layer_names is None:
+        return list(layers.values())
+    return [layers[name.lower()] for name in layer_names if name.lower() in layers]
+
+
+def _crs_xml(crs: Dict[str, str], indent: str = "") -> str:
+    text = _template("crs.xml").substitute({key: escape(value) for key, value in crs.items()})
+    return "\n".join(indent + line if line else line for line in text.rstrip("\n").split("\n"))
+
+
+def _extent_xml(bounds, indent: str) -> str:
+    bounds = bounds or (0.0, 0.0, 0.0, 0.0)
+    tags = ("xmin", "ymin", "xmax", "ymax")
+    return "\n".join(f"{indent}<{tag}>{value!r}</{tag}>" for tag, value in zip(tags, map(float, bounds)))
+
+
+def _layer_id(name: str, source: str) -> str:
+    safe = re.sub(r"[^0-9A-Za-z_]", "_", name)
+    return f"{safe}_{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _relative_source(path: str, project_dir: str) -> str:
+    try:
+        rel = os.path.relpath(path, project_dir).replace("\\", "/")
+    except ValueError:  # different drive on Windows
+        return Path(path).as_posix()
+    return rel if rel.startswith("../") else f"./{rel}"
+
+
+def _renderer_xml(layer: Dict, polygon_style: Callable[[str], Dict[str, str]], force_raster: bool) -> str:
+    geometry = layer["geometry"]
+    force_raster = "1" if force_raster else "0"
+    if geometry == "Polygon":
+        return _template("renderer_fill.xml").substitute(polygon_style(layer["name"]), force_raster=force_raster)
+    if geometry == "Line":
+        return _template("renderer_line.xml").substitute(color=LINE_COLOR, force_raster=force_raster)
+    return _template("renderer_marker.xml").substitute(color=MARKER_COLOR, force_raster=force_raster)
+
+
+def _union(bounds_list):
+    bounds_list = [bounds for bounds in bounds_list if bounds]
+    if not bounds_list:
+        return None
+    return (
+        min(b[0] for b in bounds_list),
+        min(b[1] for b in bounds_list),
+        max(b[2] for b in bounds_list),
+        max(b[3] for b in bounds_list),
+    )
+
+
+def build_project_xml(
+    gpkg_path: str,
+    layer_names: Sequence[str],
+    out_qgz: str,
+    polygon_style: Callable[[str], Dict[str, str]] = kataster_polygon_style,
+    tile_pack: Optional[str] = None,
+    orthofoto: bool = True,
+    fast_open: bool = fast_open_profile.FAST_OPEN,
+) -> str:
+    """Return the ``.qgs`` XML for the GPKG layers, optional tile pack and orthophoto layer."""
+    project_dir = os.path.dirname(os.path.abspath(out_qgz))
+    gpkg_source = _relative_source(os.path.abspath(gpkg_path), project_dir)
+    stats = fast_open_profile.refresh_gpkg_statistics(gpkg_path, layer_names) if fast_open else {}
+    layers = read_gpkg_layers(gpkg_path, layer_names)
+    if not layers:
+        raise ValueError(f"Keine der Layer {list(layer_names)} in {gpkg_path} gefunden")
+    project_crs = layers[0]["crs"]
+    extent = _union(layer["bounds"] for layer in layers)
+
+    # Top to bottom as QGIS builds it: new layers are inserted on top,
+    # offline and online orthophoto stay at the bottom.
+    entries = []
+    for layer in reversed(layers):
+        source = f"{gpkg_source}|layername={layer['name']}"
+        layer_id = _layer_id(layer["name"], source)
+        render = render_settings(layer["geometry"], fast_open_profile.feature_count(stats, layer["name"]))
+        xml = _template("vector_layer.xml").substitute(
+            geometry=layer["geometry"],
+            wkb_type=layer["wkb_type"],
+            extent=_extent_xml(layer["bounds"], " " * 8),
+            id=layer_id,
+            source=escape(source),
+            name=escape(layer["name"]),
+            crs=_crs_xml(layer["crs"], " " * 4),
+            renderer=_renderer_xml(layer, polygon_style, render["force_raster"]),
+            scale_visibility="1" if render["min_scale"] else "0",
+            min_scale=render["min_scale"] or 100000000,
+            simplify_hints="1" if render["simplify_threshold"] else "0",
+            simplify_tolerance=render["simplify_threshold"] or 1,
+            read_only="1" if fast_open and fast_open_profile.is_reference_layer(layer["name"]) else "0",
+        )
+        entries.append((layer_id, layer["name"], source, "ogr", xml))
+
+    rasters = []
+    if tile_pack:
+        rasters.append((TILE_PACK_LAYER_NAME, _relative_source(os.path.abspath(tile_pack), project_dir), "gdal"))
+    if orthofoto:
+        rasters.append((ORTHOFOTO_LAYER_NAME, wmts_cache.orthofoto_uri(wmts_cache.CAPABILITIES_URL), "wms"))
+    for name, source, provider in rasters:
+        layer_id = _layer_id(name, source)
+        xml = _template("raster_layer.xml").substitute(
+            extent=_extent_xml(WEB_MERCATOR_BOUNDS, " " * 8),
+            id=layer_id,
+            source=escape(source),
+            name=escape(name),
+            crs=_crs_xml(WEB_MERCATOR, " " * 4),
+            provider=provider,
+        )
+        entries.append((layer_id, name, source, provider, xml))
+
+    title = os.path.splitext(os.path.basename(out_qgz))[0]
+    return _template("project.qgs").substitute(
+        title=_attr(title),
+        project_flags="TrustStoredLayerStatistics" if fast_open else "",
+        crs=_crs_xml(project_crs),
+        layer_tree="\n".join(
+            _template("layer_tree_layer.xml")
+            .substitute(id=layer_id, name=_attr(name), source=_attr(source), provider=provider)
+            .rstrip("\n")
+            for layer_id, name, source, provider, _xml in entries
+        ),
+        custom_order="\n".join(f"      <item>{entry[0]}</item>" for entry in entries),
+        layer_order="\n".join(f'    <layer id="{entry[0]}"/>' for entry in entries),
+        extent=_extent_xml(extent, " " * 6),
+        project_layers="\n".join(entry[4].rstrip("\n") for entry in entries),
+    )
+
+
+def write_template_project(
+    gpkg_path: str,
+    layer_names: Sequence[str],
+    out_qgz: str,
+    polygon_style: Callable[[str], Dict[str, str]] = kataster_polygon_style,
+    tile_pack: Optional[str] = None,
+    orthofoto: bool = True,
+    fast_open: bool = fast_open_profile.FAST_OPEN,
+) -> str:
+    """Write ``out_qgz`` from the templates and return its path.
+
+    Raises ValueError if none of the layers exist and OSError/sqlite3.Error on I/O problems.
+    """
+    xml = build_project_xml(gpkg_path, layer_names, out_qgz, polygon_style, tile_pack, orthofoto, fast_open)
+    qgs_name = os.path.splitext(os.path.basename(out_qgz))[0] + ".qgs"
+    tmp_path = f"{out_qgz}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(qgs_name, xml)
+    os.replace(tmp_path, out_qgz)
+    return out_qgz
@@ -0,0 +1,103 @@
+"""Render profile of the generated vector layers, per geometry type.
+
+QField redraws every feature at every zoom unless the project limits it. The
+profile below is the single place that defines, per layer type:
+
+- ``dense_feature_count`` / ``min_scale``: layers with at least that many
+  features are only drawn when zoomed in beyond 1:``min_scale``;
+- ``simplify_threshold``: on-the-fly simplification tolerance in pixels
+  (None disables it);
+- ``max_labels`` / ``label_min_feature_size``: label density limits (per
+  layer and render pass, minimum feature size in mm) for labeled layers;
+- ``force_raster``: draw the layer into one image instead of vector
+  primitives; off unless ``QFC_RENDER_RASTERIZE=1``.
+
+``render_settings`` is QGIS-independent; ``apply_render_profile`` imports
+``qgis.core`` on first use.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+FORCE_RASTER = os.environ.get("QFC_RENDER_RASTERIZE", "0") == "1"
+
+RENDER_PROFILE: Dict[str, Dict[str, Any]] = {
+    "Point": {
+        "dense_feature_count": 2000,
+        "min_scale": 5000,
+        "simplify_threshold": None,
+        "max_labels": 200,
+        "label_min_feature_size": 0.0,
+        "force_raster": False,
+    },
+    "Line": {
+        "dense_feature_count": 20000,
+        "min_scale": 25000,
+        "simplify_threshold": 1.0,
+        "max_labels": 300,
+        "label_min_feature_size": 2.0,
+        "force_raster": FORCE_RASTER,
+    },
+    "Polygon": {
+        "dense_feature_count": None,
+        "min_scale": 0,
+        "simplify_threshold": 1.0,
+        "max_labels": 300,
+        "label_min_feature_size": 2.0,
+        "force_raster": FORCE_RASTER,
+    },
+}
+
+
+def render_settings(geometry: str, feature_count: Optional[int] = None) -> Dict[str, Any]:
+    """Return the settings for a layer of geometry ``Point``/``Line``/``Polygon``.
+
+    ``min_scale`` is 0 (always visible) unless the layer is dense.
+    """
+    profile = dict(RENDER_PROFILE.get(geometry, RENDER_PROFILE["Point"]))
+    dense = profile.pop("dense_feature_count")
+    if dense is None or feature_count is None or feature_count < dense:
+        profile["min_scale"] = 0
+    return profile
+
+
+def apply_render_profile(layer, feature_count: Optional[int] = None) -> Dict[str, Any]:
+    """Apply the render profile to a ``QgsVectorLayer`` and return the settings used."""
+    from qgis.core import QgsVectorSimplifyMethod, QgsWkbTypes
+
+    geometry = {
+        QgsWkbTypes.PointGeometry: "Point",
+        QgsWkbTypes.LineGeometry: "Line",
+        QgsWkbTypes.PolygonGeometry: "Polygon",
+    }.get(layer.geometryType(), "Point")
+    settings = render_settings(geometry, feature_count)
+
+    if settings["min_scale"]:
+        layer.setScaleBasedVisibility(True)
+        layer.setMinimumScale(settings["min_scale"])
+        layer.setMaximumScale(0)
+
+    simplify = QgsVectorSimplifyMethod()
+    if settings["simplify_threshold"]:
+        simplify.setSimplifyHints(QgsVectorSimplifyMethod.GeometrySimplification)
+        simplify.setThreshold(settings["simplify_threshold"])
+        simplify.setForceLocalOptimization(True)
+        simplify.setMaximumScale(1)
+    else:
+        simplify.setSimplifyHints(QgsVectorSimplifyMethod.NoSimplification)
+    layer.setSimplifyMethod(simplify)
+
+    labeling = layer.labeling()
+    if labeling is not None and layer.labelsEnabled() and hasattr(labeling, "settings"):
+        label_settings = labeling.settings()
+        thinning = label_settings.thinningSettings()
+        thinning.setLimitNumberOfLabelsEnabled(True)
+        thinning.setMaximumNumberLabels(settings["max_labels"])
+        thinning.setMinimumFeatureSize(settings["label_min_feature_size"])
+        label_settings.setThinningSettings(thinning)
+        labeling.setSettings(label_settings)
+
+    renderer = layer.renderer()
+    if renderer is not None:
+        renderer.setForceRasterRender(bool(settings["force_raster"]))
+    return settings
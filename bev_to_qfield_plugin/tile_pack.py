@@ -0,0 +1,218 @@
+"""Offline orthophoto tile packs (MBTiles) clipped to a KG extent.
+
+Tiles of a Web-Mercator XYZ/WMTS service (basemap.at ``google3857``) are
+fetched concurrently for a zoom range and stored in an MBTiles file next to
+the converted data, so QField can show the orthophoto without a mobile
+connection. Existing tiles are kept, so an interrupted pack can be resumed.
+The module is QGIS-independent so it can be covered by standard unit tests
+against a local tile server.
+"""
+
+import math
+import os
+import sqlite3
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ORTHOFOTO_TILE_URL = os.environ.get(
+    "QFC_ORTHO_TILE_URL",
+    "https://mapsneu.wien.gv.at/basemap/bmaporthofoto30cm/normal/google3857/{z}/{y}/{x}.jpeg",
+)
+TILE_PACK_LAYER_NAME = "BEV Orthofoto (offline)"
+DEFAULT_MIN_ZOOM = 14
+DEFAULT_MAX_ZOOM = 18
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 15.0
+DEFAULT_MAX_TILES = 20000
+DEFAULT_RETRIES = 2
+MAX_MERCATOR_LAT = 85.05112878
+
+Tile = Tuple[int, int, int]
+Bounds = Tuple[float, float, float, float]
+
+
+def gpkg_extent(gpkg_path: str, tables: Optional[Iterable[str]] = None) -> Optional[Tuple[Bounds, int]]:
+    """Return ((min_x, min_y, max_x, max_y), srs_id) over the feature tables of a GeoPackage.
+
+    Extents come from ``gpkg_contents``. Only tables sharing the first table's
+    SRS are merged. Returns None if no extent is recorded.
+    """
+    wanted = {name.lower() for name in tables} if tables is not None else None
+    with sqlite3.connect(gpkg_path) as conn:
+        rows = conn.execute(
+            "SELECT table_name, min_x, min_y, max_x, max_y, srs_id FROM gpkg_contents "
+            "WHERE data_type = 'features' ORDER BY table_name"
+        ).fetchall()
+
+    bounds = None
+    srs_id = None
+    for table_name, min_x, min_y, max_x, max_y, table_srs in rows:
+        if wanted is not None and table_name.lower() not in wanted:
+            continue
+        if None in (min_x, min_y, max_x, max_y):
+            continue
+        if srs_id is None:
+            srs_id = table_srs
+        elif table_srs != srs_id:
+            continue
+        if bounds is None:
+            bounds = (min_x, min_y, max_x, max_y)
+        else:
+            bounds = (min(bounds[0], min_x), min(bounds[1], min_y), max(bounds[2], max_x), max(bounds[3], max_y))
+    return (bounds, srs_id) if bounds is not None else None
+
+
+def parse_zoom_range(value: str) -> Tuple[int, int]:
+    """Parse '14-18' or '16' into (min_zoom, max_zoom)."""
+    parts = [part.strip() for part in str(value).split("-", 1)]
+    min_zoom = int(parts[0])
+    max_zoom = int(parts[1]) if len(parts) > 1 and parts[1] else min_zoom
+    if not 0 <= min_zoom <= max_zoom <= 22:
+        raise ValueError(f"Ungültiger Zoombereich: {value}")
+    return min_zoom, max_zoom
+
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for_bounds(bounds_wgs84: Bounds, min_zoom: int, max_zoom: int) -> Iterator[Tile]:
+    """Yield (z, x, y) XYZ tiles covering a WGS84 (west, south, east, north) box."""
+    west, south, east, north = bounds_wgs84
+    for zoom in range(min_zoom, max_zoom + 1):
+        x_min, y_min = lonlat_to_tile(west, north, zoom)
+        x_max, y_max = lonlat_to_tile(east, south, zoom)
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                yield zoom, x, y
+
+
+def count_tiles(bounds_wgs84: Bounds, min_zoom: int, max_zoom: int) -> int:
+    total = 0
+    west, south, east, north = bounds_wgs84
+    for zoom in range(min_zoom, max_zoom + 1):
+        x_min, y_min = lonlat_to_tile(west, north, zoom)
+        x_max, y_max = lonlat_to_tile(east, south, zoom)
+        total += (x_max - x_min + 1) * (y_max - y_min + 1)
+    return total
+
+
+def _open_mbtiles(path: str, name: str, bounds_wgs84: Bounds, min_zoom: int, max_zoom: int, tile_format: str):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, "
+        "tile_data BLOB, PRIMARY KEY (zoom_level, tile_column, tile_row))"
+    )
+    metadata = {
+        "name": name,
+        "type": "baselayer",
+        "version": "1.0",
+        "description": name,
+        "format": tile_format,
+        "bounds": ",".join(f"{value:.6f}" for value in bounds_wgs84),
+        "minzoom": str(min_zoom),
+        "maxzoom": str(max_zoom),
+    }
+    conn.executemany("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)", metadata.items())
+    conn.commit()
+    return conn
+
+
+def _tms_row(zoom: int, y: int) -> int:
+    return (2 ** zoom - 1) - y
+
+
+def _fetch(url: str, timeout: float, retries: int) -> bytes:
+    last_error: Optional[Exception] = None
+    for attempt in range(retries + 1):
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": "bev2qfield-tile-pack"})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.read()
+        except OSError as err:
+            last_error = err
+            if attempt < retries:
+                time.sleep(0.2 * (attempt + 1))
+    raise last_error  # type: ignore[misc]
+
+
+def build_mbtiles(
+    path: str,
+    bounds_wgs84: Bounds,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    url_template: str = ORTHOFOTO_TILE_URL,
+    name: str = TILE_PACK_LAYER_NAME,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    retries: int = DEFAULT_RETRIES,
+    max_tiles: int = DEFAULT_MAX_TILES,
+    is_canceled: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, float]:
+    """Download the tiles covering bounds into an MBTiles file and return statistics.
+
+    Downloads run on ``workers`` threads; all SQLite writes happen on the
+    calling thread. Tiles already present in the file are not fetched again.
+    Raises ValueError if the request would exceed ``max_tiles``.
+    """
+    total = count_tiles(bounds_wgs84, min_zoom, max_zoom)
+    if total > max_tiles:
+        raise ValueError(
+            f"Kachelpaket zu groß: {total} Kacheln (Limit {max_tiles}) – Zoombereich {min_zoom}-{max_zoom} verkleinern"
+        )
+
+    tile_format = "png" if url_template.lower().endswith(".png") else "jpg"
+    started = time.perf_counter()
+    stats = {"tiles": total, "downloaded": 0, "existing": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+
+    conn = _open_mbtiles(path, name, bounds_wgs84, min_zoom, max_zoom, tile_format)
+    try:
+        existing = set(conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles"))
+        pending: List[Tile] = []
+        for zoom, x, y in tiles_for_bounds(bounds_wgs84, min_zoom, max_zoom):
+            if (zoom, x, _tms_row(zoom, y)) in existing:
+                stats["existing"] += 1
+            else:
+                pending.append((zoom, x, y))
+
+        def download(tile: Tile) -> Tuple[Tile, Optional[bytes]]:
+            if is_canceled is not None and is_canceled():
+                return tile, None
+            zoom, x, y = tile
+            try:
+                return tile, _fetch(url_template.format(z=zoom, x=x, y=y), timeout, retries)
+            except OSError:
+                return tile, None
+
+        done = stats["existing"]
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            for (zoom, x, y), data in pool.map(download, pending):
+                done += 1
+                if data:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)",
+                        (zoom, x, _tms_row(zoom, y), sqlite3.Binary(data)),
+                    )
+                    stats["downloaded"] += 1
+                    stats["bytes"] += len(data)
+                else:
+                    stats["failed"] += 1
+                if done % 200 == 0:
+                    conn.commit()
+                if on_progress is not None:
+                    on_progress(done, total)
+        conn.commit()
+    finally:
+        conn.close()
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
@@ -0,0 +1,115 @@
+"""On-disk cache for WMTS capabilities documents.
+
+The basemap.at orthophoto layer is built from a local copy of the
+capabilities XML, so creating the layer and writing a project do not wait on
+a capabilities download. The copy is refreshed after ``ttl_seconds``, with a
+short download timeout. If a refresh fails, the stale copy is used. The module
+is QGIS-independent so it can be covered by standard unit tests against a
+local HTTP server.
+"""
+
+import hashlib
+import os
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+CAPABILITIES_URL = "https://www.basemap.at/wmts/1.0.0/WMTSCapabilities.xml"
+ORTHOFOTO_LAYER_NAME = "BEV Orthofoto (basemap.at)"
+DEFAULT_TTL_SECONDS = int(float(os.environ.get("QFC_WMTS_CACHE_TTL_HOURS", "168")) * 3600)
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get("QFC_WMTS_TIMEOUT", "5"))
+MAX_CAPABILITIES_BYTES = 32 * 1024 * 1024
+
+ORTHOFOTO_WMTS_PARAMS: Dict[str, str] = {
+    "contextualWMSLegend": "0",
+    "crs": "EPSG:3857",
+    "dpiMode": "7",
+    "format": "image/jpeg",
+    "layers": "bmaporthofoto30cm",
+    "styles": "normal",
+    "tileMatrixSet": "google3857",
+}
+
+
+def default_cache_dir() -> Path:
+    """Return the cache folder (QFC_WMTS_CACHE_DIR or the local QGIS work folder)."""
+    explicit = os.environ.get("QFC_WMTS_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    local_root = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(local_root) / "QGIS_Work" / "wmts_cache"
+
+
+def cache_path_for(url: str, cache_dir: Optional[Path] = None) -> Path:
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir or default_cache_dir()) / f"capabilities_{digest}.xml"
+
+
+def _looks_like_capabilities(payload: bytes) -> bool:
+    head = payload[:4096].lstrip()
+    return head.startswith(b"<") and b"Capabilities" in head
+
+
+def _download(url: str, timeout: float) -> bytes:
+    request = urllib.request.Request(url, headers={"User-Agent": "bev2qfield-wmts-cache"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        payload = response.read(MAX_CAPABILITIES_BYTES + 1)
+    if len(payload) > MAX_CAPABILITIES_BYTES:
+        raise ValueError("Capabilities-Dokument zu groß")
+    if not _looks_like_capabilities(payload):
+        raise ValueError("Antwort ist kein WMTS-Capabilities-Dokument")
+    return payload
+
+
+def cached_capabilities(
+    url: str = CAPABILITIES_URL,
+    cache_dir: Optional[Path] = None,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    now: Optional[float] = None,
+) -> Optional[Path]:
+    """Return a local capabilities file for url, downloading it when missing or older than the TTL.
+
+    A failed refresh falls back to the stale copy; None means no copy is available.
+    """
+    path = cache_path_for(url, cache_dir)
+    now = time.time() if now is None else now
+    try:
+        age = now - path.stat().st_mtime
+    except OSError:
+        age = None
+    if age is not None and 0 <= age < ttl_seconds:
+        return path
+
+    try:
+        payload = _download(url, timeout)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        return path
+    except (OSError, ValueError):
+        return path if age is not None else None
+
+
+def file_url(path: Path) -> str:
+    return Path(path).resolve().as_uri()
+
+
+def orthofoto_uri(capabilities_url: str) -> str:
+    """Build the WMS-provider URI of the orthophoto layer for a capabilities URL."""
+    params = dict(ORTHOFOTO_WMTS_PARAMS, url=capabilities_url)
+    return "&".join(f"{key}={value}" for key, value in params.items())
+
+
+def remote_source(source: str, urls: Iterable[str] = (CAPABILITIES_URL,), cache_dir: Optional[Path] = None) -> str:
+    """Replace cached capabilities file URLs in a layer source with their remote URL.
+
+    Used when writing projects so the saved ``.qgz`` works on other devices.
+    """
+    for url in urls:
+        local = file_url(cache_path_for(url, cache_dir))
+        if local in source:
+            source = source.replace(local, url)
+    return source
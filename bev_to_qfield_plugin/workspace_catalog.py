@@ -0,0 +1,334 @@
+"""Catalog of the ``bev-qfield-workbench-data`` workspace.
+
+One scan records the workspace layout (rawdata, grids and output folders),
+the NTv2/geoid grids and, per extracted KG folder (5-digit name below
+``01_BEV_Rawdata``/``01_BEV_Rohdaten``), its files with sizes, the layer
+type and feature count of each shapefile, the conversion outputs and the
+time of the last conversion. The catalog is stored as JSON in
+``02_QGIS_Processing/workspace_catalog.json``.
+
+Refreshes are incremental: a KG entry is only re-read when the mtime of its
+folder or one of its subfolders changed; outputs and grids are cheap to list
+and are re-read on every refresh. Shapefile types and counts come from the
+``.shp``/``.shx`` headers, so no GIS library is needed. The module is
+QGIS-independent so it can be covered by standard unit tests.
+"""
+
+import datetime
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+CATALOG_VERSION = 1
+CATALOG_FILE_NAME = "workspace_catalog.json"
+RAWDATA_DIR_NAMES = ("01_BEV_Rawdata", "01_BEV_Rohdaten")
+PROCESSING_DIR_NAME = "02_QGIS_Processing"
+OUTPUT_DIR_NAME = "03_QField_Output"
+SYNC_DIR_NAME = "04_QField_Sync"
+NTV2_PATTERN = "*.gsb"
+GEOID_PATTERN = "GV_Hoehengrid*.tif"
+
+_KG_DIR = re.compile(r"\d{5}")
+_OUTPUT_NAME = re.compile(r"kataster_(\d{5})(?:_.*)?$", flags=re.IGNORECASE)
+_SHAPE_TYPES = {
+    0: "Null",
+    1: "Point", 11: "Point", 21: "Point",
+    8: "Point", 18: "Point", 28: "Point",
+    3: "Line", 13: "Line", 23: "Line",
+    5: "Polygon", 15: "Polygon", 25: "Polygon",
+    31: "MultiPatch",
+}
+
+
+def find_workspace(path: str) -> Optional[str]:
+    """Return the workspace root containing path (or path itself), identified by its numbered folders."""
+    current = Path(path).resolve()
+    names = {name.lower() for name in (*RAWDATA_DIR_NAMES, PROCESSING_DIR_NAME, OUTPUT_DIR_NAME)}
+    for candidate in (current, *current.parents):
+        if candidate.name.lower() in names:
+            continue
+        try:
+            children = {entry.name.lower() for entry in os.scandir(candidate) if entry.is_dir()}
+        except OSError:
+            continue
+        if children & {name.lower() for name in RAWDATA_DIR_NAMES} or OUTPUT_DIR_NAME.lower() in children:
+            return str(candidate)
+    return None
+
+
+def rawdata_dir(workspace: str) -> Optional[str]:
+    """Return the rawdata folder of the workspace (``01_BEV_Rawdata`` before the legacy name)."""
+    for name in RAWDATA_DIR_NAMES:
+        candidate = os.path.join(workspace, name)
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def grids_dir(workspace: str) -> str:
+    return os.path.join(workspace, PROCESSING_DIR_NAME, "grids")
+
+
+def output_dir(workspace: str) -> str:
+    return os.path.join(workspace, OUTPUT_DIR_NAME)
+
+
+def catalog_path(workspace: str) -> str:
+    return os.path.join(workspace, PROCESSING_DIR_NAME, CATALOG_FILE_NAME)
+
+
+def _walk_files(root: str, max_depth: Optional[int] = None):
+    """Yield (dir_entry, depth) for files below root; dirs are listed before descending."""
+    stack = [(root, 1)]
+    while stack:
+        folder, depth = stack.pop()
+        try:
+            entries = sorted(os.scandir(folder), key=lambda item: item.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth is None or depth < max_depth:
+                        stack.append((entry.path, depth + 1))
+                elif entry.is_file():
+                    yield entry, depth
+            except OSError:
+                continue
+
+
+def tree_stamp(root: str) -> Optional[str]:
+    """Hash over the mtimes of root and all its subfolders; None if root is missing.
+
+    Adding, removing or renaming a file changes the mtime of its folder, so
+    an unchanged stamp means the file list is unchanged.
+    """
+    digest = hashlib.sha1()
+    stack = [root]
+    found = False
+    while stack:
+        folder = stack.pop()
+        try:
+            stat = os.stat(folder)
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        found = True
+        digest.update(f"{os.path.relpath(folder, root)}:{stat.st_mtime_ns};".encode("utf-8"))
+        stack.extend(sorted((entry.path for entry in entries if entry.is_dir(follow_symlinks=False)), reverse=True))
+    return digest.hexdigest() if found else None
+
+
+def shapefile_info(shp_path: str) -> Dict[str, Optional[object]]:
+    """Return layer type (Point/Line/Polygon) and feature count from the .shp/.shx headers."""
+    layer_type = None
+    feature_count = None
+    try:
+        with open(shp_path, "rb") as handle:
+            header = handle.read(36)
+        if len(header) == 36 and struct.unpack(">i", header[:4])[0] == 9994:
+            layer_type = _SHAPE_TYPES.get(struct.unpack("<i", header[32:36])[0], "Unknown")
+    except OSError:
+        pass
+    base = os.path.splitext(shp_path)[0]
+    for ext in (".shx", ".SHX"):
+        try:
+            feature_count = max(0, (os.path.getsize(base + ext) - 100) // 8)
+            break
+        except OSError:
+            continue
+    if feature_count is None:
+        for ext in (".dbf", ".DBF"):
+            try:
+                with open(base + ext, "rb") as handle:
+                    header = handle.read(8)
+                if len(header) == 8:
+                    feature_count = struct.unpack("<I", header[4:8])[0]
+                    break
+            except OSError:
+                continue
+    return {"layer_type": layer_type, "feature_count": feature_count}
+
+
+def scan_kg(kg_dir: str) -> Dict:
+    """Return the catalog entry of one extracted KG folder (without outputs)."""
+    files = []
+    total = 0
+    for entry, _depth in _walk_files(kg_dir):
+        stat = entry.stat()
+        record = {"path": os.path.relpath(entry.path, kg_dir).replace("\\", "/"), "size": stat.st_size}
+        if entry.name.lower().endswith(".shp"):
+            record.update(shapefile_info(entry.path))
+        files.append(record)
+        total += stat.st_size
+    return {"path": kg_dir, "stamp": tree_stamp(kg_dir), "files": files, "total_size": total}
+
+
+def scan_grids(grid_root: str) -> Dict[str, List[str]]:
+    """Return sorted NTv2 (``*.gsb``) and geoid (``GV_Hoehengrid*.tif``) files below grid_root."""
+    grids: Dict[str, List[str]] = {"ntv2": [], "geoid": []}
+    for entry, _depth in _walk_files(grid_root):
+        if fnmatch.fnmatch(entry.name.lower(), NTV2_PATTERN):
+            grids["ntv2"].append(entry.path)
+        elif fnmatch.fnmatch(entry.name.lower(), GEOID_PATTERN.lower()):
+            grids["geoid"].append(entry.path)
+    return {kind: sorted(paths) for kind, paths in grids.items()}
+
+
+def scan_outputs(out_root: str) -> Dict[str, Dict]:
+    """Return {kg: {"gpkg": [...], "qgz": [...], "report": [...], "tile_pack": [...], "last_conversion": iso}}.
+
+    Covers flat outputs and one folder per project (two levels deep).
+    """
+    outputs: Dict[str, Dict] = {}
+    for entry, _depth in _walk_files(out_root, max_depth=2):
+        stem, ext = os.path.splitext(entry.name)
+        match = _OUTPUT_NAME.match(stem)
+        if not match:
+            continue
+        ext = ext.lower()
+        if ext == ".gpkg":
+            kind = "gpkg"
+        elif ext == ".qgz":
+            kind = "qgz"
+        elif ext == ".mbtiles":
+            kind = "tile_pack"
+        elif ext == ".txt" and stem.lower().endswith("_report"):
+            kind = "report"
+        else:
+            continue
+        entry_outputs = outputs.setdefault(match.group(1), {"gpkg": [], "qgz": [], "report": [], "tile_pack": []})
+        entry_outputs[kind].append(entry.path)
+        if kind == "gpkg":
+            converted = entry.stat().st_mtime
+            if converted > entry_outputs.get("_last", 0):
+                entry_outputs["_last"] = converted
+
+    for entry_outputs in outputs.values():
+        last = entry_outputs.pop("_last", None)
+        entry_outputs["last_conversion"] = (
+            datetime.datetime.fromtimestamp(last).isoformat(timespec="seconds") if last else None
+        )
+        for kind in ("gpkg", "qgz", "report", "tile_pack"):
+            entry_outputs[kind].sort()
+    return outputs
+
+
+def load_catalog(workspace: str) -> Dict:
+    """Return the stored catalog, or an empty one if missing, unreadable or of another version."""
+    try:
+        with open(catalog_path(workspace), "r", encoding="utf-8") as handle:
+            catalog = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if catalog.get("version") != CATALOG_VERSION or catalog.get("workspace") != workspace:
+        return {}
+    return catalog
+
+
+def save_catalog(workspace: str, catalog: Dict) -> str:
+    path = catalog_path(workspace)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(catalog, handle, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+def refresh_catalog(workspace: str, only: Optional[Iterable[str]] = None, save: bool = True) -> Dict:
+    """Load, refresh and (by default) save the catalog of workspace.
+
+    KG entries whose folder stamp is unchanged are kept as they are; with
+    ``only``, just those KG numbers are checked. The result has
+    ``refreshed`` (re-read KGs) besides the stored keys.
+    """
+    workspace = str(Path(workspace).resolve())
+    catalog = load_catalog(workspace)
+    previous = catalog.get("kgs", {})
+    raw_root = rawdata_dir(workspace)
+
+    kg_dirs: Dict[str, str] = {}
+    if raw_root:
+        for entry in os.scandir(raw_root):
+            if _KG_DIR.fullmatch(entry.name) and entry.is_dir():
+                kg_dirs[entry.name] = entry.path
+    wanted = set(only) if only is not None else None
+
+    kgs: Dict[str, Dict] = {}
+    refreshed = []
+    for kg, kg_dir in sorted(kg_dirs.items()):
+        old = previous.get(kg)
+        if old and (wanted is not None and kg not in wanted or old.get("stamp") == tree_stamp(kg_dir)):
+            kgs[kg] = old
+            continue
+        kgs[kg] = scan_kg(kg_dir)
+        refreshed.append(kg)
+
+    outputs = scan_outputs(output_dir(workspace))
+    for kg, entry in kgs.items():
+        entry["outputs"] = outputs.get(kg, {"gpkg": [], "qgz": [], "report": [], "tile_pack": [], "last_conversion": None})
+
+    catalog = {
+        "version": CATALOG_VERSION,
+        "workspace": workspace,
+        "rawdata_dir": raw_root,
+        "grids_dir": grids_dir(workspace),
+        "output_dir": output_dir(workspace),
+        "sync_dir": os.path.join(workspace, SYNC_DIR_NAME),
+        "grids": scan_grids(grids_dir(workspace)),
+        "grids_stamp": tree_stamp(grids_dir(workspace)),
+        "kgs": kgs,
+        "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    if save:
+        save_catalog(workspace, catalog)
+    catalog["refreshed"] = refreshed
+    return catalog
+
+
+def kg_entry(catalog: Dict, kg: str) -> Optional[Dict]:
+    return catalog.get("kgs", {}).get(str(kg))
+
+
+def first_grid(catalog: Dict, kind: str) -> Optional[str]:
+    """First grid of kind ``ntv2`` or ``geoid`` that still exists."""
+    for path in catalog.get("grids", {}).get(kind, []):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def catalog_grid(path: str, kind: str) -> Optional[str]:
+    """Grid of kind from the stored catalog of the workspace containing path, without scanning.
+
+    Returns None when the grids folder changed since the catalog was
+    written, so callers fall back to their filesystem search.
+    """
+    workspace = find_workspace(path)
+    if not workspace:
+        return None
+    catalog = load_catalog(workspace)
+    if catalog.get("grids_stamp") != tree_stamp(grids_dir(workspace)):
+        return None
+    return first_grid(catalog, kind)
+
+
+def record_conversion(path: str, kg: str) -> Optional[Dict]:
+    """Refresh the entry of kg and the outputs after a conversion.
+
+    Returns the catalog, or None if path is not inside a workspace or the
+    catalog cannot be written.
+    """
+    workspace = find_workspace(path)
+    if not workspace:
+        return None
+    try:
+        return refresh_catalog(workspace, only=[kg])
+    except OSError:
+        return None
@@ -0,0 +1,96 @@
+"""Read conversion inputs straight from ZIP archives through GDAL's /vsizip/.
+
+A source of the form ``archive.zip!/<KG-Nr>`` names a folder inside a BEV
+archive. The folder is located in the archive's entry listing the same way
+``scripts/extract_kg_from_zip.py`` does it (any path component, case-
+insensitive), and its files are opened as ``/vsizip/<archive>/<member>``, so
+nothing has to be extracted first. The module is QGIS-independent so it can be
+covered by standard unit tests.
+"""
+
+import os
+import re
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .layer_cache import SHAPEFILE_SIDECARS
+except ImportError:  # pragma: no cover - direct script execution fallback
+    from layer_cache import SHAPEFILE_SIDECARS  # type: ignore
+
+ZIP_SOURCE_SEPARATOR = "!"
+VSIZIP_PREFIX = "/vsizip/"
+_ZIP_SOURCE_PATTERN = re.compile(r"^(.+?\.zip)!(.*)$", flags=re.IGNORECASE)
+
+
+def _parts(name: str) -> List[str]:
+    return [part for part in name.replace("\\", "/").split("/") if part and part != "."]
+
+
+def split_zip_source(source: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return (archive path, folder inside the archive) for ``archive.zip!/folder``, else None."""
+    match = _ZIP_SOURCE_PATTERN.match((source or "").strip())
+    if not match:
+        return None
+    folder = "/".join(_parts(match.group(2)))
+    if not folder:
+        return None
+    return os.path.normpath(match.group(1)), folder
+
+
+def is_zip_source(source: Optional[str]) -> bool:
+    return split_zip_source(source) is not None
+
+
+def vsizip_path(archive: str, member: str) -> str:
+    """GDAL virtual path of ``member`` inside ``archive``."""
+    return f"{VSIZIP_PREFIX}{archive.replace(os.sep, '/')}/{member}"
+
+
+def list_zip_folder(archive: str, folder: str, recursive: bool = False) -> List[Tuple[str, str, int]]:
+    """List files below ``folder`` in ``archive`` as (member name, path relative to folder, size).
+
+    ``folder`` may span several components (``nested/51235``); it matches at
+    its first occurrence in each entry path. Without ``recursive`` only files
+    directly in the folder are listed. Raises ``OSError`` or
+    ``zipfile.BadZipFile`` for a missing or broken archive.
+    """
+    wanted = [part.lower() for part in _parts(folder)]
+    width = len(wanted)
+    listing = []
+    with zipfile.ZipFile(archive) as handle:
+        for info in handle.infolist():
+            if info.is_dir():
+                continue
+            parts = _parts(info.filename)
+            lowered = [part.lower() for part in parts]
+            start = next((i for i in range(len(parts) - width) if lowered[i:i + width] == wanted), -1)
+            if start < 0:
+                continue
+            rel_parts = parts[start + width:]
+            if len(rel_parts) > 1 and not recursive:
+                continue
+            listing.append((info.filename, "/".join(rel_parts), info.file_size))
+    return sorted(listing, key=lambda item: item[1].lower())
+
+
+def zip_member_key(archive: str, member: str, sizes: Dict[str, int]) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+    """Layer cache key for a ZIP member, like ``layer_cache.source_key`` for files.
+
+    Each stamp is (archive!member, archive mtime_ns, member size), so the
+    footprint counts the member sizes and any change to the archive
+    invalidates the key. ``sizes`` maps lower-case member names to sizes and is
+    used to find shapefile sidecars.
+    """
+    try:
+        mtime_ns = os.stat(archive).st_mtime_ns
+    except OSError:
+        return None
+    norm = os.path.normcase(os.path.abspath(archive))
+    members = [member]
+    stem, ext = os.path.splitext(member)
+    if ext.lower() == ".shp":
+        members.extend(stem + sidecar for sidecar in SHAPEFILE_SIDECARS if (stem + sidecar).lower() in sizes)
+    return tuple(
+        (f"{norm}{ZIP_SOURCE_SEPARATOR}{name}", mtime_ns, sizes.get(name.lower(), 0)) for name in members
+    )
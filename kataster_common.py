@@ -6,6 +6,9 @@ covered by standard unit tests.
 
 import os
 import re
+import shutil
+
+from bev_to_qfield_plugin.zip_source import split_zip_source
 
 
 _SOURCE_ROOT_PATTERN = re.compile(
@@ -58,9 +61,19 @@ def qgis_base_from_target(target_gpkg):
 
 
 def default_output_path(source_folder):
-    """Build default output GPKG path for a source input folder."""
-    folder_norm = _canonical_path(source_folder)
-    folder_name = os.path.basename(folder_norm.rstrip(os.sep)) or "kataster_output"
+    """Build default output GPKG path for a source input folder.
+
+    For ``archive.zip!/<KG-Nr>`` sources the output goes next to the archive
+    (or below the workspace's 03_QField_Output), never inside the archive.
+    """
+    zip_source = split_zip_source(source_folder)
+    if zip_source:
+        archive, inner = zip_source
+        folder_norm = os.path.dirname(_canonical_path(archive))
+        folder_name = inner.rsplit("/", 1)[-1]
+    else:
+        folder_norm = _canonical_path(source_folder)
+        folder_name = os.path.basename(folder_norm.rstrip(os.sep)) or "kataster_output"
     project_name = f"kataster_{folder_name}_qfield"
 
     match = _SOURCE_ROOT_PATTERN.search(folder_norm)
@@ -89,3 +102,60 @@ def path_action(existed_before, path, kind):
         return None
     action = "Aktualisiert" if existed_before else "Erstellt"
     return {"action": action, "kind": kind, "path": _canonical_path(path)}
+
+
+def plan_layer_reconciliation(existing_layers, written_names):
+    """Match existing project layers against freshly written GPKG tables.
+
+    ``existing_layers`` is a sequence of ``(layer_id, layer_name)`` for the
+    Kataster layers currently in the project. Names are compared
+    case-insensitively. Returns a dict with
+    ``swap`` (``(layer_id, table_name)`` pairs whose data source is re-pointed),
+    ``add`` (table names without a matching layer) and
+    ``remove`` (layer ids that no longer have a table, or duplicates).
+    """
+    remaining = {}
+    for layer_id, layer_name in existing_layers:
+        remaining.setdefault((layer_name or "").lower(), []).append(layer_id)
+
+    swap = []
+    add = []
+    for table_name in written_names:
+        layer_ids = remaining.get(table_name.lower())
+        if layer_ids:
+            swap.append((layer_ids.pop(0), table_name))
+        else:
+            add.append(table_name)
+
+    remove = [layer_id for layer_ids in remaining.values() for layer_id in layer_ids]
+    return {"swap": swap, "add": add, "remove": remove}
+
+
+_SQLITE_SIDECARS = ("-wal", "-shm", "-journal")
+
+
+def staging_gpkg_path(target_gpkg):
+    """Sibling GPKG a conversion writes into before it replaces ``target_gpkg``."""
+    return os.path.splitext(target_gpkg)[0] + ".converting.gpkg"
+
+
+def discard_staging_gpkg(staging_gpkg):
+    """Remove a staging GPKG and its SQLite sidecar files, if present."""
+    for path in (staging_gpkg,) + tuple(staging_gpkg + suffix for suffix in _SQLITE_SIDECARS):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def prepare_staging_gpkg(target_gpkg, staging_gpkg):
+    """Start the staging GPKG as a copy of ``target_gpkg`` so its other tables survive."""
+    discard_staging_gpkg(staging_gpkg)
+    if os.path.exists(target_gpkg):
+        shutil.copyfile(target_gpkg, staging_gpkg)
+
+
+def commit_staging_gpkg(staging_gpkg, target_gpkg):
+    """Replace ``target_gpkg`` with the finished staging GPKG; raises OSError on failure."""
+    os.replace(staging_gpkg, target_gpkg)
+    discard_staging_gpkg(staging_gpkg)
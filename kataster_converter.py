@@ -4,7 +4,6 @@
 
 import datetime
 import glob
-import math
 import os
 import re
 import sqlite3
@@ -13,38 +12,125 @@ try:
 except ModuleNotFoundError:
     processing = None
 
+from bev_to_qfield_plugin.conversion_engine import CONVERT_STAGES, FINISH_STAGES, ConversionCancelled, ConversionRun
+from bev_to_qfield_plugin.conversion_stages import build_engine, tile_pack_path
+from bev_to_qfield_plugin.fast_open import (
+    apply_fast_open_profile,
+    feature_count,
+    mark_reference_layer,
+    refresh_gpkg_statistics,
+    vector_layer_options,
+)
+from bev_to_qfield_plugin.orthofoto import (
+    ORTHOFOTO_LAYER_NAME,
+    build_orthofoto_layer,
+    ensure_tile_pack_layer,
+    publish_remote_sources,
+)
+from bev_to_qfield_plugin.render_profile import apply_render_profile
+from bev_to_qfield_plugin.tile_pack import parse_zoom_range
+from bev_to_qfield_plugin.workspace_catalog import catalog_grid, record_conversion
 from kataster_common import (
+    commit_staging_gpkg,
     dedupe_paths,
     default_output_path,
+    discard_staging_gpkg,
     is_kataster_shapefile,
+    plan_layer_reconciliation,
+    prepare_staging_gpkg,
     qgis_base_from_source,
     qgis_base_from_target,
+    staging_gpkg_path,
 )
 
 from qgis.PyQt.QtGui import QIcon
-from qgis.PyQt.QtWidgets import QAction, QFileDialog, QMessageBox
+from qgis.PyQt.QtWidgets import QAction, QFileDialog, QMessageBox, QProgressBar, QPushButton
 from qgis.core import (
+    Qgis,
+    QgsApplication,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsCoordinateTransformContext,
+    QgsDataProvider,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
     QgsProject,
+    QgsProviderRegistry,
     QgsRasterLayer,
     QgsSingleSymbolRenderer,
     QgsSymbol,
-    QgsVectorFileWriter,
+    QgsTask,
     QgsVectorLayer,
     QgsWkbTypes,
 )
 
 
+class KatasterConversionTask(QgsTask):
+    """Run the discover→index engine stages off the GUI thread.
+
+    run() only touches files and a staging copy of the GeoPackage
+    (``conversion.target_gpkg``); the plugin swaps it in for
+    ``settings["output_gpkg"]`` on success. The project and report stages
+    (layers, project file, dialogs) are run by the plugin in the
+    ``on_finished`` callback, which QGIS invokes on the main thread.
+    """
+
+    def __init__(self, engine, conversion, on_finished):
+        super().__init__(f"Kataster-Konverter: {os.path.basename(conversion.source_folder)}", QgsTask.CanCancel)
+        self.engine = engine
+        self.conversion = conversion
+        self.on_finished = on_finished
+        self.exception = None
+        self.feedback = None
+        self._step = 0
+        self._step_count = 1
+
+    def cancel(self):
+        if self.feedback is not None:
+            self.feedback.cancel()
+        super().cancel()
+
+    def _on_job_start(self, index, total, job):
+        self._step = index
+        self._step_count = max(1, total)
+        self.setProgress(index * 100.0 / self._step_count)
+
+    def _on_step_progress(self, value):
+        self.setProgress(min(100.0, (self._step + value / 100.0) * 100.0 / self._step_count))
+
+    def run(self):
+        self.feedback = QgsProcessingFeedback()
+        self.feedback.progressChanged.connect(self._on_step_progress)
+        self.conversion.settings["context"] = QgsProcessingContext()
+        self.conversion.settings["feedback"] = self.feedback
+        self.conversion.is_canceled = self.isCanceled
+        self.conversion.on_job_start = self._on_job_start
+        try:
+            prepare_staging_gpkg(self.conversion.settings["output_gpkg"], self.conversion.target_gpkg)
+            self.engine.run(self.conversion, CONVERT_STAGES)
+        except ConversionCancelled:
+            return False
+        except Exception as err:
+            self.exception = err
+            return False
+        self.setProgress(100.0)
+        return not self.isCanceled()
+
+    def finished(self, result):
+        self.on_finished(self, result)
+
+
 class KatasterConverterPlugin:
-    ORTHOFOTO_LAYER_NAME = "BEV Orthofoto (basemap.at)"
+    ORTHOFOTO_LAYER_NAME = ORTHOFOTO_LAYER_NAME
     GEOID_PATTERN_NAME = "GV_Hoehengrid*.tif"
 
     def __init__(self, iface):
         self.iface = iface
         self.action = None
         self.last_folder = "C:/QgisData/entzippt"
+        self._task = None
+        self._progress_message = None
+        self._project_replaced = False
 
     def initGui(self):
         icon = QIcon()
@@ -54,6 +140,8 @@ class KatasterConverterPlugin:
         self.iface.addPluginToMenu("&Kataster-Konverter", self.action)
 
     def unload(self):
+        if self._task is not None:
+            self._task.cancel()
         if self.action:
             self.iface.removePluginMenu("&Kataster-Konverter", self.action)
             self.iface.removeToolBarIcon(self.action)
@@ -63,31 +151,107 @@ class KatasterConverterPlugin:
         return is_kataster_shapefile(filename)
 
     @staticmethod
-    def _memory_geometry_for(layer):
-        geometry_type = QgsWkbTypes.geometryType(layer.wkbType())
-        if geometry_type == QgsWkbTypes.PolygonGeometry:
-            return "MultiPolygon"
-        if geometry_type == QgsWkbTypes.PointGeometry:
-            return "Point"
-        return None
-
-    @staticmethod
     def _is_kataster_project_layer_name(layer_name):
         lower = (layer_name or "").lower()
         return re.search(r"(?<![a-z])(fpt|gnr|gst|nfl|nsl|nsy|sgg|ssb|vgg)(?![a-z])", lower) is not None
 
-    def _remove_existing_kataster_layers_from_project(self):
-        project = QgsProject.instance()
-        remove_ids = []
+    def _existing_kataster_layers(self, project):
+        return [
+            (layer_id, layer.name())
+            for layer_id, layer in project.mapLayers().items()
+            if isinstance(layer, QgsVectorLayer) and self._is_kataster_project_layer_name(layer.name())
+        ]
+
+    @staticmethod
+    def _detach_layers_from_gpkg(project, target_gpkg, detached):
+        """Point vector layers reading ``target_gpkg`` at empty memory placeholders.
+
+        Used only around replacing the GPKG file, which fails (Windows) or
+        leaves stale handles while OGR/SQLite connections to it are open.
+        setDataSource() keeps style, tree position and id. Fills ``detached``
+        with {layer id: original source} as it goes, so _reattach_layers()
+        can restore them even if detaching stops part-way.
+        """
+        target = os.path.normcase(os.path.abspath(target_gpkg))
+        provider_options = QgsDataProvider.ProviderOptions()
+        provider_options.transformContext = project.transformContext()
         for layer_id, layer in project.mapLayers().items():
-            if not isinstance(layer, QgsVectorLayer):
+            if not isinstance(layer, QgsVectorLayer) or layer.providerType() != "ogr":
                 continue
-            if not self._is_kataster_project_layer_name(layer.name()):
+            path = QgsProviderRegistry.instance().decodeUri("ogr", layer.source()).get("path") or ""
+            if not path or os.path.normcase(os.path.abspath(path)) != target:
                 continue
-            remove_ids.append(layer_id)
+            detached[layer_id] = layer.source()
+            placeholder = QgsWkbTypes.displayString(layer.wkbType())
+            if layer.crs().isValid():
+                placeholder += f"?crs={layer.crs().authid() or layer.crs().toWkt()}"
+            layer.setDataSource(placeholder, layer.name(), "memory", provider_options)
 
-        if remove_ids:
-            project.removeMapLayers(remove_ids)
+    @staticmethod
+    def _reattach_layers(project, detached):
+        provider_options = QgsDataProvider.ProviderOptions()
+        provider_options.transformContext = project.transformContext()
+        for layer_id, source in detached.items():
+            layer = project.mapLayer(layer_id)
+            if layer is not None:
+                layer.setDataSource(source, layer.name(), "ogr", provider_options)
+
+    @staticmethod
+    def _style_new_kataster_layer(layer, filename):
+        if "gst" in filename.lower() and QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
+            symbol = QgsSymbol.defaultSymbol(QgsWkbTypes.PolygonGeometry)
+            if symbol and hasattr(symbol.symbolLayer(0), "setBrushStyle"):
+                symbol.symbolLayer(0).setBrushStyle(0)  # Qt.NoBrush
+            layer.setRenderer(QgsSingleSymbolRenderer(symbol))
+
+    def _reconcile_kataster_layers(self, project, target_gpkg, written_layers):
+        """Point existing Kataster layers at the new GPKG tables and add only new ones.
+
+        Existing layers keep their style, position in the layer tree and
+        id; stale Kataster layers (no table written this run) are removed.
+        New layers are added in a single batch while canvas rendering is frozen.
+        Returns (imported layer names, failure messages).
+        """
+        filenames = {layer_name: filename for filename, layer_name in written_layers}
+        plan = plan_layer_reconciliation(self._existing_kataster_layers(project), list(filenames))
+        imported_layers = []
+        failed_layers = []
+
+        canvas = self.iface.mapCanvas() if self.iface is not None else None
+        if canvas is not None:
+            canvas.freeze(True)
+        try:
+            provider_options = QgsDataProvider.ProviderOptions()
+            provider_options.transformContext = project.transformContext()
+            for layer_id, layer_name in plan["swap"]:
+                layer = project.mapLayer(layer_id)
+                layer.setDataSource(f"{target_gpkg}|layername={layer_name}", layer.name(), "ogr", provider_options)
+                if not layer.isValid():
+                    failed_layers.append(f"{filenames[layer_name]}: Datenquelle konnte nicht auf GPKG umgestellt werden")
+                    continue
+                imported_layers.append(layer_name)
+
+            if plan["remove"]:
+                project.removeMapLayers(plan["remove"])
+
+            new_layers = []
+            for layer_name in plan["add"]:
+                filename = filenames[layer_name]
+                layer = QgsVectorLayer(f"{target_gpkg}|layername={layer_name}", layer_name, "ogr")
+                if not layer.isValid():
+                    failed_layers.append(f"{filename}: Konnte nach Export nicht aus GPKG geladen werden")
+                    continue
+                self._style_new_kataster_layer(layer, filename)
+                new_layers.append(layer)
+                imported_layers.append(layer_name)
+            if new_layers:
+                project.addMapLayers(new_layers)
+        finally:
+            if canvas is not None:
+                canvas.freeze(False)
+                canvas.refresh()
+
+        return imported_layers, failed_layers
 
     @staticmethod
     def _default_unsaved_output_path(source_folder):
@@ -161,6 +325,10 @@ class KatasterConverterPlugin:
         processing_root = os.environ.get("QFC_PROCESSING_ROOT")
         if processing_root:
             search_dirs.append(os.path.join(processing_root, "grids"))
+        else:
+            cataloged = catalog_grid(source_folder, "ntv2")
+            if cataloged:
+                return os.path.normpath(cataloged), [os.path.dirname(cataloged)]
 
         qgis_base_from_source = KatasterConverterPlugin._qgis_base_from_source(source_folder)
         if qgis_base_from_source:
@@ -199,6 +367,10 @@ class KatasterConverterPlugin:
         processing_root = os.environ.get("QFC_PROCESSING_ROOT")
         if processing_root:
             search_dirs.append(os.path.join(processing_root, "grids"))
+        else:
+            cataloged = catalog_grid(source_folder, "geoid")
+            if cataloged:
+                return os.path.normpath(cataloged), [os.path.dirname(cataloged)]
 
         qgis_base_from_source = KatasterConverterPlugin._qgis_base_from_source(source_folder)
         if qgis_base_from_source:
@@ -223,63 +395,9 @@ class KatasterConverterPlugin:
 
         return None, searched
 
-    @staticmethod
-    def _geoid_band_field_name(layer, prefix="N_"):
-        for field in layer.fields():
-            name = field.name()
-            if name.startswith(prefix):
-                return name
-        return None
-
-    @staticmethod
-    def _apply_geoid_heights(layer, geoid_tif):
-        sampled = processing.run(
-            "qgis:rastersampling",
-            {
-                "INPUT": layer,
-                "RASTERCOPY": geoid_tif,
-                "COLUMN_PREFIX": "N_",
-                "OUTPUT": "TEMPORARY_OUTPUT",
-            },
-        )["OUTPUT"]
-
-        sampled_field = KatasterConverterPlugin._geoid_band_field_name(sampled)
-        if not sampled_field:
-            raise RuntimeError("Geoid-Rastersampling lieferte kein Höhenfeld mit Prefix N_.")
-
-        return processing.run(
-            "native:fieldcalculator",
-            {
-                "INPUT": sampled,
-                "FIELD_NAME": "H_orth",
-                "FIELD_TYPE": 0,
-                "FIELD_LENGTH": 20,
-                "FIELD_PRECISION": 3,
-                "FORMULA": f'z($geometry) - "{sampled_field}"',
-                "OUTPUT": "TEMPORARY_OUTPUT",
-            },
-        )["OUTPUT"]
-
     @staticmethod
     def _build_orthofoto_layer():
-        wmts_params = {
-            "contextualWMSLegend": "0",
-            "crs": "EPSG:3857",
-            "dpiMode": "7",
-            "format": "image/jpeg",
-            "layers": "bmaporthofoto30cm",
-            "styles": "normal",
-            "tileMatrixSet": "google3857",
-            "url": "https://www.basemap.at/wmts/1.0.0/WMTSCapabilities.xml",
-        }
-        wmts_uri = "&".join(f"{key}={value}" for key, value in wmts_params.items())
-
-        ortho = QgsRasterLayer(wmts_uri, KatasterConverterPlugin.ORTHOFOTO_LAYER_NAME, "wms")
-        if not ortho.isValid():
-            return None
-
-        ortho.setOpacity(1.0)
-        return ortho
+        return build_orthofoto_layer()
 
     @staticmethod
     def _move_layer_to_bottom(project, layer_id):
@@ -306,28 +424,39 @@ class KatasterConverterPlugin:
             KatasterConverterPlugin._move_layer_to_bottom(project, ortho.id())
 
     @staticmethod
-    def _write_output_project(gpkg_path, layer_names, target_crs):
+    def _write_output_project(gpkg_path, layer_names, target_crs, tile_pack=None):
         output_qgz = os.path.splitext(gpkg_path)[0] + ".qgz"
         output_project = QgsProject()
         output_project.setFileName(output_qgz)
         output_project.setCrs(target_crs)
+        apply_fast_open_profile(output_project)
         KatasterConverterPlugin._ensure_orthofoto_layer(output_project)
+        try:
+            stats = refresh_gpkg_statistics(gpkg_path, layer_names)
+        except sqlite3.Error as err:
+            print(f"Hinweis: GPKG-Statistiken nicht aktualisiert ({err})")
+            stats = {}
 
         for layer_name in layer_names:
-            layer = QgsVectorLayer(f"{gpkg_path}|layername={layer_name}", layer_name, "ogr")
+            layer = QgsVectorLayer(f"{gpkg_path}|layername={layer_name}", layer_name, "ogr", vector_layer_options())
             if not layer.isValid():
                 return None, f"Layer konnte nicht aus GPKG geladen werden: {layer_name}"
+            mark_reference_layer(layer)
 
             if "gst" in layer_name.lower() and QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
                 symbol = QgsSymbol.defaultSymbol(QgsWkbTypes.PolygonGeometry)
                 if symbol and hasattr(symbol.symbolLayer(0), "setBrushStyle"):
                     symbol.symbolLayer(0).setBrushStyle(0)  # Qt.NoBrush
                 layer.setRenderer(QgsSingleSymbolRenderer(symbol))
+            apply_render_profile(layer, feature_count(stats, layer_name))
 
             output_project.addMapLayer(layer)
 
+        if tile_pack:
+            ensure_tile_pack_layer(output_project, tile_pack)
         KatasterConverterPlugin._ensure_orthofoto_layer(output_project)
 
+        publish_remote_sources(output_project)
         if not output_project.write():
             return None, "QGIS-Projektdatei konnte nicht geschrieben werden"
 
@@ -400,6 +529,28 @@ class KatasterConverterPlugin:
         except OSError as err:
             return str(err)
 
+    def _show_progress(self, task):
+        message_bar = self.iface.messageBar()
+        message = message_bar.createMessage("Kataster-Konverter", f"Konvertiere {os.path.basename(task.conversion.source_folder)} ...")
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setMaximumWidth(300)
+        cancel_button = QPushButton("Abbrechen")
+        cancel_button.clicked.connect(task.cancel)
+        message.layout().addWidget(progress_bar)
+        message.layout().addWidget(cancel_button)
+        task.progressChanged.connect(lambda value: progress_bar.setValue(int(value)))
+        message_bar.pushWidget(message, Qgis.Info)
+        self._progress_message = message
+
+    def _clear_progress(self):
+        if self._progress_message is not None:
+            try:
+                self.iface.messageBar().popWidget(self._progress_message)
+            except RuntimeError:
+                pass  # widget already closed by the user
+            self._progress_message = None
+
     def run_kataster_converter(self):
         if processing is None:
             QMessageBox.critical(
@@ -410,6 +561,14 @@ class KatasterConverterPlugin:
             )
             return
 
+        if self._task is not None:
+            QMessageBox.information(
+                None,
+                "Kataster-Konverter",
+                "Es läuft bereits eine Konvertierung. Bitte warten oder über die Meldungsleiste abbrechen.",
+            )
+            return
+
         folder = QFileDialog.getExistingDirectory(None, "Wähle Ordner mit Katasterdaten", self.last_folder)
         if not folder:
             return
@@ -471,113 +630,73 @@ class KatasterConverterPlugin:
                 f"{operation_error}\nAusgewählte lokale GIS-Grid Datei: {ntv2_grid}",
             )
             return
-        transform_context = QgsCoordinateTransformContext()
         geoid_grid, _searched_geoid_dirs = self._find_geoid_grid(folder, target_gpkg, project_path)
 
-        imported_layers = []
-        skipped_layers = []
-        failed_layers = []
-        geoid_applied_layers = []
-
-        # Avoid old converted layers masking the current GST/SGG output.
-        self._remove_existing_kataster_layers_from_project()
         self._ensure_orthofoto_layer(QgsProject.instance())
-        gpkg_exists = os.path.exists(target_gpkg)
-
-        for filename in sorted(os.listdir(folder)):
-            if not self._is_kataster_shapefile(filename):
-                continue
-
-            lower_filename = filename.lower()
-            full_path = os.path.join(folder, filename)
-            layer = QgsVectorLayer(full_path, filename, "ogr")
-            if not layer.isValid():
-                failed_layers.append(f"{filename}: Layer konnte nicht geladen werden")
-                continue
-
-            if not layer.crs().isValid() or layer.crs().authid() == "":
-                layer.setCrs(crs_source)
 
-            layer_name = os.path.splitext(filename)[0]
-            uri = f"{target_gpkg}|layername={layer_name}"
-
-            geometry = self._memory_geometry_for(layer)
-            if geometry is None:
-                skipped_layers.append(f"{filename}: nicht unterstützter Geometrietyp")
-                continue
-
-            try:
-                reprojected = processing.run(
-                    "native:reprojectlayer",
-                    {
-                        "INPUT": layer,
-                        "TARGET_CRS": crs_target,
-                        "OPERATION": operation,
-                        "OUTPUT": "TEMPORARY_OUTPUT",
-                    },
-                )["OUTPUT"]
-            except Exception as err:
-                failed_layers.append(f"{filename}: Reprojektion fehlgeschlagen ({err})")
-                continue
-
-            if geoid_grid and QgsWkbTypes.geometryType(reprojected.wkbType()) == QgsWkbTypes.PointGeometry:
-                if QgsWkbTypes.hasZ(reprojected.wkbType()):
-                    try:
-                        reprojected = self._apply_geoid_heights(reprojected, geoid_grid)
-                        geoid_applied_layers.append(layer_name)
-                    except Exception as err:
-                        failed_layers.append(f"{filename}: Höhengrid-Korrektur fehlgeschlagen ({err})")
-                        continue
-                else:
-                    skipped_layers.append(f"{filename}: Höhengrid verfügbar, aber Geometrie hat keine Z-Werte")
-
-            extent = reprojected.extent()
-            extent_values = [extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()]
-            if not all(math.isfinite(value) for value in extent_values):
-                failed_layers.append(f"{filename}: Reprojektion lieferte ungültige Ausdehnung {extent_values}")
-                continue
+        conversion = ConversionRun(
+            folder,
+            staging_gpkg_path(target_gpkg),
+            {
+                "output_gpkg": target_gpkg,
+                "tile_pack_path": tile_pack_path(target_gpkg),
+                "project_file": project_path,
+                "accept": is_kataster_shapefile,
+                "geometry_types": (QgsWkbTypes.PolygonGeometry, QgsWkbTypes.PointGeometry),
+                "crs_source": crs_source,
+                "crs_target": crs_target,
+                "operation": operation,
+                "geoid_grid": geoid_grid,
+                "transform_context": QgsCoordinateTransformContext(),
+                "project_is_saved": project_is_saved,
+                "ntv2_grid": ntv2_grid,
+                "operation_name": operation_name,
+                "operation_accuracy": operation_accuracy,
+                "operation_grids": operation_grids,
+                "tile_pack": os.environ.get("QFC_ORTHO_TILES") == "1",
+                "tile_zoom": parse_zoom_range(os.environ.get("QFC_ORTHO_ZOOM", "14-18")),
+            },
+        )
+        engine = build_engine(project=self._project_stage, report=self._report_stage)
+        task = KatasterConversionTask(engine, conversion, self._on_conversion_finished)
+        # Only mark the run as active once its progress UI exists, so a failure
+        # here does not block later runs behind the "already running" guard.
+        self._show_progress(task)
+        self._task = task
+        # The finish stages must not touch a project opened while the task ran
+        self._project_replaced = False
+        QgsProject.instance().cleared.connect(self._on_project_cleared)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_project_cleared(self):
+        self._project_replaced = True
+
+    def _project_stage(self, conversion):
+        if self._project_replaced or QgsProject.instance().fileName() != conversion.settings.get("project_file", ""):
+            conversion.skipped_layers.append(
+                "Projekt: Während der Konvertierung wurde ein anderes Projekt geöffnet – "
+                "Layer und Projektdatei wurden nicht aktualisiert"
+            )
+            return None
 
-            options = QgsVectorFileWriter.SaveVectorOptions()
-            options.driverName = "GPKG"
-            options.layerName = layer_name
-            options.fileEncoding = "UTF-8"
-            if gpkg_exists:
-                options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
-            else:
-                options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
-
-            err, msg = QgsVectorFileWriter.writeAsVectorFormatV2(
-                reprojected,
-                target_gpkg,
-                transform_context,
-                options,
-            )
+        target_gpkg = conversion.target_gpkg
+        written = [(job.name, job.layer_name) for job in conversion.jobs if job.layer_name in conversion.written_layers]
 
-            if err != QgsVectorFileWriter.NoError:
-                failed_layers.append(f"{filename}: Exportfehler ({msg})")
-                continue
-
-            gpkg_exists = True
+        # Existing layers are re-pointed so styles survive; stale ones are dropped
+        # so old converted layers cannot mask the current GST/SGG output.
+        imported_layers, reconcile_failures = self._reconcile_kataster_layers(QgsProject.instance(), target_gpkg, written)
+        conversion.outputs["imported_layers"] = imported_layers
+        conversion.failed_layers.extend(reconcile_failures)
 
-            loaded_layer = QgsVectorLayer(uri, layer_name, "ogr")
-            if not loaded_layer.isValid():
-                failed_layers.append(f"{filename}: Konnte nach Export nicht aus GPKG geladen werden")
-                continue
-
-            if "gst" in lower_filename and QgsWkbTypes.geometryType(loaded_layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
-                symbol = QgsSymbol.defaultSymbol(QgsWkbTypes.PolygonGeometry)
-                if symbol and hasattr(symbol.symbolLayer(0), "setBrushStyle"):
-                    symbol.symbolLayer(0).setBrushStyle(0)  # Qt.NoBrush
-                renderer = QgsSingleSymbolRenderer(symbol)
-                loaded_layer.setRenderer(renderer)
-
-            QgsProject.instance().addMapLayer(loaded_layer)
-            imported_layers.append(layer_name)
+        tile_pack = conversion.outputs.get("tiles")
+        if tile_pack:
+            ensure_tile_pack_layer(QgsProject.instance(), tile_pack)
+            self._ensure_orthofoto_layer(QgsProject.instance())
 
         try:
             os.utime(target_gpkg, None)
         except OSError as err:
-            failed_layers.append(f"Zeitstempel konnte nicht aktualisiert werden: {err}")
+            conversion.failed_layers.append(f"Zeitstempel konnte nicht aktualisiert werden: {err}")
 
         output_qgz = None
         desired_output_qgz = os.path.splitext(target_gpkg)[0] + ".qgz"
@@ -585,13 +704,14 @@ class KatasterConverterPlugin:
 
         # For initially unsaved sessions, always bind the active project
         # to the output folder project path (not any temporary QGIS path).
-        if not project_is_saved:
+        if not conversion.settings.get("project_is_saved", True):
             active_project.setFileName(desired_output_qgz)
 
         if active_project.fileName():
             output_qgz = active_project.fileName()
+            publish_remote_sources(active_project)
             if not active_project.write():
-                failed_layers.append("Projektdatei: Aktuelles QGIS-Projekt konnte nicht geschrieben werden")
+                conversion.failed_layers.append("Projektdatei: Aktuelles QGIS-Projekt konnte nicht geschrieben werden")
                 output_qgz = None
 
         if not output_qgz:
@@ -599,29 +719,102 @@ class KatasterConverterPlugin:
             if not qgz_layers:
                 qgz_layers, list_error = self._list_gpkg_layers(target_gpkg)
                 if list_error:
-                    failed_layers.append(f"Projektdatei: {list_error}")
+                    conversion.failed_layers.append(f"Projektdatei: {list_error}")
 
             if qgz_layers:
-                output_qgz, project_error = self._write_output_project(target_gpkg, qgz_layers, crs_target)
+                output_qgz, project_error = self._write_output_project(
+                    target_gpkg, qgz_layers, conversion.settings["crs_target"], tile_pack
+                )
                 if project_error:
-                    failed_layers.append(f"Projektdatei: {project_error}")
+                    conversion.failed_layers.append(f"Projektdatei: {project_error}")
+        return output_qgz
 
-        report_path = os.path.splitext(target_gpkg)[0] + "_report.txt"
+    def _report_stage(self, conversion):
+        report_path = os.path.splitext(conversion.target_gpkg)[0] + "_report.txt"
         report_error = self._write_report(
             report_path,
-            folder,
-            target_gpkg,
-            output_qgz,
-            ntv2_grid,
-            geoid_grid,
-            geoid_applied_layers,
-            imported_layers,
-            skipped_layers,
-            failed_layers,
+            conversion.source_folder,
+            conversion.target_gpkg,
+            conversion.outputs.get("project"),
+            conversion.settings.get("ntv2_grid"),
+            conversion.settings.get("geoid_grid"),
+            conversion.geoid_applied_layers,
+            conversion.outputs.get("imported_layers", []),
+            conversion.skipped_layers,
+            conversion.failed_layers,
         )
         if report_error:
-            failed_layers.append(f"Reportdatei: {report_error}")
-            report_path = None
+            conversion.failed_layers.append(f"Reportdatei: {report_error}")
+            return None
+        return report_path
+
+    def _on_conversion_finished(self, task, result):
+        """Main-thread part of a conversion: project and report stages, then the summary."""
+        self._task = None
+        self._clear_progress()
+        try:
+            QgsProject.instance().cleared.disconnect(self._on_project_cleared)
+        except TypeError:
+            pass  # not connected
+        conversion = task.conversion
+        staging_gpkg = conversion.target_gpkg
+
+        # Only a completed run replaces the target GPKG; otherwise it stays untouched
+        replace_error = None
+        if task.exception is None and not task.isCanceled():
+            output_gpkg = conversion.settings["output_gpkg"]
+            # Project layers stay on the target GPKG while the task runs (so a
+            # mid-run project save keeps their sources); they are released only
+            # for the file swap itself.
+            detached = {}
+            try:
+                self._detach_layers_from_gpkg(QgsProject.instance(), output_gpkg, detached)
+                if os.path.exists(staging_gpkg):
+                    commit_staging_gpkg(staging_gpkg, output_gpkg)
+                conversion.target_gpkg = output_gpkg
+            except OSError as err:
+                replace_error = err
+            finally:
+                self._reattach_layers(QgsProject.instance(), detached)
+        else:
+            discard_staging_gpkg(staging_gpkg)
+
+        if task.exception is not None:
+            QMessageBox.critical(None, "Kataster-Konverter", f"Konvertierung fehlgeschlagen: {task.exception}")
+            return
+
+        if task.isCanceled():
+            self.iface.messageBar().pushMessage(
+                "Kataster-Konverter",
+                "Konvertierung abgebrochen – Ziel-GPKG bleibt unverändert.",
+                Qgis.Warning,
+            )
+            return
+
+        if replace_error is not None:
+            QMessageBox.critical(
+                None,
+                "Kataster-Konverter",
+                f"Ziel-GPKG konnte nicht ersetzt werden: {replace_error}\nNeue Daten liegen in: {staging_gpkg}",
+            )
+            return
+
+        task.engine.run(conversion, FINISH_STAGES)
+        print(task.engine.timing_summary())
+        record_conversion(conversion.source_folder, os.path.basename(conversion.source_folder))
+
+        target_gpkg = conversion.target_gpkg
+        ntv2_grid = conversion.settings.get("ntv2_grid")
+        geoid_grid = conversion.settings.get("geoid_grid")
+        operation_name = conversion.settings.get("operation_name")
+        operation_accuracy = conversion.settings.get("operation_accuracy")
+        operation_grids = conversion.settings.get("operation_grids") or []
+        output_qgz = conversion.outputs.get("project")
+        report_path = conversion.outputs.get("report")
+        imported_layers = conversion.outputs.get("imported_layers", [])
+        skipped_layers = conversion.skipped_layers
+        failed_layers = conversion.failed_layers
+        geoid_applied_layers = conversion.geoid_applied_layers
 
         summary_lines = [
             f"Importiert: {len(imported_layers)} Layer",
@@ -662,4 +855,9 @@ class KatasterConverterPlugin:
         summary_lines.append("")
         summary_lines.append("Hinweis: Falls du QFieldCloud nutzt, bitte manuell synchronisieren!")
 
-        QMessageBox.information(None, "Kataster-Konverter", "\n".join(summary_lines))
+        if failed_layers:
+            summary_lines.insert(0, "Konvertierung nur teilweise erfolgreich.")
+            summary_lines.insert(1, "")
+            QMessageBox.warning(None, "Kataster-Konverter", "\n".join(summary_lines))
+        else:
+            QMessageBox.information(None, "Kataster-Konverter", "\n".join(summary_lines))
@@ -6,6 +6,7 @@ set "CLI_SCRIPT=%SCRIPT_DIR%scripts\kataster_converter_cli.py"
 set "QFC_SYNC_SCRIPT=%SCRIPT_DIR%scripts\qfieldcloud_sync.py"
 set "KG_LOOKUP_SCRIPT=%SCRIPT_DIR%scripts\kg_mapping_lookup.py"
 set "KG_UNZIP_SCRIPT=%SCRIPT_DIR%scripts\extract_kg_from_zip.py"
+set "CATALOG_SCRIPT=%SCRIPT_DIR%scripts\workspace_catalog_cli.py"
 set "POWERSHELL_EXE=%SystemRoot%\System32\WindowsPowerShell\v1.0\powershell.exe"
 set "QFC_CONFIG_FILE="
 set "QFC_WORKROOT_NAME=bev-qfield-workbench-data"
@@ -14,6 +15,7 @@ set "KG_MAP_FILE="
 set "KG_MAP_COUNT="
 set "KG_MAP_EXTRACTED_FROM="
 set "KG_MAP_ERROR="
+set "KG_MAP_SCAN_SECONDS="
 if defined QFC_SOURCE set "SOURCE=%QFC_SOURCE%"
 if defined QFC_PROJECT_ID set "PROJECT_ID=%QFC_PROJECT_ID%"
 if defined QFC_NO_PAUSE if /I not "%QFC_NO_PAUSE%"=="1" set "QFC_NO_PAUSE=0"
@@ -137,17 +139,13 @@ if not defined SOURCE if defined SOURCE_BROWSE_ROOT (
   echo.
   echo already extracted KG's:
   set /a SRC_COUNT=0
-  for /f "delims=" %%D in ('dir /b /ad "!SOURCE_BROWSE_ROOT!" 2^>nul') do (
-    if /I not "%%D"=="entzippt" (
-      echo(%%D| findstr /r "^[0-9][0-9][0-9][0-9][0-9]$" >nul
-      if not errorlevel 1 (
-        set /a SRC_COUNT+=1
-        set "SRC_NAME_!SRC_COUNT!=%%D"
-        set "SRC_PATH_!SRC_COUNT!=!SOURCE_BROWSE_ROOT!\%%D"
-        set "SRC_LABEL=%%D"
-        call :lookup_kg_name "%%D" SRC_KG_NAME
-        if defined SRC_KG_NAME set "SRC_LABEL=%%D ^(!SRC_KG_NAME!^)"
-        echo   - !SRC_LABEL!
+  call :load_catalog_kgs "!SOURCE_BROWSE_ROOT!"
+  if !SRC_COUNT! LEQ 0 (
+    rem No workspace catalog available: list the 5-digit folders directly.
+    for /f "delims=" %%D in ('dir /b /ad "!SOURCE_BROWSE_ROOT!" 2^>nul') do (
+      if /I not "%%D"=="entzippt" (
+        echo(%%D| findstr /r "^[0-9][0-9][0-9][0-9][0-9]$" >nul
+        if not errorlevel 1 call :add_source_kg "%%D" "!SOURCE_BROWSE_ROOT!\%%D"
       )
     )
   )
@@ -220,7 +218,8 @@ for %%I in ("!SOURCE!") do set "SOURCE_FOLDER=%%~nxI"
 call :lookup_kg_name "!SOURCE_FOLDER!" SOURCE_KG_NAME
 set "SOURCE_KG_SLUG="
 if defined SOURCE_KG_NAME (
-  call :slugify_kg_name "!SOURCE_KG_NAME!" SOURCE_KG_SLUG
+  call :lookup_kg_slug "!SOURCE_FOLDER!" SOURCE_KG_SLUG
+  if not defined SOURCE_KG_SLUG set "SOURCE_KG_SLUG=!SOURCE_KG_NAME: =-!"
   echo Selected KatastralGemeinde: !SOURCE_FOLDER! ^(!SOURCE_KG_NAME!^)
 )
 echo.
@@ -471,26 +470,64 @@ if /I "%QFC_NO_PAUSE%"=="1" goto :eof
 pause
 goto :eof
 
-:slugify_kg_name
-set "KG_SLUG_INPUT=%~1"
+:load_catalog_kgs
+rem Lists extracted KGs from the workspace catalog (kg;path;... lines, refreshed incrementally).
+if not exist "%CATALOG_SCRIPT%" goto :eof
+set "CATALOG_OUT=%TEMP%\kg_catalog_%RANDOM%_%RANDOM%.txt"
+call "%QGIS_PY%" "%CATALOG_SCRIPT%" --workspace "%~1" > "!CATALOG_OUT!" 2>nul
+if errorlevel 1 (
+  del /q "!CATALOG_OUT!" >nul 2>nul
+  goto :eof
+)
+for /f "usebackq tokens=1,2 delims=;" %%A in ("!CATALOG_OUT!") do (
+  if exist "%%~B\" call :add_source_kg "%%A" "%%~B"
+)
+del /q "!CATALOG_OUT!" >nul 2>nul
+goto :eof
+
+:add_source_kg
+set /a SRC_COUNT+=1
+set "SRC_NAME_!SRC_COUNT!=%~1"
+set "SRC_PATH_!SRC_COUNT!=%~2"
+set "SRC_LABEL=%~1"
+call :lookup_kg_name "%~1" SRC_KG_NAME
+if defined SRC_KG_NAME set "SRC_LABEL=%~1 ^(!SRC_KG_NAME!^)"
+echo   - !SRC_LABEL!
+goto :eof
+
+:lookup_kg_slug
+set "KG_SLUG_NUMBER=%~1"
 set "KG_SLUG_VALUE="
-if not defined KG_SLUG_INPUT goto slugify_done
-if not exist "%POWERSHELL_EXE%" (
-  set "KG_SLUG_VALUE=!KG_SLUG_INPUT: =-!"
-  goto slugify_done
-)
-set "KG_SLUG_TMP=%TEMP%\kg_slug_%RANDOM%_%RANDOM%.txt"
-set "QFC_KG_SLUG_INPUT=!KG_SLUG_INPUT!"
-"%POWERSHELL_EXE%" -NoProfile -Command "$v=$env:QFC_KG_SLUG_INPUT; if([string]::IsNullOrWhiteSpace($v)){ exit 0 }; $n=$v.Normalize([Text.NormalizationForm]::FormD); $sb=New-Object Text.StringBuilder; foreach($ch in $n.ToCharArray()){ if([Globalization.CharUnicodeInfo]::GetUnicodeCategory($ch) -ne [Globalization.UnicodeCategory]::NonSpacingMark){ [void]$sb.Append($ch) } }; $ascii=$sb.ToString().ToLowerInvariant(); $slug=[regex]::Replace($ascii,'[^a-z0-9]+','-').Trim('-'); if($slug){ Set-Content -LiteralPath $env:KG_SLUG_TMP -Value $slug -Encoding Ascii }"
-if exist "!KG_SLUG_TMP!" (
-  set /p KG_SLUG_VALUE=<"!KG_SLUG_TMP!"
-  del /q "!KG_SLUG_TMP!" >nul 2>nul
-)
-if not defined KG_SLUG_VALUE set "KG_SLUG_VALUE=!KG_SLUG_INPUT: =-!"
-:slugify_done
+if not defined KG_SLUG_NUMBER goto kg_slug_done
+if not "!KG_SLUG_NUMBER: =!"=="!KG_SLUG_NUMBER!" goto kg_slug_done
+if not defined KG_SLUG_!KG_SLUG_NUMBER! call :resolve_kg_numbers "!KG_SLUG_NUMBER!"
+if defined KG_SLUG_!KG_SLUG_NUMBER! set "KG_SLUG_VALUE=!KG_SLUG_%KG_SLUG_NUMBER%!"
+:kg_slug_done
 if not "%~2"=="" set "%~2=!KG_SLUG_VALUE!"
 goto :eof
 
+:resolve_kg_numbers
+rem Resolves KG numbers to KG_NAME_<nr>/KG_SLUG_<nr> in one Python call.
+if not defined KG_MAP_CACHE goto :eof
+if not defined KG_LOOKUP_ROOT goto :eof
+set "KG_RESOLVE_OUT=%TEMP%\kg_map_resolved_%RANDOM%_%RANDOM%.txt"
+if defined QFC_KG_MAPPING_FILE (
+  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" resolve --rawdata-root "!KG_LOOKUP_ROOT!" --mapping-file "!QFC_KG_MAPPING_FILE!" --out "!KG_RESOLVE_OUT!" %* >nul 2>nul
+) else (
+  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" resolve --rawdata-root "!KG_LOOKUP_ROOT!" --out "!KG_RESOLVE_OUT!" %* >nul 2>nul
+)
+call :load_kg_resolved "!KG_RESOLVE_OUT!"
+goto :eof
+
+:load_kg_resolved
+if not exist "%~1" goto :eof
+for /f "usebackq tokens=1-3 delims=;" %%A in ("%~1") do (
+  if not "%%B"=="" set "KG_NAME_%%A=%%B"
+  if not "%%C"=="" set "KG_SLUG_%%A=%%C"
+)
+del /q "%~1" >nul 2>nul
+goto :eof
+
 :prepare_kg_lookup
 set "KG_LOOKUP_ROOT=%~1"
 if defined KG_MAP_CACHE goto :eof
@@ -500,19 +537,23 @@ if not exist "%KG_LOOKUP_SCRIPT%" goto :eof
 
 set "KG_MAP_STATUS=%TEMP%\kg_map_status_%RANDOM%_%RANDOM%.txt"
 set "KG_MAP_TMP=%TEMP%\kg_map_cache_%RANDOM%_%RANDOM%.txt"
+set "KG_MAP_RESOLVED=%TEMP%\kg_map_resolved_%RANDOM%_%RANDOM%.txt"
 set "KG_MAP_ERROR="
+rem One call builds the lookup cache and resolves every extracted KG folder (number;name;slug).
 if defined QFC_KG_MAPPING_FILE (
-  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" --rawdata-root "!KG_LOOKUP_ROOT!" --mapping-file "!QFC_KG_MAPPING_FILE!" --cache-out "!KG_MAP_TMP!" --status-file "!KG_MAP_STATUS!" >nul 2>nul
+  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" resolve --rawdata-root "!KG_LOOKUP_ROOT!" --mapping-file "!QFC_KG_MAPPING_FILE!" --folder-root "!KG_LOOKUP_ROOT!" --out "!KG_MAP_RESOLVED!" --cache-out "!KG_MAP_TMP!" --status-file "!KG_MAP_STATUS!" >nul 2>nul
 ) else (
-  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" --rawdata-root "!KG_LOOKUP_ROOT!" --cache-out "!KG_MAP_TMP!" --status-file "!KG_MAP_STATUS!" >nul 2>nul
+  call "%QGIS_PY%" "%KG_LOOKUP_SCRIPT%" resolve --rawdata-root "!KG_LOOKUP_ROOT!" --folder-root "!KG_LOOKUP_ROOT!" --out "!KG_MAP_RESOLVED!" --cache-out "!KG_MAP_TMP!" --status-file "!KG_MAP_STATUS!" >nul 2>nul
 )
 set "KG_LOOKUP_EXIT=%ERRORLEVEL%"
+call :load_kg_resolved "!KG_MAP_RESOLVED!"
 
 if exist "!KG_MAP_STATUS!" (
   for /f "usebackq eol=# tokens=1,* delims==" %%A in ("!KG_MAP_STATUS!") do (
     if /I "%%A"=="MAPPING_FILE" set "KG_MAP_FILE=%%B"
     if /I "%%A"=="EXTRACTED_FROM" set "KG_MAP_EXTRACTED_FROM=%%B"
     if /I "%%A"=="COUNT" set "KG_MAP_COUNT=%%B"
+    if /I "%%A"=="SCAN_SECONDS" set "KG_MAP_SCAN_SECONDS=%%B"
     if /I "%%A"=="ERROR" set "KG_MAP_ERROR=%%B"
   )
   del /q "!KG_MAP_STATUS!" >nul 2>nul
@@ -522,7 +563,7 @@ if "%KG_LOOKUP_EXIT%"=="0" (
   if exist "!KG_MAP_TMP!" (
     set "KG_MAP_CACHE=!KG_MAP_TMP!"
     if defined KG_MAP_FILE (
-      echo KG mapping loaded: !KG_MAP_FILE! ^(!KG_MAP_COUNT! entries^)
+      echo KG mapping loaded: !KG_MAP_FILE! ^(!KG_MAP_COUNT! entries, scan !KG_MAP_SCAN_SECONDS!s^)
     ) else (
       echo KG mapping loaded.
     )
@@ -548,6 +589,12 @@ if not defined KG_LOOKUP_NUMBER goto kg_lookup_done
 if not defined KG_MAP_CACHE goto kg_lookup_done
 if not exist "!KG_MAP_CACHE!" goto kg_lookup_done
 
+if not "!KG_LOOKUP_NUMBER: =!"=="!KG_LOOKUP_NUMBER!" goto kg_lookup_done
+if defined KG_NAME_!KG_LOOKUP_NUMBER! (
+  set "KG_LOOKUP_RESULT=!KG_NAME_%KG_LOOKUP_NUMBER%!"
+  goto kg_lookup_done
+)
+
 echo(!KG_LOOKUP_NUMBER!| findstr /r "^[0-9][0-9][0-9][0-9][0-9]$" >nul
 if errorlevel 1 goto kg_lookup_done
 
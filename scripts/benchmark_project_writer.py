@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmark the template project writer against the QgsProject based writer.
+
+Run via QGIS Python environment (e.g. python-qgis-ltr.bat):
+    python benchmark_project_writer.py --gpkg <kataster.gpkg> [--repeat 5]
+
+Both writers produce a project for the same GPKG layers in a temporary folder
+next to the GPKG. The script prints the timings and compares the projects
+after loading them with QgsProject (layer order, sources, providers, CRS,
+extents and renderer types).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPT_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from kataster_converter_cli import list_gpkg_layers, write_output_project  # noqa: E402
+from qgis.core import QgsApplication, QgsCoordinateReferenceSystem, QgsProject  # noqa: E402
+
+from bev_to_qfield_plugin.project_template import kataster_polygon_style, write_template_project  # noqa: E402
+
+
+def _timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return {'min': min(durations), 'median': statistics.median(durations), 'runs': repeat}
+
+
+def _normalized_source(layer):
+    if layer.providerType() == 'wms':
+        return 'wms'
+    path, _sep, options = layer.source().partition('|')
+    return os.path.normcase(os.path.normpath(path)) + (f'|{options}' if options else '')
+
+
+def describe_project(qgz_path):
+    project = QgsProject()
+    if not project.read(qgz_path):
+        raise RuntimeError(f'Projekt konnte nicht gelesen werden: {qgz_path}')
+    layers = []
+    for node in project.layerTreeRoot().findLayers():
+        layer = node.layer()
+        if layer is None:
+            continue
+        extent = layer.extent()
+        renderer = layer.renderer() if hasattr(layer, 'renderer') else None
+        layers.append({
+            'name': layer.name(),
+            'provider': layer.providerType(),
+            'source': _normalized_source(layer),
+            'crs': layer.crs().authid(),
+            'extent': [round(value, 3) for value in (
+                extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()
+            )] if layer.providerType() == 'ogr' else None,
+            'renderer': renderer.type() if renderer is not None else None,
+            'valid': layer.isValid(),
+        })
+    return {'crs': project.crs().authid(), 'layers': layers}
+
+
+def run_benchmark(gpkg_path, repeat):
+    layer_names, error = list_gpkg_layers(gpkg_path)
+    if error:
+        raise RuntimeError(error)
+
+    work_dir = tempfile.mkdtemp(prefix='project_writer_', dir=os.path.dirname(os.path.abspath(gpkg_path)))
+    try:
+        qgis_gpkg = os.path.join(work_dir, 'qgis', os.path.basename(gpkg_path))
+        template_gpkg = os.path.join(work_dir, 'template', os.path.basename(gpkg_path))
+        for path in (qgis_gpkg, template_gpkg):
+            os.makedirs(os.path.dirname(path))
+            shutil.copy2(gpkg_path, path)
+        qgis_qgz = os.path.splitext(qgis_gpkg)[0] + '.qgz'
+        template_qgz = os.path.splitext(template_gpkg)[0] + '.qgz'
+        target_crs = QgsCoordinateReferenceSystem('EPSG:25833')
+
+        qgis_timing = _timed(lambda: write_output_project(qgis_gpkg, layer_names, target_crs), repeat)
+        template_timing = _timed(
+            lambda: write_template_project(template_gpkg, layer_names, template_qgz, kataster_polygon_style), repeat
+        )
+
+        qgis_project = describe_project(qgis_qgz)
+        template_project = describe_project(template_qgz)
+        for project, folder in ((qgis_project, 'qgis'), (template_project, 'template')):
+            for layer in project['layers']:
+                layer['source'] = layer['source'].replace(os.path.normcase(os.path.join(work_dir, folder)), '<dir>')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'gpkg': gpkg_path,
+        'layers': len(layer_names),
+        'qgsproject_seconds': qgis_timing,
+        'template_seconds': template_timing,
+        'speedup': qgis_timing['median'] / max(template_timing['median'], 1e-9),
+        'identical': qgis_project == template_project,
+        'qgsproject': qgis_project,
+        'template': template_project,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark template vs. QgsProject project writer.')
+    parser.add_argument('--gpkg', required=True, help='Converted Kataster GPKG')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per writer (default 5)')
+    parser.add_argument('--summary-json', help='Optional output file for the benchmark result')
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+    try:
+        result = run_benchmark(os.path.normpath(args.gpkg), max(1, args.repeat))
+    finally:
+        qgs.exitQgis()
+
+    print(f"Layer: {result['layers']}")
+    print(f"QgsProject: {result['qgsproject_seconds']['median']:.3f}s (Median)")
+    print(f"Vorlage:    {result['template_seconds']['median']:.3f}s (Median)")
+    print(f"Faktor:     {result['speedup']:.1f}x")
+    print(f"Identisch:  {'ja' if result['identical'] else 'nein'}")
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle, ensure_ascii=False, indent=2)
+    return 0 if result['identical'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,27 +1,60 @@
 #!/usr/bin/env python3
-"""Safely extract a named KG folder from ZIP archives in a rawdata root."""
+"""Safely extract a named KG folder from ZIP archives in a rawdata root.
+
+The central directory of every archive is kept in a SQLite index (entries,
+sizes, CRCs, offsets and the folder names they sit under). An archive is only
+re-read when its size or mtime changed; extraction then opens just the archives
+that contain the wanted folder and reads its entries at their stored offsets.
+Matched entries are inflated on a thread pool; every worker has its own archive
+handle, and zlib releases the GIL while it inflates. Files whose size and CRC32
+already match the entry are left untouched (a per-folder marker next to the
+extracted folder saves re-reading them), and written files get the entry's
+timestamp, so mtime-based caches downstream stay valid.
+"""
 
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import re
 import shutil
+import sqlite3
+import struct
 import sys
+import tempfile
+import time
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence
+
+INDEX_SCHEMA_VERSION = "1"
+DEFAULT_INDEX_PATH = Path(tempfile.gettempdir()) / "qfc_kg_lookup_cache" / "zip_entry_index.sqlite"
+COPY_CHUNK_SIZE = int(os.environ.get("QFC_ZIP_BUFFER_KB", "1024")) * 1024
+DEFAULT_WORKERS = int(os.environ.get("QFC_ZIP_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_FOLDER_SEPARATORS = re.compile(r"[\s,;]+")
+MARKER_VERSION = 1
+MARKER_SUFFIX = ".extract.json"
 
 
 class UnsafeZipPathError(ValueError):
     """Raised when a ZIP entry would escape the output root."""
 
 
+def _entry_parts(entry_name: str) -> list[str]:
+    return [part for part in entry_name.replace("\\", "/").split("/") if part and part != "."]
+
+
 def _normalized_entry_parts(entry_name: str) -> list[str]:
-    parts = []
-    for part in entry_name.replace("\\", "/").split("/"):
-        if not part or part == ".":
-            continue
+    parts = _entry_parts(entry_name)
+    for part in parts:
         if part == ".." or part.endswith(":"):
             raise UnsafeZipPathError(f"Unsafe ZIP entry path: {entry_name}")
-        parts.append(part)
     return parts
 
 
@@ -33,9 +66,36 @@ def _resolve_output_path(output_root: Path, rel_parts: list[str]) -> Path:
     return target
 
 
-def extract_matching_folder(zip_path: Path, output_root: Path, wanted_folder: str) -> bool:
-    found = False
-    wanted_lower = wanted_folder.lower()
+def new_results(wanted_folders: Iterable[str]) -> Dict[str, dict]:
+    """Return an empty per-folder result: found flag, file and byte counts and source archives."""
+    return {folder: {"found": False, "files": 0, "bytes": 0, "unchanged": 0, "archives": []} for folder in wanted_folders}
+
+
+def _record(results: Dict[str, dict], zip_path: Path, entry: "IndexedEntry", unchanged: bool = False) -> None:
+    result = results[entry.folder]
+    result["found"] = True
+    if zip_path.name not in result["archives"]:
+        result["archives"].append(zip_path.name)
+    if not entry.is_dir:
+        result["files"] += 1
+        result["bytes"] += entry.file_size
+        result["unchanged"] += int(unchanged)
+
+
+def extract_matching_folders(
+    zip_path: Path,
+    output_root: Path,
+    wanted_folders: Sequence[str],
+    results: Optional[Dict[str, dict]] = None,
+    workers: int = 1,
+    chunk_size: int = COPY_CHUNK_SIZE,
+    skip_identical: bool = True,
+    stats: Optional[Dict[str, float]] = None,
+) -> Dict[str, dict]:
+    """Extract all wanted folders from one archive in a single pass over its entries."""
+    results = new_results(wanted_folders) if results is None else results
+    wanted = {folder.lower(): folder for folder in wanted_folders}
+    matched: List[IndexedEntry] = []
 
     with zipfile.ZipFile(zip_path) as archive:
         for entry in archive.infolist():
@@ -43,43 +103,454 @@ def extract_matching_folder(zip_path: Path, output_root: Path, wanted_folder: st
             if not parts:
                 continue
 
-            folder_index = next((i for i, part in enumerate(parts) if part.lower() == wanted_lower), -1)
+            folder_index = next((i for i, part in enumerate(parts) if part.lower() in wanted), -1)
             if folder_index < 0:
                 continue
 
-            rel_parts = parts[folder_index:]
-            target = _resolve_output_path(output_root, rel_parts)
-            found = True
+            folder = wanted[parts[folder_index].lower()]
+            matched.append(IndexedEntry(*_entry_row(entry), depth=folder_index, folder=folder))
+
+    unchanged = extract_indexed_entries(zip_path, output_root, matched, workers, chunk_size, skip_identical, stats)
+    for entry in matched:
+        _record(results, zip_path, entry, entry in unchanged)
+    return results
+
+
+def extract_matching_folder(zip_path: Path, output_root: Path, wanted_folder: str) -> bool:
+    return extract_matching_folders(zip_path, output_root, [wanted_folder])[wanted_folder]["found"]
+
+
+@dataclass(frozen=True)
+class IndexedEntry:
+    """One central-directory entry as stored in the ZIP index."""
+
+    name: str
+    is_dir: bool
+    file_size: int
+    compress_size: int
+    compress_type: int
+    flag_bits: int
+    header_offset: int
+    crc: int
+    date_time: str
+    depth: int = 0
+    folder: str = ""
+
+
+def _entry_row(info: zipfile.ZipInfo) -> tuple:
+    return (
+        info.filename,
+        int(info.is_dir() or info.filename.endswith(("/", "\\"))),
+        info.file_size,
+        info.compress_size,
+        info.compress_type,
+        info.flag_bits,
+        info.header_offset,
+        info.CRC,
+        ",".join(str(value) for value in info.date_time),
+    )
 
-            if entry.is_dir() or entry.filename.endswith(("/", "\\")):
-                target.mkdir(parents=True, exist_ok=True)
+
+class ZipEntryIndex:
+    """Central-directory index of the ZIP archives in a rawdata root."""
+
+    def __init__(self, index_path: Path):
+        self.path = Path(index_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._ensure_schema()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ZipEntryIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _ensure_schema(self) -> None:
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row and row[0] == INDEX_SCHEMA_VERSION:
+            return
+        with conn:
+            for table in ("folder", "entry", "archive"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("CREATE TABLE archive (id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER)")
+            conn.execute(
+                "CREATE TABLE entry (id INTEGER PRIMARY KEY, archive_id INTEGER NOT NULL, name TEXT NOT NULL,"
+                " is_dir INTEGER, file_size INTEGER, compress_size INTEGER, compress_type INTEGER,"
+                " flag_bits INTEGER, header_offset INTEGER, crc INTEGER, date_time TEXT)"
+            )
+            conn.execute("CREATE TABLE folder (key TEXT NOT NULL, archive_id INTEGER NOT NULL, entry_id INTEGER NOT NULL, depth INTEGER)")
+            conn.execute("CREATE INDEX folder_key ON folder (key, archive_id)")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (INDEX_SCHEMA_VERSION,))
+
+    def refresh(self, zip_paths: Iterable[Path]) -> List[Path]:
+        """Index archives that are new or whose size or mtime changed; return those re-read."""
+        reindexed = []
+        for zip_path in zip_paths:
+            key = str(Path(zip_path).resolve())
+            stat = Path(zip_path).stat()
+            row = self._conn.execute("SELECT id, size, mtime_ns FROM archive WHERE path = ?", (key,)).fetchone()
+            if row and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
                 continue
+            self._index_archive(Path(zip_path), key, stat, row[0] if row else None)
+            reindexed.append(Path(zip_path))
+        return reindexed
+
+    def _index_archive(self, zip_path: Path, key: str, stat: os.stat_result, old_id: Optional[int]) -> None:
+        with zipfile.ZipFile(zip_path) as archive:
+            infos = archive.infolist()
+        with self._conn as conn:
+            if old_id is not None:
+                for table in ("folder", "entry"):
+                    conn.execute(f"DELETE FROM {table} WHERE archive_id = ?", (old_id,))
+                conn.execute("DELETE FROM archive WHERE id = ?", (old_id,))
+            archive_id = conn.execute(
+                "INSERT INTO archive (path, size, mtime_ns) VALUES (?, ?, ?)", (key, stat.st_size, stat.st_mtime_ns)
+            ).lastrowid
+            for info in infos:
+                entry_id = conn.execute(
+                    "INSERT INTO entry (archive_id, name, is_dir, file_size, compress_size, compress_type,"
+                    " flag_bits, header_offset, crc, date_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (archive_id,) + _entry_row(info),
+                ).lastrowid
+                seen: Dict[str, int] = {}
+                for depth, part in enumerate(_entry_parts(info.filename)):
+                    seen.setdefault(part.lower(), depth)
+                conn.executemany(
+                    "INSERT INTO folder (key, archive_id, entry_id, depth) VALUES (?, ?, ?, ?)",
+                    ((folder_key, archive_id, entry_id, depth) for folder_key, depth in seen.items()),
+                )
+
+    def find_folders(self, wanted_folders: Sequence[str], zip_paths: Iterable[Path]) -> Dict[Path, List[IndexedEntry]]:
+        """Return {archive: entries} for the entries below any wanted folder in the given archives.
+
+        An entry below several wanted folders belongs to the outermost one.
+        """
+        wanted = {folder.lower(): folder for folder in wanted_folders}
+        placeholders = ",".join("?" * len(wanted))
+        matches: Dict[Path, List[IndexedEntry]] = {}
+        for zip_path in zip_paths:
+            row = self._conn.execute("SELECT id FROM archive WHERE path = ?", (str(Path(zip_path).resolve()),)).fetchone()
+            if not row or not wanted:
+                continue
+            entries: Dict[int, IndexedEntry] = {}
+            for entry_id, name, is_dir, *values, depth, key in self._conn.execute(
+                "SELECT e.id, e.name, e.is_dir, e.file_size, e.compress_size, e.compress_type, e.flag_bits,"
+                " e.header_offset, e.crc, e.date_time, f.depth, f.key FROM folder f JOIN entry e ON e.id = f.entry_id"
+                f" WHERE f.archive_id = ? AND f.key IN ({placeholders}) ORDER BY e.id, f.depth",
+                (row[0], *wanted),
+            ):
+                if entry_id not in entries:
+                    entries[entry_id] = IndexedEntry(name, bool(is_dir), *values, depth=depth, folder=wanted[key])
+            if entries:
+                matches[Path(zip_path)] = list(entries.values())
+        return matches
+
+    def find_folder(self, wanted_folder: str, zip_paths: Iterable[Path]) -> Dict[Path, List[IndexedEntry]]:
+        """Return {archive: entries} for the entries below ``wanted_folder`` in the given archives."""
+        return self.find_folders([wanted_folder], zip_paths)
+
+
+def _copy_entry_data(handle: BinaryIO, entry: IndexedEntry, target: BinaryIO, chunk_size: int = COPY_CHUNK_SIZE) -> None:
+    """Copy one stored or deflated entry from its local header offset and check its CRC."""
+    handle.seek(entry.header_offset)
+    header = handle.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {entry.name}")
+    fields = _LOCAL_HEADER.unpack(header)
+    handle.seek(fields[9] + fields[10], os.SEEK_CUR)
+
+    inflater = zlib.decompressobj(-15) if entry.compress_type == zipfile.ZIP_DEFLATED else None
+    remaining = entry.compress_size
+    crc = 0
+    while remaining:
+        block = handle.read(min(chunk_size, remaining))
+        if not block:
+            raise zipfile.BadZipFile(f"Truncated data for {entry.name}")
+        remaining -= len(block)
+        data = inflater.decompress(block) if inflater else block
+        crc = zlib.crc32(data, crc)
+        target.write(data)
+    if inflater:
+        data = inflater.flush()
+        crc = zlib.crc32(data, crc)
+        target.write(data)
+    if crc != entry.crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {entry.name}")
+
+
+def _is_direct_copy(entry: IndexedEntry) -> bool:
+    return entry.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) and not entry.flag_bits & 0x1
 
+
+def _entry_timestamp(entry: IndexedEntry) -> Optional[float]:
+    try:
+        return time.mktime(tuple(int(value) for value in entry.date_time.split(",")) + (0, 0, -1))
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+def _file_crc32(path: Path, chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    crc = 0
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def marker_path(output_root: Path, folder: str) -> Path:
+    """Marker recording [size, crc, mtime_ns] of the files extracted for ``folder``."""
+    return output_root / f".{folder.lower()}{MARKER_SUFFIX}"
+
+
+def _load_marker(path: Path) -> Dict[str, list]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MARKER_VERSION:
+        return {}
+    return data.get("files") or {}
+
+
+def _save_marker(path: Path, files: Dict[str, list]) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"version": MARKER_VERSION, "files": files}, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _is_unchanged(target: Path, entry: IndexedEntry, recorded: Optional[list], chunk_size: int) -> bool:
+    """True if ``target`` already holds the entry: same size, and same CRC32 per marker or content."""
+    try:
+        stat = target.stat()
+    except OSError:
+        return False
+    if stat.st_size != entry.file_size:
+        return False
+    if recorded == [entry.file_size, entry.crc, stat.st_mtime_ns]:
+        return True
+    return _file_crc32(target, chunk_size) == entry.crc
+
+
+def _extract_share(zip_path: Path, share: Sequence[tuple], chunk_size: int) -> int:
+    """Write one worker's share of (entry, target) pairs through its own archive handle."""
+    written = 0
+    fallback: Optional[zipfile.ZipFile] = None
+    try:
+        with zip_path.open("rb") as handle:
+            for entry, target in share:
+                with target.open("wb") as out:
+                    if _is_direct_copy(entry):
+                        _copy_entry_data(handle, entry, out, chunk_size)
+                    else:
+                        if fallback is None:
+                            fallback = zipfile.ZipFile(zip_path)
+                        with fallback.open(entry.name) as source:
+                            shutil.copyfileobj(source, out, chunk_size)
+                timestamp = _entry_timestamp(entry)
+                if timestamp is not None:
+                    os.utime(target, (timestamp, timestamp))
+                written += entry.file_size
+    finally:
+        if fallback is not None:
+            fallback.close()
+    return written
+
+
+def _split_shares(files: Sequence[tuple], workers: int) -> List[List[tuple]]:
+    """Spread (entry, target) pairs over ``workers`` shares, largest compressed entries first."""
+    shares: List[List[tuple]] = [[] for _ in range(max(1, min(workers, len(files))))]
+    loads = [0] * len(shares)
+    for item in sorted(files, key=lambda pair: pair[0].compress_size, reverse=True):
+        slot = loads.index(min(loads))
+        shares[slot].append(item)
+        loads[slot] += item[0].compress_size + 1
+    return shares
+
+
+def extract_indexed_entries(
+    zip_path: Path,
+    output_root: Path,
+    entries: Sequence[IndexedEntry],
+    workers: int = 1,
+    chunk_size: int = COPY_CHUNK_SIZE,
+    skip_identical: bool = True,
+    stats: Optional[Dict[str, float]] = None,
+) -> set:
+    """Extract indexed entries and return the set of entries left unchanged.
+
+    Every target path is checked and every folder created before any file is
+    written; with ``workers`` > 1 the files are inflated on a thread pool.
+    ``stats`` accumulates files and bytes written and unchanged files.
+    """
+    planned = []
+    for entry in entries:
+        parts = _normalized_entry_parts(entry.name)
+        rel_path = "/".join(parts[entry.depth:])
+        planned.append((entry, _resolve_output_path(output_root, parts[entry.depth:]), rel_path))
+
+    markers = {folder: _load_marker(marker_path(output_root, folder)) for folder in {entry.folder for entry in entries}}
+    files = []
+    unchanged = set()
+    for entry, target, rel_path in planned:
+        if entry.is_dir:
+            target.mkdir(parents=True, exist_ok=True)
+        elif skip_identical and _is_unchanged(target, entry, markers[entry.folder].get(rel_path), chunk_size):
+            unchanged.add(entry)
+        else:
             target.parent.mkdir(parents=True, exist_ok=True)
-            with archive.open(entry) as source, target.open("wb") as handle:
-                shutil.copyfileobj(source, handle)
+            files.append((entry, target))
+
+    written = 0
+    if files:
+        shares = _split_shares(files, workers)
+        if len(shares) == 1:
+            written = _extract_share(zip_path, shares[0], chunk_size)
+        else:
+            with ThreadPoolExecutor(max_workers=len(shares)) as pool:
+                written = sum(pool.map(lambda share: _extract_share(zip_path, share, chunk_size), shares))
+
+    for entry, target, rel_path in planned:
+        if not entry.is_dir:
+            markers[entry.folder][rel_path] = [entry.file_size, entry.crc, target.stat().st_mtime_ns]
+    for folder, recorded in markers.items():
+        if recorded:
+            _save_marker(marker_path(output_root, folder), recorded)
+    if stats is not None:
+        stats["files"] = stats.get("files", 0) + len(files)
+        stats["bytes"] = stats.get("bytes", 0) + written
+        stats["unchanged"] = stats.get("unchanged", 0) + len(unchanged)
+    return unchanged
+
 
-    return found
+def format_throughput(stats: Dict[str, float]) -> str:
+    seconds = stats.get("seconds", 0.0)
+    megabytes = stats.get("bytes", 0) / (1024 * 1024)
+    rate = megabytes / seconds if seconds > 0 else 0.0
+    return (
+        f"Extracted {int(stats.get('files', 0))} file(s), {megabytes:.1f} MB in {seconds:.2f} s "
+        f"({rate:.1f} MB/s, {int(stats.get('workers', 1))} worker(s)); "
+        f"{int(stats.get('unchanged', 0))} unchanged file(s) kept."
+    )
 
 
-def extract_from_zip_root(zip_root: Path, output_root: Path, wanted_folder: str) -> bool:
-    found = False
-    for zip_path in sorted(zip_root.glob("*.zip")):
-        if extract_matching_folder(zip_path, output_root, wanted_folder):
-            found = True
-    return found
+def extract_folders_from_zip_root(
+    zip_root: Path,
+    output_root: Path,
+    wanted_folders: Sequence[str],
+    index_path: Optional[Path] = None,
+    workers: int = 1,
+    chunk_size: int = COPY_CHUNK_SIZE,
+    stats: Optional[Dict[str, float]] = None,
+    skip_identical: bool = True,
+) -> Dict[str, dict]:
+    """Extract all ``wanted_folders`` from the ZIPs in ``zip_root`` with one pass per archive.
 
+    With ``index_path`` the archives are looked up in the central-directory
+    index first; without it every archive's entry table is scanned. Returns
+    ``new_results``-style status per folder; ``stats`` receives files and
+    bytes written, unchanged files, seconds and workers of the extraction.
+    With ``skip_identical=False`` every file is rewritten.
+    """
+    results = new_results(wanted_folders)
+    zip_paths = sorted(zip_root.glob("*.zip"))
+    totals: Dict[str, float] = {}
+    started = time.perf_counter()
+    if index_path is None:
+        for zip_path in zip_paths:
+            extract_matching_folders(
+                zip_path, output_root, wanted_folders, results, workers, chunk_size, skip_identical, totals
+            )
+    else:
+        with ZipEntryIndex(index_path) as index:
+            reindexed = index.refresh(zip_paths)
+            if reindexed:
+                print(f"Indexed {len(reindexed)} ZIP archive(s) in {time.perf_counter() - started:.1f} s.", file=sys.stderr)
+            matches = index.find_folders(wanted_folders, zip_paths)
+        started = time.perf_counter()
+        for zip_path, entries in matches.items():
+            unchanged = extract_indexed_entries(
+                zip_path, output_root, entries, workers, chunk_size, skip_identical, totals
+            )
+            for entry in entries:
+                _record(results, zip_path, entry, entry in unchanged)
+    if stats is not None:
+        stats.update(totals, seconds=time.perf_counter() - started, workers=max(1, workers))
+    return results
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Extract a named KG folder from ZIP archives.")
+
+def extract_from_zip_root(
+    zip_root: Path,
+    output_root: Path,
+    wanted_folder: str,
+    index_path: Optional[Path] = None,
+) -> bool:
+    """Extract ``wanted_folder`` from every ZIP in ``zip_root``; True if it was found."""
+    return extract_folders_from_zip_root(zip_root, output_root, [wanted_folder], index_path)[wanted_folder]["found"]
+
+
+def parse_folder_list(values: Iterable[str], folder_file: Optional[str] = None) -> List[str]:
+    """Split ``--folder`` values and ``--folder-file`` lines on commas, semicolons and whitespace."""
+    chunks = list(values)
+    if folder_file:
+        chunks.append(Path(folder_file).read_text(encoding="utf-8-sig"))
+    folders: List[str] = []
+    for chunk in chunks:
+        for folder in _FOLDER_SEPARATORS.split(chunk):
+            if folder and folder not in folders:
+                folders.append(folder)
+    return folders
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract named KG folders from ZIP archives.")
     parser.add_argument("--zip-root", required=True, help="Folder containing ZIP archives.")
     parser.add_argument("--output-root", required=True, help="Destination root for extracted files.")
-    parser.add_argument("--folder", required=True, help="Folder name to extract, typically a 5-digit KG number.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--folder",
+        action="append",
+        default=[],
+        help="Folder name(s) to extract, typically 5-digit KG numbers; repeatable or comma-separated.",
+    )
+    parser.add_argument("--folder-file", help="Text file with folder names to extract, one per line.")
+    parser.add_argument("--json", action="store_true", help="Print per-folder status and byte counts as JSON.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Threads inflating entries in parallel (default {DEFAULT_WORKERS}, env QFC_ZIP_WORKERS).",
+    )
+    parser.add_argument(
+        "--buffer-kb",
+        type=int,
+        default=COPY_CHUNK_SIZE // 1024,
+        help="Copy buffer per worker in KiB (env QFC_ZIP_BUFFER_KB).",
+    )
+    parser.add_argument(
+        "--index",
+        default=os.environ.get("QFC_ZIP_INDEX") or str(DEFAULT_INDEX_PATH),
+        help="SQLite central-directory index of the ZIP archives.",
+    )
+    parser.add_argument("--no-index", action="store_true", help="Scan every archive's entry table instead of using the index.")
+    parser.add_argument("--force", action="store_true", help="Rewrite files even if size and CRC32 already match.")
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        folders = parse_folder_list(args.folder, args.folder_file)
+    except OSError as err:
+        print(f"Folder list not readable: {err}", file=sys.stderr)
+        return 1
+    if not folders:
+        print("No folder to extract; pass --folder or --folder-file.", file=sys.stderr)
+        return 1
     zip_root = Path(args.zip_root)
     output_root = Path(args.output_root)
 
@@ -89,8 +560,19 @@ def main() -> int:
 
     output_root.mkdir(parents=True, exist_ok=True)
 
+    index_path = None if args.no_index else Path(args.index)
+    options = {
+        "workers": max(1, args.workers),
+        "chunk_size": max(4, args.buffer_kb) * 1024,
+        "stats": {},
+        "skip_identical": not args.force,
+    }
     try:
-        found = extract_from_zip_root(zip_root, output_root, args.folder)
+        try:
+            results = extract_folders_from_zip_root(zip_root, output_root, folders, index_path, **options)
+        except sqlite3.Error as err:
+            print(f"WARNING: ZIP index unusable ({err}); scanning archives.", file=sys.stderr)
+            results = extract_folders_from_zip_root(zip_root, output_root, folders, **options)
     except UnsafeZipPathError as err:
         print(f"Unsafe ZIP entry rejected: {err}", file=sys.stderr)
         return 1
@@ -98,7 +580,11 @@ def main() -> int:
         print(f"Invalid ZIP archive: {err}", file=sys.stderr)
         return 1
 
-    if not found:
+    if options["stats"].get("files") or options["stats"].get("unchanged"):
+        print(format_throughput(options["stats"]), file=sys.stderr)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if not all(result["found"] for result in results.values()):
         return 3
     return 0
 
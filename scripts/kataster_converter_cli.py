@@ -3,17 +3,18 @@
 
 Run via QGIS Python environment (e.g. python-qgis-ltr.bat):
     python kataster_converter_cli.py --source <folder> [--target <path.gpkg>]
+    python kataster_converter_cli.py --source <archive.zip>!/<KG-Nr> [--target <path.gpkg>]
 """
 
 import argparse
 import datetime
 import glob
 import json
-import math
 import os
 import sqlite3
 import sys
 import traceback
+import zipfile
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(SCRIPT_DIR)
@@ -74,12 +75,31 @@ from qgis.core import (
     QgsRasterLayer,
     QgsSingleSymbolRenderer,
     QgsSymbol,
-    QgsVectorFileWriter,
     QgsVectorLayer,
     QgsWkbTypes,
 )
 
-ORTHOFOTO_LAYER_NAME = 'BEV Orthofoto (basemap.at)'
+from bev_to_qfield_plugin.conversion_engine import ConversionRun
+from bev_to_qfield_plugin.conversion_stages import build_engine, tile_pack_path
+from bev_to_qfield_plugin.fast_open import (
+    apply_fast_open_profile,
+    feature_count,
+    mark_reference_layer,
+    refresh_gpkg_statistics,
+    vector_layer_options,
+)
+from bev_to_qfield_plugin.orthofoto import (
+    ORTHOFOTO_LAYER_NAME,
+    build_orthofoto_layer,
+    ensure_tile_pack_layer,
+    publish_remote_sources,
+)
+from bev_to_qfield_plugin.render_profile import apply_render_profile
+from bev_to_qfield_plugin.project_template import kataster_polygon_style, write_template_project
+from bev_to_qfield_plugin.tile_pack import parse_zoom_range
+from bev_to_qfield_plugin.workspace_catalog import catalog_grid, record_conversion
+from bev_to_qfield_plugin.zip_source import list_zip_folder, split_zip_source
+
 GEOID_PATTERN_NAME = 'GV_Hoehengrid*.tif'
 COLOR_GREEN = '\033[32m'
 COLOR_YELLOW = '\033[33m'
@@ -139,6 +159,10 @@ def find_ntv2_grid(source_folder, target_gpkg, explicit_grid=None):
     processing_root = os.environ.get('QFC_PROCESSING_ROOT')
     if processing_root:
         search_dirs.append(os.path.join(processing_root, 'grids'))
+    else:
+        cataloged = catalog_grid(source_folder, 'ntv2')
+        if cataloged:
+            return os.path.normpath(cataloged), [os.path.dirname(cataloged)]
 
     source_base = qgis_base_from_source(source_folder)
     if source_base:
@@ -172,6 +196,10 @@ def find_geoid_grid(source_folder, target_gpkg):
     processing_root = os.environ.get('QFC_PROCESSING_ROOT')
     if processing_root:
         search_dirs.append(os.path.join(processing_root, 'grids'))
+    else:
+        cataloged = catalog_grid(source_folder, 'geoid')
+        if cataloged:
+            return os.path.normpath(cataloged), [os.path.dirname(cataloged)]
 
     source_base = qgis_base_from_source(source_folder)
     if source_base:
@@ -191,14 +219,6 @@ def find_geoid_grid(source_folder, target_gpkg):
 
     return None, searched
 
-def memory_geometry_for(layer):
-    geometry_type = QgsWkbTypes.geometryType(layer.wkbType())
-    if geometry_type == QgsWkbTypes.PolygonGeometry:
-        return 'MultiPolygon'
-    if geometry_type == QgsWkbTypes.PointGeometry:
-        return 'Point'
-    return None
-
 def list_gpkg_layers(gpkg_path):
     if not os.path.exists(gpkg_path):
         return [], f'GPKG nicht gefunden: {gpkg_path}'
@@ -220,64 +240,6 @@ def list_gpkg_layers(gpkg_path):
         return [], f'GPKG-Layerliste konnte nicht gelesen werden: {err}'
 
 
-def geoid_band_field_name(layer, prefix='N_'):
-    for field in layer.fields():
-        name = field.name()
-        if name.startswith(prefix):
-            return name
-    return None
-
-
-def apply_geoid_heights(layer, geoid_tif):
-    sampled = processing.run(
-        'qgis:rastersampling',
-        {
-            'INPUT': layer,
-            'RASTERCOPY': geoid_tif,
-            'COLUMN_PREFIX': 'N_',
-            'OUTPUT': 'TEMPORARY_OUTPUT',
-        },
-    )['OUTPUT']
-
-    sampled_field = geoid_band_field_name(sampled)
-    if not sampled_field:
-        raise RuntimeError('Geoid-Rastersampling lieferte kein Hoehenfeld mit Prefix N_.')
-
-    return processing.run(
-        'native:fieldcalculator',
-        {
-            'INPUT': sampled,
-            'FIELD_NAME': 'H_orth',
-            'FIELD_TYPE': 0,
-            'FIELD_LENGTH': 20,
-            'FIELD_PRECISION': 3,
-            'FORMULA': f'z($geometry) - "{sampled_field}"',
-            'OUTPUT': 'TEMPORARY_OUTPUT',
-        },
-    )['OUTPUT']
-
-
-def build_orthofoto_layer():
-    wmts_params = {
-        'contextualWMSLegend': '0',
-        'crs': 'EPSG:3857',
-        'dpiMode': '7',
-        'format': 'image/jpeg',
-        'layers': 'bmaporthofoto30cm',
-        'styles': 'normal',
-        'tileMatrixSet': 'google3857',
-        'url': 'https://www.basemap.at/wmts/1.0.0/WMTSCapabilities.xml',
-    }
-    wmts_uri = '&'.join(f'{key}={value}' for key, value in wmts_params.items())
-
-    ortho = QgsRasterLayer(wmts_uri, ORTHOFOTO_LAYER_NAME, 'wms')
-    if not ortho.isValid():
-        return None
-
-    ortho.setOpacity(1.0)
-    return ortho
-
-
 def move_layer_to_bottom(project, layer_id):
     root = project.layerTreeRoot()
     node = root.findLayer(layer_id)
@@ -302,28 +264,39 @@ def ensure_orthofoto_layer(project):
         move_layer_to_bottom(project, ortho.id())
 
 
-def write_output_project(gpkg_path, layer_names, target_crs):
+def write_output_project(gpkg_path, layer_names, target_crs, tile_pack=None):
     output_qgz = os.path.splitext(gpkg_path)[0] + '.qgz'
     output_project = QgsProject()
     output_project.setFileName(output_qgz)
     output_project.setCrs(target_crs)
+    apply_fast_open_profile(output_project)
     ensure_orthofoto_layer(output_project)
+    try:
+        stats = refresh_gpkg_statistics(gpkg_path, layer_names)
+    except sqlite3.Error as err:
+        print(f'Hinweis: GPKG-Statistiken nicht aktualisiert ({err})')
+        stats = {}
 
     for layer_name in layer_names:
-        layer = QgsVectorLayer(f'{gpkg_path}|layername={layer_name}', layer_name, 'ogr')
+        layer = QgsVectorLayer(f'{gpkg_path}|layername={layer_name}', layer_name, 'ogr', vector_layer_options())
         if not layer.isValid():
             return None, f'Layer konnte nicht aus GPKG geladen werden: {layer_name}'
+        mark_reference_layer(layer)
 
         if 'gst' in layer_name.lower() and QgsWkbTypes.geometryType(layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
             symbol = QgsSymbol.defaultSymbol(QgsWkbTypes.PolygonGeometry)
             if symbol and hasattr(symbol.symbolLayer(0), 'setBrushStyle'):
                 symbol.symbolLayer(0).setBrushStyle(0)  # Qt.NoBrush
             layer.setRenderer(QgsSingleSymbolRenderer(symbol))
+        apply_render_profile(layer, feature_count(stats, layer_name))
 
         output_project.addMapLayer(layer)
 
+    if tile_pack:
+        ensure_tile_pack_layer(output_project, tile_pack)
     ensure_orthofoto_layer(output_project)
 
+    publish_remote_sources(output_project)
     if not output_project.write():
         return None, 'QGIS-Projektdatei konnte nicht geschrieben werden'
 
@@ -346,6 +319,10 @@ def write_report(
     lines = [
         f'Kataster-Konverter Report: {timestamp}',
         f'Quelle: {source_folder}',
+    ]
+    if split_zip_source(source_folder):
+        lines.append('Entpackt: nein (direkt aus ZIP via /vsizip/ gelesen)')
+    lines += [
         f'Ziel-GPKG: {target_gpkg}',
         f'Ziel-QGZ: {output_qgz or "nicht erstellt"}',
         f'GIS-Grid: {ntv2_grid or "nicht gefunden"}',
@@ -372,8 +349,77 @@ def write_report(
         handle.write('\n'.join(lines) + '\n')
 
 
-def convert(source_folder, target_gpkg, ntv2_grid_path=None):
-    if not os.path.isdir(source_folder):
+def _project_stage(run):
+    try:
+        os.utime(run.target_gpkg, None)
+    except OSError as err:
+        run.failed_layers.append(f'Zeitstempel konnte nicht aktualisiert werden: {err}')
+
+    qgz_layers = list(run.written_layers)
+    if not qgz_layers:
+        qgz_layers, list_error = list_gpkg_layers(run.target_gpkg)
+        if list_error:
+            run.failed_layers.append(f'Projektdatei: {list_error}')
+
+    output_qgz = None
+    if qgz_layers and run.settings.get('template_project'):
+        try:
+            output_qgz = write_template_project(
+                run.target_gpkg,
+                qgz_layers,
+                os.path.splitext(run.target_gpkg)[0] + '.qgz',
+                polygon_style=kataster_polygon_style,
+                tile_pack=run.outputs.get('tiles'),
+            )
+        except (OSError, ValueError, sqlite3.Error) as err:
+            run.failed_layers.append(f'Projektdatei: {err}')
+    elif qgz_layers:
+        output_qgz, project_error = write_output_project(
+            run.target_gpkg, qgz_layers, run.settings['crs_target'], run.outputs.get('tiles')
+        )
+        if project_error:
+            run.failed_layers.append(f'Projektdatei: {project_error}')
+    return output_qgz
+
+
+def _report_stage(run):
+    report_path = run.settings['report_path']
+    try:
+        write_report(
+            report_path,
+            run.source_folder,
+            run.target_gpkg,
+            run.outputs.get('project'),
+            run.settings.get('ntv2_grid'),
+            run.settings.get('geoid_grid'),
+            run.geoid_applied_layers,
+            run.written_layers,
+            run.skipped_layers,
+            run.failed_layers,
+        )
+    except OSError as err:
+        run.failed_layers.append(f'Reportdatei: {err}')
+        return None
+    return report_path
+
+
+def check_zip_source(zip_source):
+    archive, folder = zip_source
+    if not os.path.isfile(archive):
+        raise RuntimeError(f'ZIP-Archiv nicht gefunden: {archive}')
+    try:
+        listing = list_zip_folder(archive, folder)
+    except (OSError, zipfile.BadZipFile) as err:
+        raise RuntimeError(f'ZIP-Archiv nicht lesbar: {archive} ({err})') from err
+    if not listing:
+        raise RuntimeError(f'Ordner {folder} nicht im ZIP-Archiv gefunden: {archive}')
+
+
+def convert(source_folder, target_gpkg, ntv2_grid_path=None, ortho_zoom=None, template_project=False):
+    zip_source = split_zip_source(source_folder)
+    if zip_source:
+        check_zip_source(zip_source)
+    elif not os.path.isdir(source_folder):
         raise RuntimeError(f'Quellordner nicht gefunden: {source_folder}')
 
     target_gpkg = os.path.normpath(target_gpkg)
@@ -404,141 +450,46 @@ def convert(source_folder, target_gpkg, ntv2_grid_path=None):
         raise RuntimeError(
             f'{operation_error} Ausgewaehlte lokale GIS-Grid Datei: {ntv2_grid}'
         )
-    transform_context = QgsCoordinateTransformContext()
     geoid_grid, _searched_geoid_dirs = find_geoid_grid(source_folder, target_gpkg)
 
-    imported_layers = []
-    skipped_layers = []
-    failed_layers = []
-    geoid_applied_layers = []
     path_actions = []
 
-    gpkg_exists = os.path.exists(target_gpkg)
-    target_gpkg_existed_before = gpkg_exists
+    target_gpkg_existed_before = os.path.exists(target_gpkg)
     output_qgz_path = os.path.splitext(target_gpkg)[0] + '.qgz'
     output_qgz_existed_before = os.path.exists(output_qgz_path)
     report_path = os.path.splitext(target_gpkg)[0] + '_report.txt'
     report_existed_before = os.path.exists(report_path)
+    tile_pack_existed_before = os.path.exists(tile_pack_path(target_gpkg))
 
-    for filename in sorted(os.listdir(source_folder)):
-        if not is_kataster_shapefile(filename):
-            continue
-
-        lower_filename = filename.lower()
-        full_path = os.path.join(source_folder, filename)
-        layer = QgsVectorLayer(full_path, filename, 'ogr')
-        if not layer.isValid():
-            failed_layers.append(f'{filename}: Layer konnte nicht geladen werden')
-            continue
-
-        if not layer.crs().isValid() or layer.crs().authid() == '':
-            layer.setCrs(crs_source)
-
-        layer_name = os.path.splitext(filename)[0]
-        geometry = memory_geometry_for(layer)
-        if geometry is None:
-            skipped_layers.append(f'{filename}: nicht unterstuetzter Geometrietyp')
-            continue
-
-        try:
-            reprojected = processing.run(
-                'native:reprojectlayer',
-                {
-                    'INPUT': layer,
-                    'TARGET_CRS': crs_target,
-                    'OPERATION': operation,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
-        except Exception as err:
-            failed_layers.append(f'{filename}: Reprojektion fehlgeschlagen ({err})')
-            continue
-
-        if geoid_grid and QgsWkbTypes.geometryType(reprojected.wkbType()) == QgsWkbTypes.PointGeometry:
-            if QgsWkbTypes.hasZ(reprojected.wkbType()):
-                try:
-                    reprojected = apply_geoid_heights(reprojected, geoid_grid)
-                    geoid_applied_layers.append(layer_name)
-                except Exception as err:
-                    failed_layers.append(f'{filename}: Hoehengrid-Korrektur fehlgeschlagen ({err})')
-                    continue
-            else:
-                skipped_layers.append(f'{filename}: Hoehengrid verfuegbar, aber Geometrie hat keine Z-Werte')
-
-        extent = reprojected.extent()
-        extent_values = [extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum()]
-        if not all(math.isfinite(value) for value in extent_values):
-            failed_layers.append(f'{filename}: Reprojektion lieferte ungueltige Ausdehnung {extent_values}')
-            continue
-
-        options = QgsVectorFileWriter.SaveVectorOptions()
-        options.driverName = 'GPKG'
-        options.layerName = layer_name
-        options.fileEncoding = 'UTF-8'
-        if gpkg_exists:
-            options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
-        else:
-            options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
-
-        err, msg = QgsVectorFileWriter.writeAsVectorFormatV2(
-            reprojected,
-            target_gpkg,
-            transform_context,
-            options,
-        )
-
-        if err != QgsVectorFileWriter.NoError:
-            failed_layers.append(f'{filename}: Exportfehler ({msg})')
-            continue
-
-        gpkg_exists = True
-
-        loaded_layer = QgsVectorLayer(f'{target_gpkg}|layername={layer_name}', layer_name, 'ogr')
-        if not loaded_layer.isValid():
-            failed_layers.append(f'{filename}: Konnte nach Export nicht aus GPKG geladen werden')
-            continue
-
-        if 'gst' in lower_filename and QgsWkbTypes.geometryType(loaded_layer.wkbType()) == QgsWkbTypes.PolygonGeometry:
-            symbol = QgsSymbol.defaultSymbol(QgsWkbTypes.PolygonGeometry)
-            if symbol and hasattr(symbol.symbolLayer(0), 'setBrushStyle'):
-                symbol.symbolLayer(0).setBrushStyle(0)
-            loaded_layer.setRenderer(QgsSingleSymbolRenderer(symbol))
-
-        imported_layers.append(layer_name)
-
-    try:
-        os.utime(target_gpkg, None)
-    except OSError as err:
-        failed_layers.append(f'Zeitstempel konnte nicht aktualisiert werden: {err}')
-
-    qgz_layers = list(imported_layers)
-    if not qgz_layers:
-        qgz_layers, list_error = list_gpkg_layers(target_gpkg)
-        if list_error:
-            failed_layers.append(f'Projektdatei: {list_error}')
-
-    output_qgz = None
-    if qgz_layers:
-        output_qgz, project_error = write_output_project(target_gpkg, qgz_layers, crs_target)
-        if project_error:
-            failed_layers.append(f'Projektdatei: {project_error}')
-
-    try:
-        write_report(
-            report_path,
-            source_folder,
-            target_gpkg,
-            output_qgz,
-            ntv2_grid,
-            geoid_grid,
-            geoid_applied_layers,
-            imported_layers,
-            skipped_layers,
-            failed_layers,
-        )
-    except OSError as err:
-        failed_layers.append(f'Reportdatei: {err}')
-        report_path = None
+    run = ConversionRun(
+        source_folder,
+        target_gpkg,
+        {
+            'accept': is_kataster_shapefile,
+            'geometry_types': (QgsWkbTypes.PolygonGeometry, QgsWkbTypes.PointGeometry),
+            'crs_source': crs_source,
+            'crs_target': crs_target,
+            'operation': operation,
+            'geoid_grid': geoid_grid,
+            'transform_context': QgsCoordinateTransformContext(),
+            'ntv2_grid': ntv2_grid,
+            'report_path': report_path,
+            'tile_pack': ortho_zoom is not None,
+            'tile_zoom': ortho_zoom,
+            'template_project': template_project,
+        },
+    )
+    engine = build_engine(project=_project_stage, report=_report_stage)
+    engine.run(run)
+    print(engine.timing_summary())
+
+    output_qgz = run.outputs.get('project')
+    report_path = run.outputs.get('report')
+    tile_pack = run.outputs.get('tiles')
+    imported_layers = run.written_layers
+    skipped_layers = run.skipped_layers
+    failed_layers = run.failed_layers
+    geoid_applied_layers = run.geoid_applied_layers
 
     if not gpkg_folder_existed_before and os.path.isdir(gpkg_folder):
         path_actions.append({'action': 'Erstellt', 'kind': 'Ordner', 'path': os.path.normpath(gpkg_folder)})
@@ -552,6 +503,11 @@ def convert(source_folder, target_gpkg, ntv2_grid_path=None):
         if qgz_action:
             path_actions.append(qgz_action)
 
+    if tile_pack and os.path.exists(tile_pack):
+        tile_pack_action = path_action(tile_pack_existed_before, tile_pack, 'Datei')
+        if tile_pack_action:
+            path_actions.append(tile_pack_action)
+
     if report_path and os.path.exists(report_path):
         report_action = path_action(report_existed_before, report_path, 'Datei')
         if report_action:
@@ -561,6 +517,8 @@ def convert(source_folder, target_gpkg, ntv2_grid_path=None):
         'target_gpkg': target_gpkg,
         'output_qgz': output_qgz,
         'report_path': report_path,
+        'tile_pack': tile_pack,
+        'tile_stats': run.outputs.get('tile_stats'),
         'ntv2_grid': ntv2_grid,
         'geoid_grid': geoid_grid,
         'geoid_applied_layers': geoid_applied_layers,
@@ -571,6 +529,9 @@ def convert(source_folder, target_gpkg, ntv2_grid_path=None):
         'skipped_layers': skipped_layers,
         'failed_layers': failed_layers,
         'path_actions': path_actions,
+        'stage_timings': engine.timings,
+        'source_archive': zip_source[0] if zip_source else None,
+        'extracted': zip_source is None,
     }
 
 
@@ -592,6 +553,8 @@ def print_summary(result):
     failed_line = f'Fehlgeschlagen: {failed_count}'
     print(colorize(failed_line, COLOR_RED if failed_count else COLOR_GREEN))
     print('')
+    if result.get('source_archive'):
+        print(f"Quelle: {result['source_archive']} (direkt aus ZIP gelesen, nicht entpackt)")
     print(f"Ziel-GPKG: {result['target_gpkg']}")
     if result.get('ntv2_grid'):
         print(f"GIS-Grid: {result['ntv2_grid']}")
@@ -608,6 +571,8 @@ def print_summary(result):
         print(f"Ziel-QGZ: {result['output_qgz']}")
     if result['report_path']:
         print(f"Report: {result['report_path']}")
+    if result.get('tile_pack'):
+        print(f"Orthofoto offline: {result['tile_pack']}")
     path_actions = result.get('path_actions') or []
     if path_actions:
         print('')
@@ -639,9 +604,22 @@ def print_summary(result):
 
 def parse_args(argv):
     parser = argparse.ArgumentParser(description='Headless Kataster converter (PyQGIS).')
-    parser.add_argument('--source', required=True, help='Path to source folder with shapefiles')
+    parser.add_argument(
+        '--source',
+        required=True,
+        help='Path to source folder with shapefiles, or archive.zip!/<KG-Nr> to read them from a ZIP without extracting',
+    )
     parser.add_argument('--target', help='Path to target GPKG file (.gpkg)')
     parser.add_argument('--ntv2-grid', help='Optional explicit path to GIS_Grid .gsb file')
+    parser.add_argument(
+        '--ortho-tiles', action='store_true', help='Build an offline orthophoto MBTiles pack for the converted extent'
+    )
+    parser.add_argument('--ortho-zoom', default='14-18', help='Zoom range of the orthophoto tile pack (default 14-18)')
+    parser.add_argument(
+        '--template-project',
+        action='store_true',
+        help='Write the .qgz from the project template without opening the GPKG layers (faster for batch runs)',
+    )
     parser.add_argument('--summary-json', help='Optional output file for machine-readable summary json')
     parser.add_argument('--summary-target-file', help='Optional output file containing target_gpkg path')
     parser.add_argument('--cloud-project-id', help='Optional QFieldCloud project id; enables post-conversion sync')
@@ -711,6 +689,7 @@ def main(argv):
 
     source_folder = os.path.normpath(args.source)
     target_gpkg = os.path.normpath(args.target) if args.target else default_output_path(source_folder)
+    ortho_zoom = parse_zoom_range(args.ortho_zoom) if args.ortho_tiles else None
 
     result = None
     qgs = QgsApplication([], False)
@@ -722,8 +701,15 @@ def main(argv):
         )
     Processing.initialize()
     try:
-        result = convert(source_folder, target_gpkg, ntv2_grid_path=args.ntv2_grid)
+        result = convert(
+            source_folder,
+            target_gpkg,
+            ntv2_grid_path=args.ntv2_grid,
+            ortho_zoom=ortho_zoom,
+            template_project=args.template_project,
+        )
         print_summary(result)
+        record_conversion(source_folder, os.path.basename(source_folder))
     finally:
         qgs.exitQgis()
 
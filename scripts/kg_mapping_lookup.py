@@ -1,17 +1,33 @@
 #!/usr/bin/env python3
-"""Discover and parse Katastralgemeinde number/name mappings."""
+"""Discover and parse Katastralgemeinde number/name mappings.
+
+The parsed mapping is kept in a small SQLite index that records path, size,
+mtime and SHA-256 of the mapping source (CSV or ZIP). It is only rebuilt when
+the source changes; ``KgMappingIndex`` offers ``lookup``, ``lookup_many`` and
+prefix/fuzzy ``search``, and ``--query`` exposes them as JSON on the CLI.
+"""
 
 from __future__ import annotations
 
 import argparse
+import codecs
 import csv
+import difflib
+import hashlib
+import io
+import json
 import os
 import re
+import shutil
+import sqlite3
 import sys
 import tempfile
+import time
+import unicodedata
 import zipfile
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 CANDIDATE_FILENAMES = (
@@ -23,6 +39,16 @@ CANDIDATE_FILENAMES = (
     "kgvz.csv",
 )
 
+INDEX_SCHEMA_VERSION = "1"
+DEFAULT_INDEX_PATH = Path(tempfile.gettempdir()) / "qfc_kg_lookup_cache" / "kg_mapping_index.sqlite"
+SEARCH_LIMIT = 20
+EXTRACT_CHUNK_SIZE = 256 * 1024
+CSV_SAMPLE_SIZE = 64 * 1024
+CSV_ENCODINGS = ("utf-8-sig", "cp1252", "latin1")
+DISCOVERY_MAX_DEPTH = int(os.environ.get("QFC_KG_DISCOVERY_DEPTH", "3"))
+SKIP_DIR_NAMES = {"entzippt", "_kg_lookup_cache"}
+KG_DIR_PATTERN = re.compile(r"\d{5}(?:[_ -].*)?")
+
 CSV_KEYWORDS = ("kg", "katastral", "gemeinde", "verzeichnis", "mapping")
 ZIP_KEYWORDS = ("kg", "katastral", "gemeinde", "verzeichnis")
 
@@ -48,13 +74,16 @@ def normalize_header(value: str) -> str:
     return re.sub(r"[^a-z0-9]+", "", (value or "").strip().lower())
 
 
-def read_text_with_fallback(path: Path) -> str:
-    for encoding in ("utf-8-sig", "cp1252", "latin1"):
+def detect_encoding(sample: bytes, at_eof: bool, start: int = 0) -> Tuple[int, str]:
+    """Return (index, encoding) of the first ``CSV_ENCODINGS`` entry from ``start`` that decodes the sample."""
+    for index in range(start, len(CSV_ENCODINGS)):
+        decoder = codecs.getincrementaldecoder(CSV_ENCODINGS[index])()
         try:
-            return path.read_text(encoding=encoding)
+            decoder.decode(sample, final=at_eof)
         except UnicodeDecodeError:
             continue
-    raise ValueError(f"Could not decode CSV file: {path}")
+        return index, CSV_ENCODINGS[index]
+    raise UnicodeDecodeError("latin1", sample, 0, len(sample), "no CSV encoding matches")
 
 
 def pick_delimiter(sample: str) -> str:
@@ -88,12 +117,72 @@ def choose_fields(fieldnames: Iterable[str]) -> Tuple[Optional[str], Optional[st
 
 
 def parse_mapping_csv(csv_path: Path) -> Dict[str, str]:
-    text = read_text_with_fallback(csv_path)
-    lines = [line for line in text.splitlines() if line.strip()]
-    if not lines:
-        raise ValueError(f"CSV file is empty: {csv_path}")
+    return parse_mapping_stream(lambda: csv_path.open("rb"), csv_path)
 
-    delimiter = pick_delimiter("\n".join(lines[:20]))
+
+def parse_mapping_zip(zip_path: Path) -> Tuple[Dict[str, str], str]:
+    """Parse the mapping CSV straight from the ZIP without a temp copy; returns (mapping, entry name)."""
+    with zipfile.ZipFile(zip_path) as archive:
+        entry = choose_zip_csv_entry(archive, zip_path)
+        mapping = parse_mapping_stream(lambda: archive.open(entry), f"{zip_path}!{entry.filename}")
+    return mapping, entry.filename
+
+
+def parse_mapping_stream(open_binary: Callable[[], BinaryIO], csv_path: object) -> Dict[str, str]:
+    """Parse a mapping CSV in one streaming pass.
+
+    Encoding and delimiter come from the first CSV_SAMPLE_SIZE bytes; the rest
+    is decoded incrementally while rows are read, so only the mapping itself is
+    kept in memory. If a later block does not decode, the file is read again
+    with the next encoding in ``CSV_ENCODINGS``.
+    """
+    start = 0
+    while True:
+        with open_binary() as raw:
+            sample = raw.read(CSV_SAMPLE_SIZE)
+            if not sample.strip():
+                raise ValueError(f"CSV file is empty: {csv_path}")
+            at_eof = len(sample) < CSV_SAMPLE_SIZE
+            try:
+                index, encoding = detect_encoding(sample, at_eof, start)
+            except UnicodeDecodeError:
+                raise ValueError(f"Could not decode CSV file: {csv_path}") from None
+            sample_text = codecs.getincrementaldecoder(encoding)().decode(sample, final=at_eof)
+            sample_lines = [line for line in sample_text.splitlines() if line.strip()]
+            delimiter = pick_delimiter("\n".join(sample_lines[:20]))
+
+            buffered = io.BufferedReader(_PrefixedReader(sample, raw), CSV_SAMPLE_SIZE)
+            text = io.TextIOWrapper(buffered, encoding=encoding, newline="")
+            try:
+                return _parse_mapping_rows((line for line in text if line.strip()), delimiter, csv_path)
+            except UnicodeDecodeError:
+                start = index + 1
+            finally:
+                text.detach()
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Binary reader that replays an already read sample before the rest of the stream."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _parse_mapping_rows(lines: Iterable[str], delimiter: str, csv_path: object) -> Dict[str, str]:
     reader = csv.DictReader(lines, delimiter=delimiter)
     if not reader.fieldnames:
         raise ValueError(f"CSV header missing: {csv_path}")
@@ -111,11 +200,11 @@ def parse_mapping_csv(csv_path: Path) -> Dict[str, str]:
             continue
 
         digits = "".join(ch for ch in raw_number if ch.isdigit())
-        if len(digits) != 5:
+        if len(digits) != 5 or digits in mapping:
             continue
 
         clean_name = " ".join(raw_name.split())
-        if digits not in mapping and clean_name:
+        if clean_name:
             mapping[digits] = clean_name
 
     if not mapping:
@@ -129,84 +218,379 @@ def score_name(name: str, keywords: Tuple[str, ...]) -> int:
     return sum(1 for keyword in keywords if keyword in lower_name)
 
 
-def discover_files(root: Path) -> Tuple[Optional[Path], Optional[Path]]:
-    csv_best: Optional[Tuple[int, int, Path]] = None
-    zip_best: Optional[Tuple[int, int, Path]] = None
+def is_skipped_dir(name: str) -> bool:
+    lower_name = name.lower()
+    return lower_name in SKIP_DIR_NAMES or KG_DIR_PATTERN.fullmatch(lower_name) is not None
+
+
+def discover_files(
+    root: Path,
+    max_depth: int = DISCOVERY_MAX_DEPTH,
+    stats: Optional[Dict[str, int]] = None,
+) -> Tuple[Optional[Path], Optional[Path]]:
+    """Find the best mapping CSV and ZIP below root.
+
+    The tree is walked breadth-first with ``os.scandir`` down to ``max_depth``
+    path levels, skipping extracted KG data folders (5-digit names,
+    ``entzippt``, ``_kg_lookup_cache``). The walk stops at the first file
+    named like one of ``CANDIDATE_FILENAMES``. ``stats`` receives the number
+    of scanned entries.
+    """
+    csv_best: Optional[Tuple[int, int, str]] = None
+    zip_best: Optional[Tuple[int, int, str]] = None
+    scanned = 0
+    level = [str(root)]
+    depth = 1
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        rel_parts = tuple(part.lower() for part in path.relative_to(root).parts)
-        if "_kg_lookup_cache" in rel_parts:
-            continue
-        lower_name = path.name.lower()
-        depth = len(path.relative_to(root).parts)
-
-        if lower_name.endswith(".csv"):
-            score = score_name(lower_name, CSV_KEYWORDS)
-            if score > 0:
-                candidate = (score, -depth, path)
-                if csv_best is None or candidate > csv_best:
-                    csv_best = candidate
-        elif lower_name.endswith(".zip"):
-            score = score_name(lower_name, ZIP_KEYWORDS)
-            if score > 0:
-                candidate = (score, -depth, path)
-                if zip_best is None or candidate > zip_best:
-                    zip_best = candidate
-
-    csv_path = csv_best[2] if csv_best else None
-    zip_path = zip_best[2] if zip_best else None
+    try:
+        while level and depth <= max_depth:
+            next_level = []
+            for folder in level:
+                try:
+                    entries = list(os.scandir(folder))
+                except OSError:
+                    continue
+                for entry in sorted(entries, key=lambda item: item.name):
+                    scanned += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not is_skipped_dir(entry.name):
+                                next_level.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+
+                    lower_name = entry.name.lower()
+                    if lower_name in CANDIDATE_FILENAMES:
+                        return Path(entry.path), None
+                    if lower_name.endswith(".csv"):
+                        score = score_name(lower_name, CSV_KEYWORDS)
+                        if score > 0:
+                            candidate = (score, -depth, entry.path)
+                            if csv_best is None or candidate > csv_best:
+                                csv_best = candidate
+                    elif lower_name.endswith(".zip"):
+                        score = score_name(lower_name, ZIP_KEYWORDS)
+                        if score > 0:
+                            candidate = (score, -depth, entry.path)
+                            if zip_best is None or candidate > zip_best:
+                                zip_best = candidate
+            level = next_level
+            depth += 1
+    finally:
+        if stats is not None:
+            stats["scanned"] = scanned
+
+    csv_path = Path(csv_best[2]) if csv_best else None
+    zip_path = Path(zip_best[2]) if zip_best else None
     return csv_path, zip_path
 
 
+def choose_zip_csv_entry(archive: zipfile.ZipFile, zip_path: Path) -> zipfile.ZipInfo:
+    csv_entries = [entry for entry in archive.infolist() if not entry.is_dir() and entry.filename.lower().endswith(".csv")]
+    if not csv_entries:
+        raise ValueError(f"ZIP file contains no CSV: {zip_path}")
+
+    scored_entries = []
+    for entry in csv_entries:
+        entry_name = Path(entry.filename).name.lower()
+        scored_entries.append((score_name(entry_name, CSV_KEYWORDS), len(entry.filename), entry.filename, entry))
+    scored_entries.sort(key=lambda item: item[:3], reverse=True)
+    return scored_entries[0][3]
+
+
+def _extraction_record(zip_path: Path, entry: zipfile.ZipInfo) -> Dict[str, object]:
+    stat = zip_path.stat()
+    return {
+        "zip_path": str(zip_path.resolve()),
+        "zip_size": stat.st_size,
+        "zip_mtime_ns": stat.st_mtime_ns,
+        "entry": entry.filename,
+        "entry_crc32": entry.CRC,
+        "entry_size": entry.file_size,
+    }
+
+
 def extract_csv_from_zip(zip_path: Path, rawdata_root: Path) -> Path:
+    """Extract the best CSV entry into the temp cache and return its path.
+
+    The entry is streamed in EXTRACT_CHUNK_SIZE blocks. A ``.json`` record
+    next to the cached file holds the ZIP size/mtime and the entry CRC32;
+    while they match, the cached file is reused without touching the entry.
+    """
     del rawdata_root  # Kept in signature for compatibility with current call sites.
     cache_dir = Path(tempfile.gettempdir()) / "qfc_kg_lookup_cache"
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     with zipfile.ZipFile(zip_path) as archive:
-        csv_entries = [entry for entry in archive.infolist() if not entry.is_dir() and entry.filename.lower().endswith(".csv")]
-        if not csv_entries:
-            raise ValueError(f"ZIP file contains no CSV: {zip_path}")
-
-        scored_entries = []
-        for entry in csv_entries:
-            entry_name = Path(entry.filename).name.lower()
-            scored_entries.append((score_name(entry_name, CSV_KEYWORDS), len(entry.filename), entry))
-        scored_entries.sort(reverse=True)
-        best_entry = scored_entries[0][2]
-
+        best_entry = choose_zip_csv_entry(archive, zip_path)
         out_path = cache_dir / f"{zip_path.stem}_{Path(best_entry.filename).name}"
-        with archive.open(best_entry) as source, out_path.open("wb") as target:
-            target.write(source.read())
+        record_path = out_path.with_name(out_path.name + ".json")
+        record = _extraction_record(zip_path, best_entry)
+        try:
+            cached = json.loads(record_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cached = None
+        if cached == record and out_path.is_file() and out_path.stat().st_size == best_entry.file_size:
+            return out_path
+
+        tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+        with archive.open(best_entry) as source, tmp_path.open("wb") as target:
+            shutil.copyfileobj(source, target, EXTRACT_CHUNK_SIZE)
+        os.replace(tmp_path, out_path)
+        record_path.write_text(json.dumps(record), encoding="utf-8")
         return out_path
 
 
-def resolve_mapping_source(rawdata_root: Path, explicit_mapping: Optional[str]) -> Tuple[Path, Optional[Path]]:
+def locate_mapping_source(
+    rawdata_root: Path,
+    explicit_mapping: Optional[str],
+    remembered: Optional[str] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Path:
+    """Return the mapping CSV or ZIP to use, without extracting anything.
+
+    Order: explicit file, a candidate file name in the root, the remembered
+    source of the last run (if it still exists), then ``discover_files``.
+    """
     if explicit_mapping:
         explicit_path = Path(explicit_mapping)
         if explicit_path.is_file():
-            if explicit_path.suffix.lower() == ".zip":
-                extracted = extract_csv_from_zip(explicit_path, rawdata_root)
-                return extracted, explicit_path
-            return explicit_path, None
+            return explicit_path
 
     for name in CANDIDATE_FILENAMES:
         candidate = rawdata_root / name
         if candidate.is_file():
-            return candidate, None
+            return candidate
+
+    if remembered and Path(remembered).is_file():
+        if stats is not None:
+            stats["remembered"] = 1
+        return Path(remembered)
 
-    csv_file, zip_file = discover_files(rawdata_root)
+    csv_file, zip_file = discover_files(rawdata_root, stats=stats)
     if csv_file:
-        return csv_file, None
+        return csv_file
     if zip_file:
-        extracted = extract_csv_from_zip(zip_file, rawdata_root)
-        return extracted, zip_file
+        return zip_file
 
     raise FileNotFoundError(f"No KG mapping CSV/ZIP found in rawdata root: {rawdata_root}")
 
 
+def resolve_mapping_source(rawdata_root: Path, explicit_mapping: Optional[str]) -> Tuple[Path, Optional[Path]]:
+    source = locate_mapping_source(rawdata_root, explicit_mapping)
+    if source.suffix.lower() == ".zip":
+        return extract_csv_from_zip(source, rawdata_root), source
+    return source, None
+
+
+def normalize_name(value: str) -> str:
+    """Search key for KG names: case-folded, without accents and extra whitespace."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_signature(path: Path) -> Dict[str, str]:
+    stat = path.stat()
+    return {"source_path": str(path.resolve()), "source_size": str(stat.st_size), "source_mtime_ns": str(stat.st_mtime_ns)}
+
+
+class KgMappingIndex:
+    """Read access to a KG mapping index built by ``build_index``."""
+
+    def __init__(self, index_path: Path):
+        self.path = Path(index_path)
+        self._conn = sqlite3.connect(str(self.path))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "KgMappingIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def meta(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT key, value FROM meta"))
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM kg").fetchone()[0]
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(self._conn.execute("SELECT number, name FROM kg ORDER BY number"))
+
+    def lookup(self, number: str) -> Optional[str]:
+        row = self._conn.execute("SELECT name FROM kg WHERE number = ?", (str(number).strip(),)).fetchone()
+        return row[0] if row else None
+
+    def lookup_many(self, numbers: Iterable[str]) -> Dict[str, str]:
+        """Return {number: name} for the numbers that are known."""
+        wanted = sorted({str(number).strip() for number in numbers})
+        result: Dict[str, str] = {}
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            result.update(self._conn.execute(f"SELECT number, name FROM kg WHERE number IN ({placeholders})", chunk))
+        return result
+
+    def search(self, text: str, limit: int = SEARCH_LIMIT, fuzzy: bool = True) -> List[Tuple[str, str]]:
+        """Find (number, name) pairs by name: prefix matches, then substring, then close matches."""
+        key = normalize_name(text)
+        if not key:
+            return []
+        escaped = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        found: List[Tuple[str, str]] = []
+        for pattern in (f"{escaped}%", f"%{escaped}%"):
+            for number, name in self._conn.execute(
+                "SELECT number, name FROM kg WHERE name_key LIKE ? ESCAPE '\\' ORDER BY name_key, number LIMIT ?",
+                (pattern, limit),
+            ):
+                if (number, name) not in found:
+                    found.append((number, name))
+            if len(found) >= limit:
+                return found[:limit]
+        if fuzzy and len(found) < limit:
+            rows = self._conn.execute("SELECT number, name, name_key FROM kg").fetchall()
+            by_key: Dict[str, List[Tuple[str, str]]] = {}
+            for number, name, name_key in rows:
+                by_key.setdefault(name_key, []).append((number, name))
+            for match in difflib.get_close_matches(key, list(by_key), n=limit, cutoff=0.75):
+                for pair in by_key[match]:
+                    if pair not in found:
+                        found.append(pair)
+        return found[:limit]
+
+
+def _read_meta(index_path: Path) -> Dict[str, str]:
+    if not index_path.is_file():
+        return {}
+    try:
+        with closing(sqlite3.connect(str(index_path))) as conn:
+            return dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.Error:
+        return {}
+
+
+def build_index(index_path: Path, mapping: Dict[str, str], meta: Dict[str, str]) -> None:
+    """Write a fresh index next to ``index_path`` and move it into place."""
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE kg (number TEXT PRIMARY KEY, name TEXT NOT NULL, name_key TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO kg (number, name, name_key) VALUES (?, ?, ?)",
+            ((number, name, normalize_name(name)) for number, name in mapping.items()),
+        )
+        conn.execute("CREATE INDEX kg_name_key ON kg (name_key)")
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", meta.items())
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, index_path)
+
+
+def _update_meta(index_path: Path, values: Dict[str, str]) -> None:
+    with closing(sqlite3.connect(str(index_path))) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items())
+
+
+def open_index(
+    rawdata_root: Path,
+    explicit_mapping: Optional[str] = None,
+    index_path: Path = DEFAULT_INDEX_PATH,
+    extract_zip: bool = True,
+) -> Tuple[KgMappingIndex, Dict[str, str]]:
+    """Return the mapping index for the current source, rebuilding it only if the source changed.
+
+    The index is reused when path, size and mtime match; a changed mtime
+    with unchanged SHA-256 only refreshes the stored signature.
+    The source found for a rawdata root is remembered in the index, so later
+    runs skip the directory scan while that file exists. With
+    ``extract_zip=False`` a ZIP source is parsed from the archive stream and
+    MAPPING_FILE is reported as ``<zip>!<entry>``.
+    The returned status has MAPPING_FILE, COUNT, INDEX, INDEX_REBUILT,
+    SCAN_SECONDS, SCANNED_ENTRIES, SOURCE_REMEMBERED and, for ZIP sources,
+    EXTRACTED_FROM.
+    """
+    index_path = Path(index_path)
+    meta = _read_meta(index_path)
+    root_key = str(Path(rawdata_root).resolve())
+    remembered = meta.get("source_path") if meta.get("rawdata_root") == root_key else None
+    scan_stats: Dict[str, int] = {}
+    started = time.perf_counter()
+    source = locate_mapping_source(rawdata_root, explicit_mapping, remembered, scan_stats)
+    scan_seconds = time.perf_counter() - started
+    signature = dict(source_signature(source), rawdata_root=root_key)
+
+    valid = meta.get("schema_version") == INDEX_SCHEMA_VERSION and meta.get("source_path") == signature["source_path"]
+    rebuilt = False
+    if valid and any(meta.get(key) != value for key, value in signature.items()):
+        source_hash = file_sha256(source)
+        valid = meta.get("source_sha256") == source_hash
+        if valid:
+            _update_meta(index_path, signature)
+    if not valid:
+        if source.suffix.lower() == ".zip" and not extract_zip:
+            mapping, entry_name = parse_mapping_zip(source)
+            mapping_csv, extracted_from = f"{source}!{entry_name}", source
+        else:
+            mapping_csv, extracted_from = resolve_mapping_source(rawdata_root, str(source))
+            mapping = parse_mapping_csv(mapping_csv)
+        meta = dict(
+            signature,
+            schema_version=INDEX_SCHEMA_VERSION,
+            source_sha256=file_sha256(source),
+            mapping_file=str(mapping_csv),
+            extracted_from=str(extracted_from or ""),
+        )
+        build_index(index_path, mapping, meta)
+        rebuilt = True
+
+    index = KgMappingIndex(index_path)
+    status = {
+        "MAPPING_FILE": meta.get("mapping_file") or str(source),
+        "COUNT": str(index.count()),
+        "INDEX": str(index_path),
+        "INDEX_REBUILT": "1" if rebuilt else "0",
+        "SCAN_SECONDS": f"{scan_seconds:.3f}",
+        "SCANNED_ENTRIES": str(scan_stats.get("scanned", 0)),
+        "SOURCE_REMEMBERED": str(scan_stats.get("remembered", 0)),
+    }
+    if meta.get("extracted_from"):
+        status["EXTRACTED_FROM"] = meta["extracted_from"]
+    return index, status
+
+
+def query_index(index: KgMappingIndex, queries: Iterable[str], limit: int = SEARCH_LIMIT) -> List[Dict]:
+    """Answer CLI queries: 5-digit values are KG numbers, anything else is a name search."""
+    results = []
+    for query in queries:
+        text = query.strip()
+        if re.fullmatch(r"\d{5}", text):
+            name = index.lookup(text)
+            matches = [(text, name)] if name else []
+        else:
+            matches = index.search(text, limit)
+        results.append({"query": query, "matches": [{"kg_number": n, "kg_name": name} for n, name in matches]})
+    return results
+
+
 def write_cache(cache_path: Path, mapping: Dict[str, str]) -> None:
     cache_path.parent.mkdir(parents=True, exist_ok=True)
     with cache_path.open("w", encoding="utf-8", newline="") as handle:
@@ -233,17 +617,94 @@ def clean_path_arg(value: Optional[str]) -> Optional[str]:
     return cleaned
 
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Build KG number->name lookup cache from local rawdata.")
-    parser.add_argument("--rawdata-root", required=True, help="Rawdata folder to search for mapping CSV/ZIP.")
-    parser.add_argument("--mapping-file", help="Optional explicit mapping file path (CSV or ZIP).")
-    parser.add_argument("--cache-out", required=True, help="Output cache file path (semicolon separated).")
-    parser.add_argument("--status-file", help="Optional status output file.")
-    return parser.parse_args()
+def slugify_kg_name(name: str) -> str:
+    """ASCII slug of a KG name for folder names: accents dropped, lower case, '-' separated.
+
+    Same rules as the launcher's former PowerShell slugger, so existing output folder names stay stable.
+    """
+    decomposed = unicodedata.normalize("NFD", name or "")
+    ascii_text = "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn").lower()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text).strip("-")
+
+
+def list_kg_folders(folder_root: Path) -> List[str]:
+    """Return the 5-digit KG folder names directly below folder_root, sorted."""
+    try:
+        entries = list(os.scandir(folder_root))
+    except OSError:
+        return []
+    return sorted(entry.name for entry in entries if re.fullmatch(r"\d{5}", entry.name) and entry.is_dir())
+
 
+def resolve_numbers(index: KgMappingIndex, numbers: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """Return (number, name, slug) for each number in input order; unknown numbers get empty name and slug."""
+    numbers = list(dict.fromkeys(str(number).strip() for number in numbers if str(number).strip()))
+    names = index.lookup_many(numbers)
+    return [(number, names.get(number, ""), slugify_kg_name(names.get(number, ""))) for number in numbers]
 
-def main() -> int:
-    args = parse_args()
+
+def write_resolved(out_path: Optional[Path], rows: Iterable[Tuple[str, str, str]]) -> None:
+    """Write ``number;name;slug`` lines to out_path, or to stdout without one."""
+    lines = "".join(f"{number};{name};{slug}\n" for number, name, slug in rows)
+    if out_path is None:
+        sys.stdout.write(lines)
+        return
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(lines, encoding="utf-8", newline="")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--rawdata-root", required=True, help="Rawdata folder to search for mapping CSV/ZIP.")
+    common.add_argument("--mapping-file", help="Optional explicit mapping file path (CSV or ZIP).")
+    common.add_argument("--cache-out", help="Output cache file path (semicolon separated).")
+    common.add_argument("--status-file", help="Optional status output file.")
+    common.add_argument(
+        "--index",
+        default=os.environ.get("QFC_KG_INDEX") or str(DEFAULT_INDEX_PATH),
+        help="SQLite mapping index, rebuilt only when the mapping source changes.",
+    )
+    common.add_argument(
+        "--no-extract",
+        action="store_true",
+        help="Parse a mapping ZIP directly from the archive instead of extracting the CSV to the temp cache.",
+    )
+
+    if argv[:1] == ["resolve"]:
+        parser = argparse.ArgumentParser(
+            prog="kg_mapping_lookup.py resolve",
+            parents=[common],
+            description="Resolve many KG numbers to number;name;slug lines in one call.",
+        )
+        parser.add_argument("numbers", nargs="*", help="KG numbers to resolve.")
+        parser.add_argument("--folder-root", help="Also resolve every 5-digit KG folder below this folder.")
+        parser.add_argument("--out", help="Output file for number;name;slug lines (default: stdout).")
+        args = parser.parse_args(argv[1:])
+        args.command = "resolve"
+        return args
+
+    parser = argparse.ArgumentParser(
+        description="Build KG number->name lookup cache from local rawdata.",
+        parents=[common],
+        epilog="Use 'kg_mapping_lookup.py resolve --help' for bulk number;name;slug resolution.",
+    )
+    parser.add_argument(
+        "--query",
+        action="append",
+        default=[],
+        help="KG number or name (prefix/fuzzy) to look up; repeatable. Prints JSON.",
+    )
+    parser.add_argument("--limit", type=int, default=SEARCH_LIMIT, help="Maximum matches per name query.")
+    args = parser.parse_args(argv)
+    if not args.cache_out and not args.query:
+        parser.error("--cache-out or --query is required")
+    args.command = "cache"
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     status: Dict[str, str] = {}
     status_path = Path(clean_path_arg(args.status_file)) if args.status_file else None
 
@@ -253,14 +714,22 @@ def main() -> int:
             raise FileNotFoundError(f"Rawdata root not found: {rawdata_root}")
 
         mapping_file = clean_path_arg(args.mapping_file) if args.mapping_file else None
-        mapping_csv, extracted_from = resolve_mapping_source(rawdata_root, mapping_file)
-        mapping = parse_mapping_csv(mapping_csv)
-        write_cache(Path(clean_path_arg(args.cache_out)), mapping)
-
-        status["MAPPING_FILE"] = str(mapping_csv)
-        status["COUNT"] = str(len(mapping))
-        if extracted_from:
-            status["EXTRACTED_FROM"] = str(extracted_from)
+        index, index_status = open_index(
+            rawdata_root, mapping_file, Path(clean_path_arg(args.index)), extract_zip=not args.no_extract
+        )
+        with index:
+            status.update(index_status)
+            if args.cache_out:
+                write_cache(Path(clean_path_arg(args.cache_out)), dict(index.items()))
+            if args.command == "resolve":
+                numbers = list(args.numbers)
+                if args.folder_root:
+                    numbers.extend(list_kg_folders(Path(clean_path_arg(args.folder_root))))
+                rows = resolve_numbers(index, numbers)
+                write_resolved(Path(clean_path_arg(args.out)) if args.out else None, rows)
+                status["RESOLVED"] = str(sum(1 for _number, name, _slug in rows if name))
+            elif args.query:
+                print(json.dumps(query_index(index, args.query, args.limit), ensure_ascii=False, indent=2))
         write_status(status_path, status)
         return 0
     except Exception as exc:
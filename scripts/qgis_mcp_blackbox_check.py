@@ -10,10 +10,11 @@ import argparse
 import json
 import os
 import socket
+import statistics
 import sys
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -133,10 +134,55 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         default=2,
         help="Number of interactive retry prompts if server is unreachable (default: 2).",
     )
+    parser.add_argument(
+        "--open-repeat",
+        type=int,
+        default=1,
+        help="Load the project this many times and record the open time (default: 1).",
+    )
+    parser.add_argument(
+        "--baseline-summary",
+        default="",
+        help="Optional summary JSON of an earlier run to compare the project open and render times against.",
+    )
+    parser.add_argument(
+        "--render-repeat",
+        type=int,
+        default=1,
+        help="Render the map this many times and record the render time (default: 1).",
+    )
     parser.add_argument("--summary-json", default="", help="Optional path to write JSON summary.")
     return parser.parse_args(argv)
 
 
+def _timing_stats(durations: List[float]) -> Dict[str, Any]:
+    return {
+        "runs": len(durations),
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "max": max(durations),
+    }
+
+
+def _compare_timing(current: Dict[str, Any], baseline_path: str, key: str = "load_project") -> Optional[Dict[str, Any]]:
+    """Compare a median timing with the one stored in an earlier summary JSON.
+
+    Returns None if the baseline has no timing for ``key``.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    timing = baseline.get("timings", {}).get(key)
+    if not timing:
+        return None
+    baseline_median = float(timing["median"])
+    return {
+        "baseline_summary": os.path.abspath(baseline_path),
+        "baseline_median": baseline_median,
+        "median": current["median"],
+        "speedup": baseline_median / current["median"] if current["median"] > 0 else None,
+    }
+
+
 def _wait_for_server(host: str, port: int, timeout_seconds: float, poll_seconds: float) -> bool:
     timeout_seconds = max(0.0, float(timeout_seconds))
     poll_seconds = max(0.1, float(poll_seconds))
@@ -212,6 +258,7 @@ def main(argv: list[str]) -> int:
         "host": args.host,
         "port": args.port,
         "checks": {},
+        "timings": {},
         "errors": [],
     }
     created_render = False
@@ -244,8 +291,19 @@ def main(argv: list[str]) -> int:
             qgis_info = _as_success_result(client.send_command("get_qgis_info"), "get_qgis_info")
             summary["checks"]["qgis_info"] = qgis_info
 
-            load_result = _as_success_result(client.send_command("load_project", {"path": project_path}), "load_project")
+            load_durations = []
+            for _ in range(max(1, args.open_repeat)):
+                started = time.perf_counter()
+                load_result = _as_success_result(
+                    client.send_command("load_project", {"path": project_path}), "load_project"
+                )
+                load_durations.append(time.perf_counter() - started)
             summary["checks"]["load_project"] = load_result
+            summary["timings"]["load_project"] = _timing_stats(load_durations)
+            if args.baseline_summary:
+                summary["timings"]["load_project_vs_baseline"] = _compare_timing(
+                    summary["timings"]["load_project"], args.baseline_summary
+                )
 
             project_info = _as_success_result(client.send_command("get_project_info"), "get_project_info")
             summary["checks"]["project_info"] = project_info
@@ -282,11 +340,20 @@ def main(argv: list[str]) -> int:
                 "feature_count": int(features.get("feature_count") or 0) if isinstance(features, dict) else None,
             }
 
-            render_result = _as_success_result(
-                client.send_command("render_map", {"path": render_path, "width": 1280, "height": 720}),
-                "render_map",
-            )
+            render_durations = []
+            for _ in range(max(1, args.render_repeat)):
+                started = time.perf_counter()
+                render_result = _as_success_result(
+                    client.send_command("render_map", {"path": render_path, "width": 1280, "height": 720}),
+                    "render_map",
+                )
+                render_durations.append(time.perf_counter() - started)
             summary["checks"]["render_map"] = render_result
+            summary["timings"]["render_map"] = _timing_stats(render_durations)
+            if args.baseline_summary:
+                summary["timings"]["render_map_vs_baseline"] = _compare_timing(
+                    summary["timings"]["render_map"], args.baseline_summary, "render_map"
+                )
             created_render = os.path.isfile(render_path)
             if not created_render:
                 raise RuntimeError(f"Render probe reported success but file not found: {render_path}")
@@ -297,6 +364,17 @@ def main(argv: list[str]) -> int:
             print(f"- CRS: {loaded_crs}")
             print(f"- Layers: total={len(layers)} vector={len(vector_layers)}")
             print(f"- Render: {render_path}")
+            open_time = summary["timings"]["load_project"]
+            print(f"- Open time: median={open_time['median']:.3f}s runs={open_time['runs']}")
+            render_time = summary["timings"]["render_map"]
+            print(f"- Render time: median={render_time['median']:.3f}s runs={render_time['runs']}")
+            for key, label in (("load_project", "Open time"), ("render_map", "Render time")):
+                comparison = summary["timings"].get(f"{key}_vs_baseline")
+                if comparison and comparison["speedup"]:
+                    print(
+                        f"- {label} vs baseline: {comparison['baseline_median']:.3f}s -> "
+                        f"{comparison['median']:.3f}s ({comparison['speedup']:.2f}x)"
+                    )
         finally:
             client.close()
 
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Build and query the workspace catalog of extracted KGs.
+
+Examples:
+    python workspace_catalog_cli.py --workspace "...\\bev-qfield-workbench-data"
+    python workspace_catalog_cli.py --workspace "...\\01_BEV_Rawdata\\51235" --kg 51235 --json
+
+The default output has one ``kg;path;files;size;last_conversion;gpkg`` line
+per KG, which is easy to read from batch files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bev_to_qfield_plugin.workspace_catalog import find_workspace, load_catalog, refresh_catalog  # noqa: E402
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build and query the workspace catalog of extracted KGs.")
+    parser.add_argument("--workspace", required=True, help="Workspace root or any path inside it.")
+    parser.add_argument("--kg", action="append", default=[], help="Only report (and refresh) this KG; repeatable.")
+    parser.add_argument("--no-refresh", action="store_true", help="Read the stored catalog without scanning.")
+    parser.add_argument("--json", action="store_true", help="Print the catalog (or the selected KGs) as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workspace = find_workspace(args.workspace)
+    if not workspace:
+        print(f"No workspace found for: {args.workspace}", file=sys.stderr)
+        return 1
+
+    only = args.kg or None
+    catalog = load_catalog(workspace) if args.no_refresh else refresh_catalog(workspace, only=only)
+    kgs = catalog.get("kgs", {})
+    if only:
+        kgs = {kg: kgs[kg] for kg in only if kg in kgs}
+
+    if args.json:
+        print(json.dumps(dict(catalog, kgs=kgs) if not only else kgs, ensure_ascii=False, indent=2))
+        return 0
+
+    for kg, entry in kgs.items():
+        outputs = entry.get("outputs") or {}
+        gpkg = (outputs.get("gpkg") or [""])[0]
+        print(
+            f"{kg};{entry['path']};{len(entry.get('files', []))};{entry.get('total_size', 0)};"
+            f"{outputs.get('last_conversion') or ''};{gpkg}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent
+IMPORT_BUDGET_SECONDS = 0.5
+
+PROBE = """
+import json, sys, time
+import qgis.core
+start = time.perf_counter()
+import bev_to_qfield_plugin.bev_to_qfield_core as core
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "processing_loaded": "processing" in sys.modules,
+    "app_created": qgis.core.QgsApplication.instance() is not None,
+    "ensure_qgis": callable(core.ensure_qgis),
+}))
+"""
+
+
+def qgis_available() -> bool:
+    try:
+        return importlib.util.find_spec("qgis") is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@unittest.skipUnless(qgis_available(), "QGIS Python bindings are not installed in this environment")
+class BevToQfieldCoreImportTests(unittest.TestCase):
+    def test_import_is_lazy_and_within_budget(self):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=str(REPO_ROOT),
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        self.assertTrue(probe["ensure_qgis"])
+        self.assertFalse(probe["processing_loaded"])
+        self.assertFalse(probe["app_created"])
+        self.assertLess(probe["seconds"], IMPORT_BUDGET_SECONDS)
+
+    def test_main_writes_failed_summary_for_missing_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = Path(tmp) / "summary.json"
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys, bev_to_qfield_plugin.bev_to_qfield_core as core; sys.exit(core.main(sys.argv[1:]))",
+                    "--source",
+                    str(Path(tmp) / "missing"),
+                    "--base-path",
+                    tmp,
+                    "--summary-json",
+                    str(summary),
+                ],
+                cwd=str(REPO_ROOT),
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            self.assertEqual(completed.returncode, 2, completed.stderr)
+            result = json.loads(summary.read_text(encoding="utf-8"))
+
+        self.assertIn("Quellordner nicht gefunden", result["error"])
+        self.assertTrue(result["failed_layers"])
+        self.assertEqual(result["status"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+
+from bev_to_qfield_plugin import conversion_engine
+from bev_to_qfield_plugin.conversion_engine import (
+    CONVERT_STAGES,
+    FINISH_STAGES,
+    ConversionCancelled,
+    ConversionEngine,
+    ConversionRun,
+    LayerJob,
+    SkipLayer,
+)
+from bev_to_qfield_plugin.layer_cache import LayerCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.5
+        return self.now
+
+
+def _discover(run):
+    jobs = []
+    for name in run.settings["names"]:
+        job = LayerJob(f"{run.source_folder}/{name}.shp", f"{name}.shp", name)
+        job.source_key = ("src", name)
+        jobs.append(job)
+    return jobs
+
+
+class ConversionEngineTests(unittest.TestCase):
+    def _engine(self, calls, **overrides):
+        def stage(name):
+            def run_stage(run, job):
+                calls.append((name, job.layer_name))
+                return f"{job.layer_name}:{name}"
+            return run_stage
+
+        stages = {name: stage(name) for name in conversion_engine.LAYER_STAGES}
+        stages["discover"] = _discover
+        stages["project"] = lambda run: f"{run.target_gpkg}.qgz"
+        stages.update(overrides)
+        return ConversionEngine(stages, clock=FakeClock())
+
+    def test_stages_run_in_order_and_are_timed(self):
+        calls = []
+        engine = self._engine(calls)
+        run = ConversionRun("src", "out.gpkg", {"names": ["gst", "sgg"]})
+
+        engine.run(run)
+
+        self.assertEqual([name for name, layer in calls if layer == "gst"], list(conversion_engine.LAYER_STAGES))
+        self.assertEqual(run.written_layers, ["gst", "sgg"])
+        self.assertEqual(run.jobs[0].layer, "gst:index")
+        self.assertEqual(run.outputs["project"], "out.gpkg.qgz")
+        self.assertNotIn("report", run.outputs)
+        self.assertEqual(engine.timings["reproject"], {"seconds": 1.0, "calls": 2, "cached": 0})
+        self.assertIn("reproject 1.00s (2x)", engine.timing_summary())
+
+    def test_run_level_tiles_stage_runs_once_before_project(self):
+        calls = []
+        engine = self._engine(calls, tiles=lambda run: calls.append(("tiles", None)) or "out.mbtiles")
+        run = ConversionRun("src", "out.gpkg", {"names": ["gst", "sgg"]})
+
+        engine.run(run, CONVERT_STAGES)
+
+        self.assertEqual(calls[-1], ("tiles", None))
+        self.assertEqual(run.outputs, {"tiles": "out.mbtiles"})
+        engine.run(run, FINISH_STAGES)
+        self.assertEqual(calls.count(("tiles", None)), 1)
+        self.assertEqual(run.outputs["project"], "out.gpkg.qgz")
+
+    def test_skip_and_failure_are_recorded_per_job(self):
+        def load(run, job):
+            if job.layer_name == "nsy":
+                raise SkipLayer("nicht unterstützter Geometrietyp")
+            if job.layer_name == "gnr":
+                raise RuntimeError("Layer konnte nicht geladen werden")
+            return job.layer_name
+
+        engine = self._engine([], load=load)
+        run = ConversionRun("src", "out.gpkg", {"names": ["gst", "nsy", "gnr"]})
+
+        engine.run(run, CONVERT_STAGES)
+
+        self.assertEqual(run.written_layers, ["gst"])
+        self.assertEqual(run.skipped_layers, ["nsy.shp: nicht unterstützter Geometrietyp"])
+        self.assertEqual(run.failed_layers, ["gnr.shp: Layer konnte nicht geladen werden"])
+        self.assertEqual(run.outputs, {})
+
+    def test_cached_stage_result_skips_earlier_stages(self):
+        calls = []
+        engine = self._engine(calls)
+        engine.cache = LayerCache(1024)
+        reproject = engine.stage("reproject")
+        engine.set_stage("reproject", reproject.func, cache_key=lambda run, job: ("reprojected", job.source_key))
+
+        engine.run(ConversionRun("src", "out.gpkg", {"names": ["gst"]}), CONVERT_STAGES)
+        calls.clear()
+        second = ConversionRun("src", "out.gpkg", {"names": ["gst"]})
+        engine.run(second, CONVERT_STAGES)
+
+        self.assertEqual([name for name, _ in calls], ["geoid", "write", "index"])
+        self.assertEqual(second.written_layers, ["gst"])
+        self.assertEqual(engine.timings["reproject"]["cached"], 1)
+
+    def test_cancellation_stops_at_stage_boundary(self):
+        calls = []
+        engine = self._engine(calls)
+        run = ConversionRun("src", "out.gpkg", {"names": ["gst", "sgg"]})
+        run.is_canceled = lambda: any(name == "write" for name, _ in calls)
+
+        with self.assertRaises(ConversionCancelled):
+            engine.run(run)
+
+        self.assertEqual(calls[-1], ("write", "gst"))
+        self.assertEqual(run.written_layers, [])
+
+    def test_disabled_stage_and_finish_only_run(self):
+        calls = []
+        engine = self._engine(calls, fix=None, report=lambda run: "report.txt")
+        run = ConversionRun("src", "out.gpkg", {"names": ["gst"]})
+        started = []
+        run.on_job_start = lambda index, total, job: started.append((index, total, job.layer_name))
+
+        engine.run(run, CONVERT_STAGES)
+        self.assertNotIn(("fix", "gst"), calls)
+        self.assertEqual(started, [(0, 1, "gst")])
+
+        engine.run(run, FINISH_STAGES)
+        self.assertEqual(run.outputs, {"project": "out.gpkg.qgz", "report": "report.txt"})
+
+        with self.assertRaises(ValueError):
+            engine.set_stage("tile", lambda run: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import io
+import json
 import tempfile
+import time
 import unittest
+from contextlib import redirect_stdout
 import zipfile
 from pathlib import Path
 
@@ -50,6 +54,143 @@ class ExtractKgFromZipTests(unittest.TestCase):
 
             self.assertFalse(escaped.exists())
 
+    def test_indexed_extraction_reads_only_matching_archives(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            index_path = root / "cache" / "zip_index.sqlite"
+            out_root = root / "out"
+            with zipfile.ZipFile(root / "a.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("nested/51235/", "")
+                archive.writestr("nested/51235/gst_demo.shp", "shape" * 1000)
+                archive.writestr(zipfile.ZipInfo("nested/51235/subdir/info.txt"), "info")
+            with zipfile.ZipFile(root / "b.zip", "w") as archive:
+                archive.writestr("nested/99999/gst_demo.shp", "other")
+
+            found = extract_kg_from_zip.extract_from_zip_root(root, out_root, "51235", index_path)
+
+            self.assertTrue(found)
+            self.assertEqual((out_root / "51235" / "gst_demo.shp").read_text(encoding="utf-8"), "shape" * 1000)
+            self.assertEqual((out_root / "51235" / "subdir" / "info.txt").read_text(encoding="utf-8"), "info")
+            zip_paths = sorted(root.glob("*.zip"))
+            with extract_kg_from_zip.ZipEntryIndex(index_path) as index:
+                self.assertEqual(index.refresh(zip_paths), [])
+                self.assertEqual(list(index.find_folder("51235", zip_paths)), [root / "a.zip"])
+                self.assertEqual(list(index.find_folder("99999", zip_paths)), [root / "b.zip"])
+
+            with zipfile.ZipFile(root / "b.zip", "a") as archive:
+                archive.writestr("nested/51235/extra.txt", "extra")
+            with extract_kg_from_zip.ZipEntryIndex(index_path) as index:
+                self.assertEqual(index.refresh(zip_paths), [root / "b.zip"])
+                self.assertEqual(len(index.find_folder("51235", zip_paths)), 2)
+
+    def test_indexed_extraction_rejects_parent_traversal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            out_root = root / "out"
+            with zipfile.ZipFile(root / "data.zip", "w") as archive:
+                archive.writestr("nested/51235/ok.txt", "ok")
+                archive.writestr("nested/51235/../escape.txt", "bad")
+
+            with self.assertRaises(extract_kg_from_zip.UnsafeZipPathError):
+                extract_kg_from_zip.extract_from_zip_root(root, out_root, "51235", root / "index.sqlite")
+
+            self.assertFalse((root / "escape.txt").exists())
+            self.assertFalse((out_root / "51235" / "ok.txt").exists())
+
+    def test_multiple_folders_in_one_pass_report_status_as_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            out_root = root / "out"
+            with zipfile.ZipFile(root / "a.zip", "w") as archive:
+                archive.writestr("nested/51235/gst.shp", "12345")
+                archive.writestr("nested/51236/gst.shp", "123")
+            with zipfile.ZipFile(root / "b.zip", "w") as archive:
+                archive.writestr("other/51236/nfl.shp", "1")
+            (root / "kgs.txt").write_text("51236\n99999\n", encoding="utf-8")
+
+            for extra in ([], ["--no-index"]):
+                stdout = io.StringIO()
+                with redirect_stdout(stdout):
+                    code = extract_kg_from_zip.main([
+                        "--zip-root", str(root), "--output-root", str(out_root),
+                        "--folder", "51235,51236", "--folder-file", str(root / "kgs.txt"),
+                        "--index", str(root / "index.sqlite"), "--json", *extra,
+                    ])
+
+                results = json.loads(stdout.getvalue())
+                rerun = 1 if extra else 0
+                self.assertEqual(code, 3)
+                self.assertEqual(list(results), ["51235", "51236", "99999"])
+                self.assertEqual(
+                    results["51235"], {"found": True, "files": 1, "bytes": 5, "unchanged": rerun, "archives": ["a.zip"]}
+                )
+                self.assertEqual(
+                    results["51236"],
+                    {"found": True, "files": 2, "bytes": 4, "unchanged": 2 * rerun, "archives": ["a.zip", "b.zip"]},
+                )
+                self.assertFalse(results["99999"]["found"])
+                self.assertEqual((out_root / "51236" / "nfl.shp").read_text(encoding="utf-8"), "1")
+
+    def test_parallel_extraction_matches_serial_and_reports_throughput(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            payloads = {f"nested/51235/part_{i}.dbf": bytes(range(256)) * (i + 1) * 40 for i in range(7)}
+            with zipfile.ZipFile(root / "data.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, data in payloads.items():
+                    archive.writestr(name, data)
+                archive.writestr("nested/51235/stored.txt", "plain", compress_type=zipfile.ZIP_STORED)
+
+            stats = {}
+            results = extract_kg_from_zip.extract_folders_from_zip_root(
+                root, root / "out", ["51235"], root / "index.sqlite", workers=3, chunk_size=4096, stats=stats
+            )
+
+            for name, data in payloads.items():
+                self.assertEqual((root / "out" / name.split("/", 1)[1]).read_bytes(), data)
+            self.assertEqual((root / "out" / "51235" / "stored.txt").read_text(encoding="utf-8"), "plain")
+            self.assertEqual(results["51235"]["files"], 8)
+            self.assertEqual(stats["bytes"], sum(map(len, payloads.values())) + 5)
+            self.assertEqual(stats["workers"], 3)
+            self.assertIn("MB/s, 3 worker(s)", extract_kg_from_zip.format_throughput(stats))
+
+    def test_reextraction_rewrites_only_changed_files_and_keeps_entry_times(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            out_root = root / "out"
+            info = zipfile.ZipInfo("nested/51235/gst.shp", date_time=(2023, 5, 4, 10, 20, 30))
+            with zipfile.ZipFile(root / "data.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(info, "shape")
+                archive.writestr(zipfile.ZipInfo("nested/51235/gst.dbf", date_time=(2023, 5, 4, 10, 20, 30)), "table")
+            shp = out_root / "51235" / "gst.shp"
+            dbf = out_root / "51235" / "gst.dbf"
+
+            extract_kg_from_zip.extract_from_zip_root(root, out_root, "51235", root / "index.sqlite")
+
+            expected_mtime = time.mktime((2023, 5, 4, 10, 20, 30, 0, 0, -1))
+            self.assertEqual(shp.stat().st_mtime, expected_mtime)
+            self.assertTrue(extract_kg_from_zip.marker_path(out_root, "51235").is_file())
+
+            dbf.write_text("TABLE", encoding="utf-8")
+            shp_mtime_ns = shp.stat().st_mtime_ns
+            stats = {}
+            results = extract_kg_from_zip.extract_folders_from_zip_root(
+                root, out_root, ["51235"], root / "index.sqlite", stats=stats
+            )
+
+            self.assertEqual(results["51235"]["unchanged"], 1)
+            self.assertEqual((stats["files"], stats["unchanged"]), (1, 1))
+            self.assertEqual(dbf.read_text(encoding="utf-8"), "table")
+            self.assertEqual(shp.stat().st_mtime_ns, shp_mtime_ns)
+
+            extract_kg_from_zip.marker_path(out_root, "51235").unlink()
+            stats = {}
+            extract_kg_from_zip.extract_folders_from_zip_root(root, out_root, ["51235"], stats=stats)
+            self.assertEqual((stats["files"], stats["unchanged"]), (0, 2))
+
+            stats = {}
+            extract_kg_from_zip.extract_folders_from_zip_root(root, out_root, ["51235"], stats=stats, skip_identical=False)
+            self.assertEqual((stats["files"], stats["unchanged"]), (2, 0))
+
 
 if __name__ == "__main__":
     unittest.main()
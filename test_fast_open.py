@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bev_to_qfield_plugin import fast_open
+
+
+def _write_gpkg(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT, min_x REAL, min_y REAL, "
+            "max_x REAL, max_y REAL, srs_id INTEGER)"
+        )
+        conn.execute("CREATE TABLE gpkg_geometry_columns (table_name TEXT, column_name TEXT)")
+        conn.execute("CREATE TABLE gpkg_ogr_contents (table_name TEXT PRIMARY KEY, feature_count INTEGER)")
+        conn.executemany(
+            "INSERT INTO gpkg_contents VALUES (?, 'features', ?, ?, ?, ?, 25833)",
+            [("gst", 1.0, 2.0, 3.0, 4.0), ("sgg", None, None, None, None)],
+        )
+        conn.executemany("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom')", [("gst",), ("sgg",)])
+        conn.execute("INSERT INTO gpkg_ogr_contents VALUES ('gst', 42)")
+        conn.execute("INSERT INTO gpkg_ogr_contents VALUES ('sgg', NULL)")
+        conn.execute("CREATE TABLE gst (fid INTEGER PRIMARY KEY, geom BLOB)")
+        conn.execute("CREATE TABLE sgg (fid INTEGER PRIMARY KEY, geom BLOB)")
+        conn.executemany("INSERT INTO sgg (geom) VALUES (?)", [(b"",)] * 3)
+        conn.execute("CREATE TABLE rtree_sgg_geom (id INTEGER, minx REAL, maxx REAL, miny REAL, maxy REAL)")
+        conn.executemany(
+            "INSERT INTO rtree_sgg_geom VALUES (?, ?, ?, ?, ?)",
+            [(1, 10.0, 11.0, 20.0, 21.0), (2, 9.0, 12.0, 19.5, 20.5)],
+        )
+
+
+class FastOpenTests(unittest.TestCase):
+    def test_refresh_fills_missing_extent_and_count_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kataster.gpkg")
+            _write_gpkg(path)
+
+            stats = fast_open.refresh_gpkg_statistics(path)
+
+            self.assertEqual(stats["gst"], {"extent": (1.0, 2.0, 3.0, 4.0), "feature_count": 42})
+            self.assertEqual(stats["sgg"], {"extent": (9.0, 19.5, 12.0, 21.0), "feature_count": 3})
+            with sqlite3.connect(path) as conn:
+                stored = conn.execute("SELECT min_x, max_y FROM gpkg_contents WHERE table_name = 'sgg'").fetchone()
+                count = conn.execute("SELECT feature_count FROM gpkg_ogr_contents WHERE table_name = 'sgg'").fetchone()
+            self.assertEqual(stored, (9.0, 21.0))
+            self.assertEqual(count, (3,))
+            self.assertEqual(list(fast_open.refresh_gpkg_statistics(path, ["GST"])), ["gst"])
+
+    def test_reference_layers_respect_editable_list(self):
+        previous = os.environ.get("QFC_EDITABLE_LAYERS")
+        os.environ["QFC_EDITABLE_LAYERS"] = "Aufnahme, punkte"
+        try:
+            self.assertTrue(fast_open.is_reference_layer("GST_V2"))
+            self.assertFalse(fast_open.is_reference_layer("aufnahme"))
+            self.assertFalse(fast_open.is_reference_layer("Punkte"))
+        finally:
+            if previous is None:
+                os.environ.pop("QFC_EDITABLE_LAYERS")
+            else:
+                os.environ["QFC_EDITABLE_LAYERS"] = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from bev_to_qfield_plugin import geojson_stream
+
+
+def _feature(idx):
+    return {
+        "type": "Feature",
+        "properties": {"GNR": f"{idx}/1", "KG": 44106, "flaeche": 12.5 + idx},
+        "geometry": {"type": "Point", "coordinates": [15.1 + idx, 47.2, 350.25]},
+    }
+
+
+class GeoJsonStreamTests(unittest.TestCase):
+    def _write(self, tmp, payload):
+        path = Path(tmp) / "data.geojson"
+        path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        return path
+
+    def test_iter_features_small_chunks_match_full_parse(self):
+        features = [_feature(i) for i in range(25)]
+        payload = {
+            "type": "FeatureCollection",
+            "name": "gnr",
+            "crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::31255"}},
+            "features": features,
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, payload)
+            members = {}
+
+            streamed = list(geojson_stream.iter_features(str(path), members=members, chunk_size=7))
+
+            self.assertEqual(streamed, features)
+            self.assertEqual(members["name"], "gnr")
+            self.assertEqual(geojson_stream.crs_name(members), "urn:ogc:def:crs:EPSG::31255")
+
+    def test_iter_features_members_after_features_and_empty_array(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, {"features": [], "type": "FeatureCollection", "bbox": [1, 2, 3, 4]})
+            members = {}
+
+            self.assertEqual(list(geojson_stream.iter_features(str(path), members=members, chunk_size=3)), [])
+            self.assertEqual(members["bbox"], [1, 2, 3, 4])
+
+    def test_iter_features_single_feature_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, _feature(1))
+
+            streamed = list(geojson_stream.iter_features(str(path), chunk_size=5))
+
+            self.assertEqual(streamed, [_feature(1)])
+
+    def test_iter_features_rejects_truncated_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "broken.geojson"
+            path.write_text('{"type": "FeatureCollection", "features": [{"type": "Feature"', encoding="utf-8")
+
+            with self.assertRaises(ValueError):
+                list(geojson_stream.iter_features(str(path), chunk_size=4))
+
+    def test_iter_features_reports_read_progress(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, {"type": "FeatureCollection", "features": [_feature(i) for i in range(3)]})
+            seen = []
+
+            list(geojson_stream.iter_features(str(path), chunk_size=64, on_progress=seen.append))
+
+            self.assertGreater(len(seen), 1)
+            self.assertEqual(seen, sorted(seen))
+            self.assertEqual(seen[-1], len(path.read_text(encoding="utf-8")))
+
+    def test_iter_batches(self):
+        batches = list(geojson_stream.iter_batches(range(7), 3))
+        self.assertEqual(batches, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_property_schema_unions_and_widens_properties(self):
+        features = [
+            {"type": "Feature", "properties": {"GNR": "1/1", "KG": 44106, "note": None}},
+            {"type": "Feature", "properties": None},
+            {"type": "Feature", "properties": {"KG": 44106.5, "note": "spät", "flag": True}},
+            {"type": "Feature", "properties": {"GNR": 7, "flag": False}},
+        ]
+
+        schema = geojson_stream.property_schema(features)
+
+        self.assertEqual(list(schema), ["GNR", "KG", "note", "flag"])
+        self.assertEqual(schema["GNR"], "1/1")
+        self.assertEqual(schema["KG"], 44106.0)
+        self.assertIsInstance(schema["KG"], float)
+        self.assertEqual(schema["note"], "spät")
+        self.assertIs(schema["flag"], True)
+
+    def test_property_schema_collects_geometry_types_for_multi_promotion(self):
+        features = [
+            _feature(1),
+            {"type": "Feature", "properties": {}, "geometry": {"type": "MultiPoint", "coordinates": [[1.0, 2.0]]}},
+            {"type": "Feature", "properties": {}, "geometry": None},
+        ]
+        types = set()
+
+        geojson_stream.property_schema(features, types)
+
+        self.assertEqual(types, {("Point", True), ("MultiPoint", False)})
+        self.assertEqual(geojson_stream.multi_geometry_type(types), "MultiPointZ")
+        self.assertEqual(geojson_stream.multi_geometry_type({("Polygon", False)}), "MultiPolygon")
+        self.assertIsNone(geojson_stream.multi_geometry_type({("Point", False), ("LineString", False)}))
+        self.assertIsNone(geojson_stream.multi_geometry_type(set()))
+
+    def test_should_stream_uses_size_threshold(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, {"type": "FeatureCollection", "features": [_feature(1)]})
+            size = path.stat().st_size
+
+            self.assertTrue(geojson_stream.should_stream(str(path), size))
+            self.assertFalse(geojson_stream.should_stream(str(path), size + 1))
+            self.assertFalse(geojson_stream.should_stream(str(Path(tmp) / "a.shp"), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,20 @@
 import os
+import tempfile
 import unittest
+from pathlib import Path
 
 from kataster_common import (
+    commit_staging_gpkg,
     dedupe_paths,
     default_output_path,
+    discard_staging_gpkg,
     is_kataster_shapefile,
     path_action,
+    plan_layer_reconciliation,
+    prepare_staging_gpkg,
     qgis_base_from_source,
     qgis_base_from_target,
+    staging_gpkg_path,
 )
 
 
@@ -63,6 +70,17 @@ class KatasterCommonTests(unittest.TestCase):
         )
         self.assertEqual(default_output_path(source), expected)
 
+    def test_default_output_path_for_zip_source(self):
+        self.assertEqual(
+            default_output_path("/data/downloads/kat.zip!/51235"),
+            os.path.normpath("/data/downloads/kataster_51235_qfield/kataster_51235_qfield.gpkg"),
+        )
+        source = r"C:\Users\Example\bev-qfield-workbench-data\01_BEV_Rawdata\KAT_DKM.zip!/nested/44106"
+        expected = os.path.normpath(
+            "C:/Users/Example/bev-qfield-workbench-data/03_QField_Output/kataster_44106_qfield/kataster_44106_qfield.gpkg"
+        )
+        self.assertEqual(default_output_path(source), expected)
+
     def test_is_kataster_shapefile(self):
         self.assertTrue(is_kataster_shapefile("44106GST_V2.shp"))
         self.assertTrue(is_kataster_shapefile("sgg.shp"))
@@ -76,6 +94,45 @@ class KatasterCommonTests(unittest.TestCase):
         self.assertEqual(updated["action"], "Aktualisiert")
         self.assertIsNone(path_action(True, "", "Datei"))
 
+    def test_plan_layer_reconciliation_swaps_existing_and_adds_new(self):
+        existing = [("id_gst", "GST_44106"), ("id_sgg", "sgg_44106"), ("id_old", "gnr_44106"), ("id_dup", "gst_44106")]
+        plan = plan_layer_reconciliation(existing, ["gst_44106", "sgg_44106", "fpt_44106"])
+
+        self.assertEqual(plan["swap"], [("id_gst", "gst_44106"), ("id_sgg", "sgg_44106")])
+        self.assertEqual(plan["add"], ["fpt_44106"])
+        self.assertEqual(sorted(plan["remove"]), ["id_dup", "id_old"])
+
+    def test_staging_gpkg_replaces_target_only_on_commit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "kataster.gpkg"
+            target.write_bytes(b"old tables")
+            staging = Path(staging_gpkg_path(str(target)))
+            self.assertEqual(staging.name, "kataster.converting.gpkg")
+
+            Path(str(staging) + "-wal").write_bytes(b"stale")
+            prepare_staging_gpkg(str(target), str(staging))
+            self.assertEqual(staging.read_bytes(), b"old tables")
+            self.assertFalse(Path(str(staging) + "-wal").exists())
+
+            staging.write_bytes(b"new tables")
+            self.assertEqual(target.read_bytes(), b"old tables")
+            commit_staging_gpkg(str(staging), str(target))
+
+            self.assertEqual(target.read_bytes(), b"new tables")
+            self.assertFalse(staging.exists())
+
+    def test_discard_staging_gpkg_keeps_target(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "kataster.gpkg"
+            staging = Path(staging_gpkg_path(str(target)))
+            prepare_staging_gpkg(str(target), str(staging))
+            self.assertFalse(staging.exists())
+
+            staging.write_bytes(b"partial")
+            discard_staging_gpkg(str(staging))
+            self.assertFalse(staging.exists())
+            self.assertFalse(target.exists())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import importlib.util
+import os
+import sys
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent
+
+
+def qgis_available() -> bool:
+    try:
+        return importlib.util.find_spec("qgis") is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class _StubLayout:
+    def __init__(self):
+        self.widgets = []
+
+    def addWidget(self, widget):
+        self.widgets.append(widget)
+
+
+class _StubMessage:
+    def __init__(self, title, text):
+        self.title = title
+        self.text = text
+        self._layout = _StubLayout()
+
+    def layout(self):
+        return self._layout
+
+
+class _StubMessageBar:
+    def __init__(self):
+        self.pushed = []
+        self.popped = []
+
+    def createMessage(self, title, text):
+        return _StubMessage(title, text)
+
+    def pushWidget(self, widget, level):
+        self.pushed.append(widget)
+
+    def popWidget(self, widget):
+        self.popped.append(widget)
+
+
+class _StubIface:
+    def __init__(self):
+        self.bar = _StubMessageBar()
+
+    def messageBar(self):
+        return self.bar
+
+
+@unittest.skipUnless(qgis_available(), "QGIS Python bindings are not installed in this environment")
+class ShowProgressTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        sys.path.insert(0, str(REPO_ROOT))
+        from qgis.core import QgsApplication
+
+        cls.app = QgsApplication.instance()
+        if cls.app is None:
+            cls.app = QgsApplication([], True)
+            cls.app.initQgis()
+
+    def _build_task(self):
+        from bev_to_qfield_plugin.conversion_engine import ConversionRun
+        from kataster_converter import KatasterConversionTask
+
+        conversion = ConversionRun(os.path.join("C:/QgisData/entzippt", "51235"), "C:/QgisData/out.gpkg")
+        return KatasterConversionTask(None, conversion, lambda task, result: None)
+
+    def test_show_progress_pushes_message_for_source_folder(self):
+        from kataster_converter import KatasterConverterPlugin
+
+        iface = _StubIface()
+        plugin = KatasterConverterPlugin(iface)
+        plugin._show_progress(self._build_task())
+
+        self.assertEqual(len(iface.bar.pushed), 1)
+        message = iface.bar.pushed[0]
+        self.assertIn("51235", message.text)
+        self.assertEqual(len(message.layout().widgets), 2)
+        self.assertIs(plugin._progress_message, message)
+
+        plugin._clear_progress()
+        self.assertEqual(iface.bar.popped, [message])
+        self.assertIsNone(plugin._progress_message)
+
+
+if __name__ == "__main__":
+    unittest.main()
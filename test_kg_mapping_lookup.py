@@ -1,3 +1,4 @@
+import os
 import sys
 import tempfile
 import unittest
@@ -57,6 +58,27 @@ class KgMappingLookupTests(unittest.TestCase):
             self.assertEqual(mapping["01004"], "Innere Stadt")
             self.assertEqual(mapping["01010"], "Neubau")
 
+    def test_parse_mapping_csv_streams_and_falls_back_after_sample(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "kg_mapping.csv"
+            rows = [f"{10000 + index};Gemeinde {index}" for index in range(200)]
+            payload = ("KG_NUMMER;KG_NAME\n" + "\n".join(rows) + "\n51235;Straß\n").encode("cp1252")
+            csv_path.write_bytes(payload)
+
+            original_sample_size = kg_lookup.CSV_SAMPLE_SIZE
+            kg_lookup.CSV_SAMPLE_SIZE = 256
+            try:
+                mapping = kg_lookup.parse_mapping_csv(csv_path)
+            finally:
+                kg_lookup.CSV_SAMPLE_SIZE = original_sample_size
+
+            self.assertEqual(mapping["51235"], "Straß")
+            self.assertEqual(mapping["10199"], "Gemeinde 199")
+            self.assertEqual(len(mapping), 201)
+
+            csv_path.write_bytes("\ufeffKG_NUMMER,KG_NAME\r\n\r\n51235,Straß\r\n".encode("utf-8"))
+            self.assertEqual(kg_lookup.parse_mapping_csv(csv_path), {"51235": "Straß"})
+
     def test_discover_files_ignores_legacy_kg_lookup_cache_folder(self):
         with tempfile.TemporaryDirectory() as tmp:
             root = Path(tmp)
@@ -73,6 +95,45 @@ class KgMappingLookupTests(unittest.TestCase):
             self.assertEqual(csv_path, preferred_csv)
             self.assertIsNone(zip_path)
 
+    def test_discover_files_prunes_data_folders_and_depth(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for folder in ("51235", "entzippt", "a/b/c"):
+                (root / folder).mkdir(parents=True)
+            (root / "51235" / "kg_verzeichnis.csv").write_text("x", encoding="utf-8")
+            (root / "entzippt" / "kg_verzeichnis.csv").write_text("x", encoding="utf-8")
+            (root / "a" / "b" / "c" / "kg_verzeichnis.csv").write_text("x", encoding="utf-8")
+            shallow_zip = root / "a" / "KG_Verzeichnis.zip"
+            shallow_zip.write_bytes(b"")
+
+            stats = {}
+            csv_path, zip_path = kg_lookup.discover_files(root, max_depth=3, stats=stats)
+
+            self.assertIsNone(csv_path)
+            self.assertEqual(zip_path, shallow_zip)
+            self.assertEqual(stats["scanned"], 6)
+
+            csv_path, _zip_path = kg_lookup.discover_files(root, max_depth=4)
+            self.assertEqual(csv_path, root / "a" / "b" / "c" / "kg_verzeichnis.csv")
+
+    def test_open_index_remembers_discovered_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "bev").mkdir()
+            (root / "bev" / "kg_verzeichnis_2025.csv").write_text("KG_NUMMER;KG_NAME\n51235;Strass\n", encoding="utf-8")
+            index_path = root / "kg.sqlite"
+
+            index, first = kg_lookup.open_index(root, index_path=index_path)
+            index.close()
+            index, second = kg_lookup.open_index(root, index_path=index_path)
+            index.close()
+
+            self.assertEqual(first["SOURCE_REMEMBERED"], "0")
+            self.assertGreater(int(first["SCANNED_ENTRIES"]), 0)
+            self.assertEqual(second["SOURCE_REMEMBERED"], "1")
+            self.assertEqual(second["SCANNED_ENTRIES"], "0")
+            self.assertIn("SCAN_SECONDS", second)
+
     def test_resolve_mapping_source_extracts_csv_from_zip(self):
         with tempfile.TemporaryDirectory() as tmp:
             root = Path(tmp)
@@ -91,6 +152,91 @@ class KgMappingLookupTests(unittest.TestCase):
             parsed = kg_lookup.parse_mapping_csv(mapping_csv)
             self.assertEqual(parsed["51235"], "Strass")
 
+    def test_index_is_rebuilt_only_when_source_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            csv_path = root / "kg_mapping.csv"
+            csv_path.write_text("KG_NUMMER;KG_NAME\n51235;Strass\n", encoding="utf-8")
+            index_path = root / "index" / "kg.sqlite"
+
+            index, status = kg_lookup.open_index(root, index_path=index_path)
+            index.close()
+            self.assertEqual(status["INDEX_REBUILT"], "1")
+
+            os.utime(csv_path, ns=(0, 0))
+            index, status = kg_lookup.open_index(root, index_path=index_path)
+            index.close()
+            self.assertEqual(status["INDEX_REBUILT"], "0")
+
+            csv_path.write_text("KG_NUMMER;KG_NAME\n51235;Strass\n46144;Peterskirchen\n", encoding="utf-8")
+            index, status = kg_lookup.open_index(root, index_path=index_path)
+            with index:
+                self.assertEqual(status["INDEX_REBUILT"], "1")
+                self.assertEqual(index.lookup("46144"), "Peterskirchen")
+
+    def test_index_lookup_many_and_name_search(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "kg_mapping.csv").write_text(
+                "KG_NUMMER;KG_NAME\n51235;Straß\n46144;Peterskirchen\n46145;Peterskirchen Ost\n01004;Innere Stadt\n",
+                encoding="utf-8",
+            )
+
+            index, _status = kg_lookup.open_index(root, index_path=root / "kg.sqlite")
+            with index:
+                self.assertEqual(index.lookup_many(["51235", "99999", "01004"]), {"51235": "Straß", "01004": "Innere Stadt"})
+                self.assertEqual([number for number, _name in index.search("peters")], ["46144", "46145"])
+                self.assertEqual(index.search("strass"), [("51235", "Straß")])
+                self.assertEqual(index.search("Inere Stadt"), [("01004", "Innere Stadt")])
+                self.assertEqual(index.search("Inere Stadt", fuzzy=False), [])
+                results = kg_lookup.query_index(index, ["01004", "stadt"])
+
+            self.assertEqual(results[0]["matches"], [{"kg_number": "01004", "kg_name": "Innere Stadt"}])
+            self.assertEqual(results[1]["matches"][0]["kg_number"], "01004")
+
+    def test_extract_csv_from_zip_reuses_unchanged_extraction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            zip_path = root / "KG_Verzeichnis_reuse_test.zip"
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("KGVZ.csv", "KG_NUMMER;KG_NAME\n51235;Strass\n")
+
+            first = kg_lookup.extract_csv_from_zip(zip_path, root)
+            # Same size as the entry: only the extraction record tells whether it is still valid.
+            first.write_text("KG_NUMMER;KG_NAME\n51235;Marker\n", encoding="utf-8")
+            second = kg_lookup.extract_csv_from_zip(zip_path, root)
+            self.assertEqual(kg_lookup.parse_mapping_csv(second)["51235"], "Marker")
+
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("KGVZ.csv", "KG_NUMMER;KG_NAME\n51235;Strass\n46144;Peterskirchen\n")
+            third = kg_lookup.extract_csv_from_zip(zip_path, root)
+            self.assertEqual(kg_lookup.parse_mapping_csv(third)["51235"], "Strass")
+
+            mapping, entry_name = kg_lookup.parse_mapping_zip(zip_path)
+            self.assertEqual(entry_name, "KGVZ.csv")
+            self.assertEqual(mapping["46144"], "Peterskirchen")
+
+    def test_resolve_subcommand_writes_number_name_slug_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "kg_mapping.csv").write_text(
+                "KG_NUMMER;KG_NAME\n51235;Straß\n46144;Sankt Pölten Süd\n", encoding="utf-8"
+            )
+            for folder in ("46144", "99999", "entzippt"):
+                (root / folder).mkdir()
+            out_path = root / "resolved.txt"
+
+            exit_code = kg_lookup.main(
+                ["resolve", "--rawdata-root", str(root), "--index", str(root / "kg.sqlite"),
+                 "--folder-root", str(root), "--out", str(out_path), "51235"]
+            )
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(
+                out_path.read_text(encoding="utf-8").splitlines(),
+                ["51235;Straß;stra", "46144;Sankt Pölten Süd;sankt-polten-sud", "99999;;"],
+            )
+
     def test_clean_path_arg_strips_wrapping_quotes(self):
         self.assertEqual(kg_lookup.clean_path_arg('"C:\\Temp\\file.csv"'), "C:\\Temp\\file.csv")
         self.assertEqual(kg_lookup.clean_path_arg("'C:\\Temp\\file.csv'"), "C:\\Temp\\file.csv")
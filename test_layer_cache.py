@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from bev_to_qfield_plugin import layer_cache
+
+
+class LayerCacheTests(unittest.TestCase):
+    def test_get_counts_hits_and_misses(self):
+        cache = layer_cache.LayerCache(max_bytes=100)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "layer-a", 10)
+
+        self.assertEqual(cache.get("a"), "layer-a")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_put_evicts_least_recently_used_by_footprint(self):
+        cache = layer_cache.LayerCache(max_bytes=100)
+        cache.put("a", "A", 40)
+        cache.put("b", "B", 40)
+        cache.get("a")
+        cache.put("c", "C", 40)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.current_bytes, 80)
+
+    def test_put_rejects_entries_larger_than_budget(self):
+        cache = layer_cache.LayerCache(max_bytes=10)
+        self.assertFalse(cache.put("big", "X", 11))
+        self.assertEqual(len(cache), 0)
+
+    def test_get_or_load_calls_loader_once(self):
+        cache = layer_cache.LayerCache(max_bytes=100)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "value"
+
+        self.assertEqual(cache.get_or_load("k", loader, 1), "value")
+        self.assertEqual(cache.get_or_load("k", loader, 1), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_on_evict_receives_evicted_entries(self):
+        evicted = []
+        cache = layer_cache.LayerCache(max_bytes=50, on_evict=lambda key, value: evicted.append((key, value)))
+        cache.put("a", "A", 30)
+        cache.put("b", "B", 30)
+
+        self.assertEqual(evicted, [("a", "A")])
+
+    def test_file_backed_cache_reloads_from_file_and_removes_evicted_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = layer_cache.LayerCache(max_bytes=12, on_evict=layer_cache.remove_cached_file)
+            loads = []
+
+            def save(value, path):
+                Path(path).write_text(value, encoding="utf-8")
+                return True
+
+            def load(path):
+                loads.append(path)
+                return Path(path).read_text(encoding="utf-8")
+
+            files = layer_cache.FileBackedCache(shared, os.path.join(tmp, "cache"), save, load, suffix=".txt")
+            self.assertTrue(files.put(("reprojected", 1), "layer-one"))
+            first_path = files.path_for(("reprojected", 1))
+
+            self.assertIn(("reprojected", 1), files)
+            self.assertEqual(files.get(("reprojected", 1)), "layer-one")
+            self.assertEqual(loads, [first_path])
+            self.assertEqual(shared.current_bytes, len("layer-one"))
+
+            files.put(("reprojected", 2), "layer-two")
+            self.assertNotIn(("reprojected", 1), files)
+            self.assertFalse(os.path.exists(first_path))
+
+            os.remove(files.path_for(("reprojected", 2)))
+            self.assertIsNone(files.get(("reprojected", 2)))
+            self.assertNotIn(("reprojected", 2), files)
+
+    def test_remove_cached_file_ignores_plain_values(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid = Path(tmp) / "grid.gsb"
+            grid.write_bytes(b"grid")
+            layer_cache.remove_cached_file("grid", str(grid))
+            layer_cache.remove_cached_file("grid", (str(grid), 1))
+            self.assertTrue(grid.exists())
+
+    def test_source_key_changes_when_sidecar_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shp = Path(tmp) / "44106GST.shp"
+            dbf = Path(tmp) / "44106GST.dbf"
+            shp.write_bytes(b"shape")
+            dbf.write_bytes(b"attr")
+
+            before = layer_cache.source_key(str(shp))
+            dbf.write_bytes(b"attributes changed")
+            after = layer_cache.source_key(str(shp))
+
+            self.assertEqual(len(before), 2)
+            self.assertNotEqual(before, after)
+            self.assertEqual(layer_cache.source_footprint(after), len(b"shape") + len(b"attributes changed"))
+
+    def test_source_key_missing_file_returns_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(layer_cache.source_key(os.path.join(tmp, "missing.shp")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bev_to_qfield_plugin import log_sink
+
+
+class BufferedLogChannelTests(unittest.TestCase):
+    def test_drain_returns_messages_in_order_and_clears(self):
+        channel = log_sink.BufferedLogChannel()
+        channel.put("a")
+        channel.put("b")
+
+        self.assertEqual(channel.drain_text(), "a\nb")
+        self.assertEqual(channel.drain_text(), "")
+
+    def test_overflow_drops_oldest_and_reports_count(self):
+        channel = log_sink.BufferedLogChannel(max_pending=2)
+        for msg in ("1", "2", "3", "4"):
+            channel.put(msg)
+
+        messages, dropped = channel.drain()
+
+        self.assertEqual(messages, ["3", "4"])
+        self.assertEqual(dropped, 2)
+
+    def test_concurrent_producers_do_not_lose_messages(self):
+        channel = log_sink.BufferedLogChannel(max_pending=10000)
+
+        def produce(prefix):
+            for idx in range(500):
+                channel.put(f"{prefix}{idx}")
+
+        threads = [threading.Thread(target=produce, args=(name,)) for name in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        messages, dropped = channel.drain()
+        self.assertEqual(len(messages), 2000)
+        self.assertEqual(dropped, 0)
+
+
+class BackgroundLogWriterTests(unittest.TestCase):
+    def test_close_flushes_all_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "run.log"
+            writer = log_sink.BackgroundLogWriter(str(path))
+            for idx in range(100):
+                writer.write(f"line {idx}")
+            writer.close()
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 100)
+            self.assertTrue(lines[0].endswith("line 0"))
+            self.assertTrue(lines[-1].endswith("line 99"))
+            self.assertIsNone(writer.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
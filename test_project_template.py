@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+import xml.etree.ElementTree as ET
+
+from bev_to_qfield_plugin import project_template
+from bev_to_qfield_plugin.wmts_cache import ORTHOFOTO_LAYER_NAME
+
+UTM33_WKT = 'PROJCS["ETRS89 / UTM zone 33N",GEOGCS["ETRS89"],UNIT["metre",1]]'
+
+
+def _write_gpkg(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT, srs_id INTEGER, organization TEXT, "
+            "organization_coordsys_id INTEGER, definition TEXT, description TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT, identifier TEXT, description TEXT, "
+            "last_change TEXT, min_x REAL, min_y REAL, max_x REAL, max_y REAL, srs_id INTEGER)"
+        )
+        conn.execute(
+            "CREATE TABLE gpkg_geometry_columns (table_name TEXT, column_name TEXT, geometry_type_name TEXT, "
+            "srs_id INTEGER, z INTEGER, m INTEGER)"
+        )
+        conn.execute("INSERT INTO gpkg_spatial_ref_sys VALUES ('ETRS89 / UTM zone 33N', 25833, 'EPSG', 25833, ?, '')", (UTM33_WKT,))
+        conn.executemany(
+            "INSERT INTO gpkg_contents VALUES (?, 'features', ?, '', '', ?, ?, ?, ?, 25833)",
+            [
+                ("GST_V2", "GST_V2", 600000.0, 5340000.0, 601000.0, 5341000.0),
+                ("SGG_P", "SGG_P", 600100.0, 5340100.0, 601200.0, 5341100.0),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, 25833, ?, 0)",
+            [("GST_V2", "MULTIPOLYGON", 0), ("SGG_P", "POINT", 1)],
+        )
+        for table in ("GST_V2", "SGG_P"):
+            conn.execute(f'CREATE TABLE "{table}" (fid INTEGER PRIMARY KEY, geom BLOB)')
+
+
+class ProjectTemplateTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gpkg = os.path.join(self.tmp.name, "kataster_44106.gpkg")
+        _write_gpkg(self.gpkg)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read_qgz(self, qgz):
+        with zipfile.ZipFile(qgz) as archive:
+            self.assertEqual(archive.namelist(), ["kataster_44106.qgs"])
+            return ET.fromstring(archive.read("kataster_44106.qgs"))
+
+    def test_read_gpkg_layers_follows_requested_order(self):
+        layers = project_template.read_gpkg_layers(self.gpkg, ["sgg_p", "GST_V2", "missing"])
+
+        self.assertEqual([layer["name"] for layer in layers], ["SGG_P", "GST_V2"])
+        self.assertEqual((layers[0]["wkb_type"], layers[0]["geometry"]), ("PointZ", "Point"))
+        self.assertEqual((layers[1]["wkb_type"], layers[1]["geometry"]), ("MultiPolygon", "Polygon"))
+        self.assertEqual(layers[1]["crs"]["authid"], "EPSG:25833")
+        self.assertEqual(layers[1]["bounds"], (600000.0, 5340000.0, 601000.0, 5341000.0))
+
+    def test_writes_styled_qgz_with_relative_sources_and_layer_order(self):
+        qgz = os.path.join(self.tmp.name, "kataster_44106.qgz")
+        tile_pack = os.path.join(self.tmp.name, "kataster_44106_orthofoto.mbtiles")
+
+        project_template.write_template_project(self.gpkg, ["GST_V2", "SGG_P"], qgz, tile_pack=tile_pack)
+        root = self._read_qgz(qgz)
+
+        tree = [node.get("name") for node in root.iter("layer-tree-layer")]
+        self.assertEqual(tree, ["SGG_P", "GST_V2", "BEV Orthofoto (offline)", ORTHOFOTO_LAYER_NAME])
+        layers = {layer.findtext("layername"): layer for layer in root.find("projectlayers")}
+        gst = layers["GST_V2"]
+        self.assertEqual(gst.findtext("datasource"), "./kataster_44106.gpkg|layername=GST_V2")
+        self.assertEqual(gst.find("extent").findtext("xmax"), "601000.0")
+        self.assertEqual(gst.find("srs/spatialrefsys").findtext("authid"), "EPSG:25833")
+        fill = {option.get("name"): option.get("value") for option in gst.iter("Option") if option.get("value")}
+        self.assertEqual(fill["style"], "no")
+        self.assertEqual(layers["BEV Orthofoto (offline)"].findtext("datasource"), "./kataster_44106_orthofoto.mbtiles")
+        self.assertIn("basemap.at", layers[ORTHOFOTO_LAYER_NAME].findtext("datasource"))
+        self.assertEqual(root.find("projectCrs/spatialrefsys").findtext("authid"), "EPSG:25833")
+        self.assertEqual(root.find("projectFlags").get("set"), "TrustStoredLayerStatistics")
+        self.assertEqual(gst.get("readOnly"), "1")
+        self.assertEqual(root.find("mapcanvas/extent").findtext("xmax"), "601200.0")
+        self.assertEqual(len(root.find("layerorder")), 4)
+
+    def test_outline_style_and_missing_layers(self):
+        qgz = os.path.join(self.tmp.name, "kataster_44106.qgz")
+
+        project_template.write_template_project(
+            self.gpkg, ["GST_V2"], qgz, project_template.outline_polygon_style, orthofoto=False, fast_open=False
+        )
+        root = self._read_qgz(qgz)
+        self.assertEqual(root.find("projectFlags").get("set"), "")
+        self.assertEqual(root.find("projectlayers/maplayer").get("readOnly"), "0")
+
+        fill = {option.get("name"): option.get("value") for option in root.iter("Option") if option.get("value")}
+        self.assertEqual((fill["color"], fill["outline_color"]), ("0,0,0,0", "0,0,0,255"))
+        self.assertEqual([node.get("name") for node in root.iter("layer-tree-layer")], ["GST_V2"])
+        with self.assertRaises(ValueError):
+            project_template.write_template_project(self.gpkg, ["missing"], qgz)
+
+
+if __name__ == "__main__":
+    unittest.main()
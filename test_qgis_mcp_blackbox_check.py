@@ -1,6 +1,8 @@
 import json
+import os
 import socket
 import sys
+import tempfile
 import threading
 import unittest
 from pathlib import Path
@@ -35,6 +37,21 @@ class QgisMcpBlackboxCheckTests(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             mcp_check._as_success_result({"status": "error", "message": "bad request"}, "ping")
 
+    def test_open_time_is_compared_with_baseline_summary(self):
+        current = mcp_check._timing_stats([0.5, 0.4, 0.6])
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "before.json")
+            with open(baseline, "w", encoding="utf-8") as handle:
+                json.dump({"timings": {"load_project": mcp_check._timing_stats([2.0, 1.0])}}, handle)
+
+            comparison = mcp_check._compare_timing(current, baseline)
+            render_comparison = mcp_check._compare_timing(current, baseline, "render_map")
+
+        self.assertEqual(current, {"runs": 3, "min": 0.4, "median": 0.5, "max": 0.6})
+        self.assertEqual(comparison["baseline_median"], 1.5)
+        self.assertAlmostEqual(comparison["speedup"], 3.0)
+        self.assertIsNone(render_comparison)
+
     @unittest.skipUnless(SOCKETS_AVAILABLE, "Socket operations are blocked in this environment")
     def test_wait_for_server_true_when_port_is_listening(self):
         listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -0,0 +1,33 @@
+import unittest
+
+from bev_to_qfield_plugin import render_profile
+
+
+class RenderProfileTests(unittest.TestCase):
+    def test_dense_point_layers_get_scale_based_visibility(self):
+        sparse = render_profile.render_settings("Point", 10)
+        dense = render_profile.render_settings("Point", 5000)
+        unknown = render_profile.render_settings("Point")
+
+        self.assertEqual(sparse["min_scale"], 0)
+        self.assertEqual(dense["min_scale"], render_profile.RENDER_PROFILE["Point"]["min_scale"])
+        self.assertEqual(unknown["min_scale"], 0)
+        self.assertIsNone(dense["simplify_threshold"])
+        self.assertNotIn("dense_feature_count", dense)
+
+    def test_polygons_stay_visible_and_are_simplified(self):
+        settings = render_profile.render_settings("Polygon", 1000000)
+
+        self.assertEqual(settings["min_scale"], 0)
+        self.assertEqual(settings["simplify_threshold"], 1.0)
+        self.assertEqual(settings["max_labels"], 300)
+
+    def test_unknown_geometry_uses_point_profile(self):
+        self.assertEqual(
+            render_profile.render_settings("Unknown geometry", 5000),
+            render_profile.render_settings("Point", 5000),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
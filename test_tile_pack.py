@@ -0,0 +1,138 @@
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from bev_to_qfield_plugin import tile_pack
+
+# Roughly KG 01004 (Innere Stadt, Wien) in WGS84
+BOUNDS = (16.360, 48.200, 16.380, 48.215)
+
+
+def sockets_available() -> bool:
+    try:
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.close()
+        return True
+    except OSError:
+        return False
+
+
+SOCKETS_AVAILABLE = sockets_available()
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        if self.path in server.missing:
+            self.send_error(404)
+            return
+        body = f"tile {self.path}".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_gpkg_contents(path, rows):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT, min_x REAL, min_y REAL, "
+            "max_x REAL, max_y REAL, srs_id INTEGER)"
+        )
+        conn.executemany("INSERT INTO gpkg_contents VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+class TileMathTests(unittest.TestCase):
+    def test_tile_range_and_count(self):
+        self.assertEqual(tile_pack.lonlat_to_tile(0.0, 0.0, 1), (1, 1))
+        self.assertEqual(tile_pack.lonlat_to_tile(-180.0, 85.0, 3), (0, 0))
+        tiles = list(tile_pack.tiles_for_bounds(BOUNDS, 14, 15))
+
+        self.assertEqual(len(tiles), tile_pack.count_tiles(BOUNDS, 14, 15))
+        self.assertEqual({tile[0] for tile in tiles}, {14, 15})
+        self.assertIn((14,) + tile_pack.lonlat_to_tile(16.37, 48.21, 14), tiles)
+
+    def test_parse_zoom_range(self):
+        self.assertEqual(tile_pack.parse_zoom_range("14-18"), (14, 18))
+        self.assertEqual(tile_pack.parse_zoom_range("16"), (16, 16))
+        with self.assertRaises(ValueError):
+            tile_pack.parse_zoom_range("18-14")
+
+    def test_gpkg_extent_merges_selected_tables(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kataster.gpkg")
+            _write_gpkg_contents(path, [
+                ("gst", "features", 10.0, 20.0, 30.0, 40.0, 25833),
+                ("sgg", "features", 5.0, 25.0, 35.0, 45.0, 25833),
+                ("nsl", "features", 0.0, 0.0, 100.0, 100.0, 25833),
+                ("ortho", "tiles", -1.0, -1.0, 1.0, 1.0, 3857),
+            ])
+
+            self.assertEqual(tile_pack.gpkg_extent(path, ["GST", "sgg"]), ((5.0, 20.0, 35.0, 45.0), 25833))
+            self.assertEqual(tile_pack.gpkg_extent(path)[0], (0.0, 0.0, 100.0, 100.0))
+            self.assertIsNone(tile_pack.gpkg_extent(path, ["missing"]))
+
+
+@unittest.skipUnless(SOCKETS_AVAILABLE, "Socket operations are blocked in this environment")
+class BuildMbtilesTests(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), _TileHandler)
+        self.server.requests = []
+        self.server.missing = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/{{z}}/{{y}}/{{x}}.jpeg"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "kataster_orthofoto.mbtiles")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_downloads_all_tiles_into_mbtiles_with_tms_rows(self):
+        total = tile_pack.count_tiles(BOUNDS, 14, 15)
+
+        stats = tile_pack.build_mbtiles(self.path, BOUNDS, 14, 15, url_template=self.url, workers=4, retries=0)
+
+        self.assertEqual((stats["tiles"], stats["downloaded"], stats["failed"]), (total, total, 0))
+        z, x, y = next(tile_pack.tiles_for_bounds(BOUNDS, 14, 14))
+        with sqlite3.connect(self.path) as conn:
+            data = conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, 2 ** z - 1 - y),
+            ).fetchone()[0]
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+        self.assertEqual(bytes(data), f"tile /{z}/{y}/{x}.jpeg".encode("utf-8"))
+        self.assertEqual((metadata["format"], metadata["minzoom"], metadata["maxzoom"]), ("jpg", "14", "15"))
+
+    def test_existing_tiles_are_not_fetched_again(self):
+        first_tile = next(tile_pack.tiles_for_bounds(BOUNDS, 14, 14))
+        self.server.missing.add("/{0}/{2}/{1}.jpeg".format(*first_tile))
+        first = tile_pack.build_mbtiles(self.path, BOUNDS, 14, 14, url_template=self.url, retries=0)
+        self.server.missing.clear()
+        self.server.requests.clear()
+
+        second = tile_pack.build_mbtiles(self.path, BOUNDS, 14, 14, url_template=self.url, retries=0)
+
+        self.assertEqual(first["failed"], 1)
+        self.assertEqual((second["downloaded"], second["existing"]), (1, first["downloaded"]))
+        self.assertEqual(self.server.requests, ["/{0}/{2}/{1}.jpeg".format(*first_tile)])
+
+    def test_tile_limit_is_enforced_before_downloading(self):
+        with self.assertRaises(ValueError):
+            tile_pack.build_mbtiles(self.path, BOUNDS, 14, 18, url_template=self.url, max_tiles=10)
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
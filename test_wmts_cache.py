@@ -0,0 +1,123 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from bev_to_qfield_plugin import wmts_cache
+
+CAPABILITIES = b'<?xml version="1.0"?>\n<Capabilities xmlns="http://www.opengis.net/wmts/1.0" version="1.0.0"/>\n'
+
+
+def sockets_available() -> bool:
+    try:
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.close()
+        return True
+    except OSError:
+        return False
+
+
+SOCKETS_AVAILABLE = sockets_available()
+
+
+class _CapabilitiesHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        body = server.body
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(SOCKETS_AVAILABLE, "Socket operations are blocked in this environment")
+class WmtsCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), _CapabilitiesHandler)
+        self.server.requests = 0
+        self.server.body = CAPABILITIES
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/wmts/1.0.0/WMTSCapabilities.xml"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_downloads_once_and_serves_from_cache_within_ttl(self):
+        first = wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=3600)
+        second = wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=3600)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.read_bytes(), CAPABILITIES)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_refreshes_after_ttl(self):
+        path = wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=60)
+        self.server.body = CAPABILITIES.replace(b"1.0.0", b"1.0.1")
+
+        wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=60, now=time.time() + 120)
+
+        self.assertEqual(self.server.requests, 2)
+        self.assertIn(b"1.0.1", path.read_bytes())
+
+    def test_invalid_response_keeps_stale_copy(self):
+        path = wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=60)
+        self.server.body = b"<html>maintenance</html>"
+
+        stale = wmts_cache.cached_capabilities(self.url, self.cache_dir, ttl_seconds=60, now=time.time() + 120)
+
+        self.assertEqual(stale, path)
+        self.assertEqual(path.read_bytes(), CAPABILITIES)
+
+    def test_unreachable_server_without_cache_returns_none_quickly(self):
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+        closed.close()
+        started = time.monotonic()
+
+        result = wmts_cache.cached_capabilities(f"http://127.0.0.1:{port}/caps.xml", self.cache_dir, timeout=1)
+
+        self.assertIsNone(result)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+class WmtsUriTests(unittest.TestCase):
+    def test_orthofoto_uri_and_remote_source_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            local = wmts_cache.file_url(wmts_cache.cache_path_for(wmts_cache.CAPABILITIES_URL, Path(tmp)))
+            uri = wmts_cache.orthofoto_uri(local)
+
+            self.assertIn("layers=bmaporthofoto30cm", uri)
+            self.assertTrue(uri.endswith(f"url={local}"))
+            remote = wmts_cache.remote_source(uri, cache_dir=Path(tmp))
+            self.assertEqual(remote, wmts_cache.orthofoto_uri(wmts_cache.CAPABILITIES_URL))
+            self.assertEqual(wmts_cache.remote_source("other.gpkg|layername=gst", cache_dir=Path(tmp)), "other.gpkg|layername=gst")
+
+    def test_default_cache_dir_honours_environment(self):
+        previous = os.environ.get("QFC_WMTS_CACHE_DIR")
+        os.environ["QFC_WMTS_CACHE_DIR"] = "/tmp/wmts-test"
+        try:
+            self.assertEqual(wmts_cache.default_cache_dir(), Path("/tmp/wmts-test"))
+        finally:
+            if previous is None:
+                os.environ.pop("QFC_WMTS_CACHE_DIR")
+            else:
+                os.environ["QFC_WMTS_CACHE_DIR"] = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
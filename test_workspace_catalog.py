@@ -0,0 +1,87 @@
+import os
+import struct
+import tempfile
+import time
+import unittest
+
+from bev_to_qfield_plugin import workspace_catalog
+
+
+def _write_shapefile(base, shape_type, count):
+    with open(base + ".shp", "wb") as handle:
+        handle.write(struct.pack(">i", 9994) + b"\0" * 28 + struct.pack("<i", shape_type))
+    with open(base + ".shx", "wb") as handle:
+        handle.write(b"\0" * (100 + 8 * count))
+    with open(base + ".dbf", "wb") as handle:
+        handle.write(b"\x03\0\0\0" + struct.pack("<I", count))
+
+
+class WorkspaceCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workspace = os.path.realpath(self._tmp.name)
+        self.kg_dir = os.path.join(self.workspace, "01_BEV_Rawdata", "51235")
+        os.makedirs(os.path.join(self.kg_dir, "shp"))
+        os.makedirs(os.path.join(self.workspace, "01_BEV_Rawdata", "entzippt"))
+        os.makedirs(os.path.join(self.workspace, "02_QGIS_Processing", "grids", "at"))
+        os.makedirs(os.path.join(self.workspace, "03_QField_Output", "kataster_51235_strass_qfield"))
+        _write_shapefile(os.path.join(self.kg_dir, "shp", "GST_V2"), 5, 12)
+        _write_shapefile(os.path.join(self.kg_dir, "shp", "FP_V2"), 1, 3)
+        for name in ("AT_GIS_GRID.gsb", "GV_Hoehengrid_V2.tif"):
+            open(os.path.join(self.workspace, "02_QGIS_Processing", "grids", "at", name), "wb").close()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_catalog_records_kg_files_layers_grids_and_outputs(self):
+        gpkg = os.path.join(self.workspace, "03_QField_Output", "kataster_51235_strass_qfield", "kataster_51235_strass_qfield.gpkg")
+        open(gpkg, "wb").close()
+
+        catalog = workspace_catalog.refresh_catalog(self.workspace)
+
+        entry = catalog["kgs"]["51235"]
+        shapefiles = {item["path"]: item for item in entry["files"] if item["path"].endswith(".shp")}
+        self.assertEqual(shapefiles["shp/GST_V2.shp"]["layer_type"], "Polygon")
+        self.assertEqual(shapefiles["shp/GST_V2.shp"]["feature_count"], 12)
+        self.assertEqual(shapefiles["shp/FP_V2.shp"]["layer_type"], "Point")
+        self.assertEqual(len(entry["files"]), 6)
+        self.assertEqual(entry["outputs"]["gpkg"], [gpkg])
+        self.assertIsNotNone(entry["outputs"]["last_conversion"])
+        self.assertEqual(list(catalog["kgs"]), ["51235"])
+        self.assertTrue(catalog["grids"]["ntv2"][0].endswith("AT_GIS_GRID.gsb"))
+        self.assertTrue(os.path.isfile(workspace_catalog.catalog_path(self.workspace)))
+        self.assertEqual(workspace_catalog.find_workspace(os.path.join(self.kg_dir, "shp")), self.workspace)
+        self.assertEqual(workspace_catalog.catalog_grid(self.kg_dir, "geoid"), catalog["grids"]["geoid"][0])
+
+    def test_catalog_grid_ignores_stale_grid_entries(self):
+        workspace_catalog.refresh_catalog(self.workspace)
+        grid_dir = os.path.join(self.workspace, "02_QGIS_Processing", "grids", "at")
+        self.assertIsNotNone(workspace_catalog.catalog_grid(self.kg_dir, "ntv2"))
+
+        os.remove(os.path.join(grid_dir, "AT_GIS_GRID.gsb"))
+        os.utime(grid_dir, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertIsNone(workspace_catalog.catalog_grid(self.kg_dir, "ntv2"))
+        self.assertIsNone(workspace_catalog.catalog_grid(self.kg_dir, "geoid"))
+
+    def test_refresh_rescans_only_changed_kg_folders(self):
+        other = os.path.join(self.workspace, "01_BEV_Rawdata", "46144")
+        os.makedirs(other)
+        first = workspace_catalog.refresh_catalog(self.workspace)
+        self.assertEqual(first["refreshed"], ["46144", "51235"])
+
+        second = workspace_catalog.refresh_catalog(self.workspace)
+        self.assertEqual(second["refreshed"], [])
+
+        time.sleep(0.01)
+        _write_shapefile(os.path.join(other, "SGG_V2"), 3, 4)
+        os.utime(other, ns=(time.time_ns(), time.time_ns() + 10**9))
+        third = workspace_catalog.refresh_catalog(self.workspace)
+        self.assertEqual(third["refreshed"], ["46144"])
+        self.assertEqual(third["kgs"]["46144"]["files"][1]["layer_type"], "Line")
+
+        limited = workspace_catalog.refresh_catalog(self.workspace, only=["51235"])
+        self.assertEqual(limited["refreshed"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from bev_to_qfield_plugin import layer_cache, zip_source
+from kataster_common import default_output_path, is_kataster_shapefile
+
+
+class ZipSourceTests(unittest.TestCase):
+    def test_split_zip_source(self):
+        archive = os.path.normpath("/data/01_BEV_Rawdata/BEV_Kataster.ZIP")
+        self.assertEqual(zip_source.split_zip_source("/data/01_BEV_Rawdata/BEV_Kataster.ZIP!/51235"), (archive, "51235"))
+        self.assertEqual(
+            zip_source.split_zip_source("/data/01_BEV_Rawdata/BEV_Kataster.ZIP!\\nested\\51235\\"),
+            (archive, "nested/51235"),
+        )
+        self.assertIsNone(zip_source.split_zip_source("/data/01_BEV_Rawdata/51235"))
+        self.assertIsNone(zip_source.split_zip_source("/data/BEV_Kataster.zip!/"))
+        self.assertIsNone(zip_source.split_zip_source(None))
+        self.assertEqual(
+            zip_source.vsizip_path(os.path.normpath("/data/a.zip"), "nested/51235/gst.shp"),
+            "/vsizip//data/a.zip/nested/51235/gst.shp",
+        )
+
+    def test_default_output_path_uses_kg_folder_of_zip_source(self):
+        path = default_output_path("/data/ws/01_BEV_Rawdata/BEV_Kataster.zip!/51235")
+
+        self.assertEqual(
+            path, os.path.normpath("/data/ws/03_QField_Output/kataster_51235_qfield/kataster_51235_qfield.gpkg")
+        )
+
+    def test_list_zip_folder_and_member_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = str(Path(tmp) / "bev.zip")
+            with zipfile.ZipFile(archive, "w") as handle:
+                handle.writestr("BEV/51235/", "")
+                handle.writestr("BEV/51235/GST_51235.shp", "s" * 10)
+                handle.writestr("BEV/51235/GST_51235.dbf", "d" * 4)
+                handle.writestr("BEV/51235/readme.txt", "r")
+                handle.writestr("BEV/51235/sub/SGG_51235.shp", "x")
+                handle.writestr("BEV/99999/GST_99999.shp", "other")
+
+            flat = zip_source.list_zip_folder(archive, "51235")
+            nested = zip_source.list_zip_folder(archive, "bev/51235", recursive=True)
+
+            self.assertEqual(
+                [name for name in (rel for _member, rel, _size in flat) if is_kataster_shapefile(name)], ["GST_51235.shp"]
+            )
+            self.assertEqual([rel for _member, rel, _size in nested][-1], "sub/SGG_51235.shp")
+            self.assertEqual(zip_source.list_zip_folder(archive, "12345"), [])
+
+            sizes = {member.lower(): size for member, _rel, size in nested}
+            key = zip_source.zip_member_key(archive, "BEV/51235/GST_51235.shp", sizes)
+            self.assertEqual([stamp[0].rsplit("!", 1)[1] for stamp in key], ["BEV/51235/GST_51235.shp", "BEV/51235/GST_51235.dbf"])
+            self.assertEqual(layer_cache.source_footprint(key), 14)
+
+            os.utime(archive, ns=(1, 1))
+            self.assertNotEqual(zip_source.zip_member_key(archive, "BEV/51235/GST_51235.shp", sizes), key)
+
+
+if __name__ == "__main__":
+    unittest.main()